@@ -0,0 +1,251 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from DirectedGraph import instrumentation
+from DirectedGraph.exceptions import GraphException
+
+# upper bound on the number of cells of the temporary block built by min_plus_product
+BLOCK_CELLS = 1 << 22
+# side of the square tiles of blocked_floyd_warshall, a 256 x 256 tile of floats (512 KiB) stays in L2 caches
+TILE_SIZE = 256
+
+# the matrices viewed by a worker process of blocked_floyd_warshall, set by _attach
+_dist = None
+_next_hop = None
+_memory = None
+
+
+def weight_matrix(graph):
+    """
+    Returns the weight matrix of the graph (0 on the diagonal, inf where there
+    is no edge) and the matching next-hop matrix (-1 where there is no edge),
+    with rows and columns following graph.vertex_index(compact=True).
+    :param graph: DirectedGraph
+    """
+    index = graph.vertex_index(compact=True)
+    n = graph.get_no_vertices()
+    dist = np.full((n, n), math.inf)
+    next_hop = np.full((n, n), -1, dtype=np.int64)
+    edges = list(graph.iterate_edges_with_cost())
+    if edges:
+        sources, targets, costs = np.array(edges).T
+        sources = sources.astype(np.int64)
+        targets = targets.astype(np.int64)
+        if not index.is_identity():
+            sources = np.fromiter(map(index.index_of, sources.tolist()), dtype=np.int64, count=len(sources))
+            targets = np.fromiter(map(index.index_of, targets.tolist()), dtype=np.int64, count=len(targets))
+        dist[sources, targets] = costs
+        next_hop[sources, targets] = targets
+    diagonal = np.arange(n)
+    dist[diagonal, diagonal] = np.minimum(dist[diagonal, diagonal], 0)
+    next_hop[diagonal, diagonal] = diagonal
+    return dist, next_hop
+
+
+def min_plus_product(dist1, dist2, next1):
+    """
+    Returns the min-plus product of dist1 and dist2 and its next-hop matrix:
+    result[i][j] = min over k of dist1[i][k] + dist2[k][j], reached by going
+    from i towards k first. dist2 must have a 0 diagonal. Rows, columns and the
+    k dimension are processed in blocks of at most BLOCK_CELLS cells.
+    :param dist1, dist2: n x n float arrays
+    :param next1: n x n int array, next hops of dist1
+    """
+    n = dist1.shape[0]
+    result = np.empty_like(dist1)
+    next_hop = np.empty_like(next1)
+    #k and column blocks are square, as many rows as fit in the rest of BLOCK_CELLS
+    side = min(n, max(1, math.isqrt(BLOCK_CELLS)))
+    rows = max(1, BLOCK_CELLS // max(1, side * side))
+    for start in range(0, n, rows):
+        stop = min(n, start + rows)
+        for column_start in range(0, n, side):
+            column_stop = min(n, column_start + side)
+            lowest = np.full((stop - start, column_stop - column_start), math.inf)
+            best = np.zeros(lowest.shape, dtype=np.int64)
+            for k_start in range(0, n, side):
+                k_stop = min(n, k_start + side)
+                candidates = dist1[start:stop, k_start:k_stop, None] + dist2[None, k_start:k_stop, column_start:column_stop]
+                block_best = candidates.argmin(axis=1)
+                block_lowest = np.take_along_axis(candidates, block_best[:, None, :], axis=1)[:, 0, :]
+                #strictly lower only, so the first k of a tie wins as with a single argmin
+                lower = block_lowest < lowest
+                lowest = np.where(lower, block_lowest, lowest)
+                best = np.where(lower, block_best + k_start, best)
+            current = dist1[start:stop, column_start:column_stop]
+            current_next = next1[start:stop, column_start:column_stop]
+            #only strictly cheaper walks change the next hop, ties on zero cost walks would make it loop
+            better = lowest < current
+            result[start:stop, column_start:column_stop] = np.where(better, lowest, current)
+            next_hop[start:stop, column_start:column_stop] = np.where(
+                better, np.take_along_axis(next1[start:stop], best, axis=1), current_next)
+    return result, next_hop
+
+
+def repeated_squaring(graph):
+    """
+    Returns the lowest cost matrix and the next-hop matrix of the graph, squaring
+    the weight matrix at most ceil(log2(n)) times instead of multiplying it
+    n-2 times.
+    Raises exception if the graph has negative cost cycles.
+    :param graph: DirectedGraph
+    """
+    dist, next_hop = weight_matrix(graph)
+    walk_length = 1
+    while walk_length < graph.get_no_vertices():
+        squared, next_hop = min_plus_product(dist, dist, next_hop)
+        instrumentation.count("matrix_cells", dist.shape[0] ** 3)
+        walk_length *= 2
+        #once squaring changes nothing, longer walks can't be cheaper either
+        if np.array_equal(squared, dist):
+            break
+        dist = squared
+    validate_negative_costs(dist)
+    return dist, next_hop
+
+
+def floyd_warshall(graph):
+    """
+    Returns the lowest cost matrix and the next-hop matrix of the graph using
+    Floyd-Warshall, relaxing the whole matrix through vertex k at step k.
+    Raises exception if the graph has negative cost cycles.
+    :param graph: DirectedGraph
+    """
+    dist, next_hop = weight_matrix(graph)
+    instrumentation.count("matrix_cells", dist.shape[0] ** 3)
+    for k in range(dist.shape[0]):
+        candidates = dist[:, k, None] + dist[None, k, :]
+        better = candidates < dist
+        dist = np.where(better, candidates, dist)
+        next_hop = np.where(better, next_hop[:, k, None], next_hop)
+    validate_negative_costs(dist)
+    return dist, next_hop
+
+
+def _relax_tiles(dist, next_hop, tiles, k_start, k_stop):
+    """
+    Relaxes every (row_start, row_stop, column_start, column_stop) tile of the
+    matrices through the vertices k_start..k_stop-1, one after the other.
+    """
+    for row_start, row_stop, column_start, column_stop in tiles:
+        tile = dist[row_start:row_stop, column_start:column_stop]
+        tile_next = next_hop[row_start:row_stop, column_start:column_stop]
+        candidates = np.empty_like(tile)
+        better = np.empty(tile.shape, dtype=bool)
+        for k in range(k_start, k_stop):
+            np.add(dist[row_start:row_stop, k, None], dist[None, k, column_start:column_stop], out=candidates)
+            np.less(candidates, tile, out=better)
+            np.copyto(tile, candidates, where=better)
+            np.copyto(tile_next, next_hop[row_start:row_stop, k, None], where=better)
+
+
+def _attach(name, n):
+    global _dist, _next_hop, _memory
+    _memory = shared_memory.SharedMemory(name=name)
+    _dist = np.ndarray((n, n), dtype=np.float64, buffer=_memory.buf)
+    _next_hop = np.ndarray((n, n), dtype=np.int64, buffer=_memory.buf, offset=8 * n * n)
+
+
+def _relax_in_worker(task):
+    _relax_tiles(_dist, _next_hop, *task)
+
+
+def _split(tiles, parts):
+    #at most parts tasks of consecutive tiles
+    size = max(1, -(-len(tiles) // parts))
+    return [tiles[start:start + size] for start in range(0, len(tiles), size)]
+
+
+def _blocked_rounds(n, tile_size, run, parts):
+    """
+    Runs the rounds of blocked Floyd-Warshall, one per diagonal tile: the tile
+    itself, then the tiles sharing its rows or columns, then all the others.
+    The tiles of a phase only read tiles finished by the earlier phases, so
+    run(tasks) may relax the tasks of a phase in any order or at once.
+    """
+    bounds = [(start, min(n, start + tile_size)) for start in range(0, n, tile_size)]
+    for k_start, k_stop in bounds:
+        run([([(k_start, k_stop, k_start, k_stop)], k_start, k_stop)])
+        others = [bound for bound in bounds if bound[0] != k_start]
+        crossing = [(k_start, k_stop, start, stop) for start, stop in others] + \
+                   [(start, stop, k_start, k_stop) for start, stop in others]
+        rest = [(row_start, row_stop, column_start, column_stop)
+                for row_start, row_stop in others for column_start, column_stop in others]
+        for tiles in (crossing, rest):
+            run([(part, k_start, k_stop) for part in _split(tiles, parts)])
+
+
+def blocked_floyd_warshall(graph, workers=None, tile_size=TILE_SIZE):
+    """
+    Returns the lowest cost matrix and the next-hop matrix of the graph using
+    Floyd-Warshall on square tiles of the matrices, so the cells relaxed
+    together stay in the cache. The independent tiles of every phase are
+    spread over a pool of worker processes that update the matrices in shared
+    memory; with one worker the tiles are relaxed in this process.
+    Raises exception if the graph has negative cost cycles.
+    :param graph: DirectedGraph
+    :param workers: int, number of processes, os.cpu_count() by default
+    :param tile_size: int, side of the tiles
+    """
+    if tile_size < 1:
+        raise GraphException("The tile size must be positive")
+    dist, next_hop = weight_matrix(graph)
+    n = dist.shape[0]
+    instrumentation.count("matrix_cells", n ** 3)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or n <= tile_size:
+        _blocked_rounds(n, tile_size, lambda tasks: [_relax_tiles(dist, next_hop, *task) for task in tasks], 1)
+    else:
+        memory = shared_memory.SharedMemory(create=True, size=max(1, 16 * n * n))
+        shared = []
+        try:
+            shared = [np.ndarray((n, n), dtype=np.float64, buffer=memory.buf),
+                      np.ndarray((n, n), dtype=np.int64, buffer=memory.buf, offset=8 * n * n)]
+            shared[0][:] = dist
+            shared[1][:] = next_hop
+            with ProcessPoolExecutor(workers, initializer=_attach, initargs=(memory.name, n)) as executor:
+                _blocked_rounds(n, tile_size, lambda tasks: list(executor.map(_relax_in_worker, tasks)), workers)
+            dist[:] = shared[0]
+            next_hop[:] = shared[1]
+        finally:
+            #the memory can only be closed once no array views it
+            shared.clear()
+            memory.close()
+            memory.unlink()
+    validate_negative_costs(dist)
+    return dist, next_hop
+
+
+def validate_negative_costs(dist):
+    """
+    Raises exception if a vertex has a negative cost walk back to itself.
+    :param dist: n x n float array
+    """
+    if (np.diagonal(dist) < 0).any():
+        raise GraphException("It has negative cost cycles!")
+
+
+def get_path(next_hop, v1, v2):
+    """
+    Returns the walk from v1 to v2 stored in the next-hop matrix or an empty
+    list if there is none.
+    :param next_hop: n x n int array
+    :param v1, v2: int
+    """
+    if next_hop[v1][v2] < 0:
+        return []
+    path = [v1]
+    while v1 != v2:
+        v1 = int(next_hop[v1][v2])
+        path.append(v1)
+    return path
+
+
+METHODS = {"squaring": repeated_squaring,
+           "floyd_warshall": floyd_warshall,
+           "blocked": blocked_floyd_warshall}
@@ -0,0 +1,256 @@
+"""
+Whole-graph analytics on NumPy arrays: degree arrays and histograms, level-synchronous
+BFS from a set of sources, k-hop neighbourhoods, reachability and the BFS level
+histograms of many sources at once.
+
+The adjacency is turned once into CSR arrays of rows, a row being the position of a
+vertex in vertices_view(), and kept until the graph is modified; a CompactGraph's own
+arrays are used without copying. Every BFS level then gathers the neighbours of the
+whole frontier with a few array operations instead of visiting its vertices one by one.
+The per-vertex arrays returned are indexed by row, which is the vertex itself for
+graphs with the vertices 0..n-1. Works on DirectedGraph and CompactGraph, needs NumPy.
+"""
+from itertools import chain
+
+import numpy as np
+
+from DirectedGraph import instrumentation
+from DirectedGraph.compactGraph import CompactGraph
+from DirectedGraph.exceptions import GraphException
+
+# sources whose BFS levels level_histograms finds together, one bit of a word each
+WORD_BITS = 64
+# level_histograms scatters from the frontier while it has fewer than 1/PULL_RATIO of
+# the edges and gathers into every vertex from its inbound rows otherwise
+PULL_RATIO = 16
+
+
+def adjacency(graph, reverse=False):
+    """
+    Returns the vertices of the graph and its outbound adjacency in CSR form,
+    (vertices, offsets, neighbours), as read-only int64 arrays: the neighbours
+    of the vertex in row i are the rows neighbours[offsets[i]:offsets[i+1]].
+    With reverse it returns the inbound adjacency instead, built from the
+    outbound one, so graphs without an inbound index have it too.
+    The arrays are kept until the graph is modified.
+    :param graph: DirectedGraph or CompactGraph
+    :param reverse: bool
+    """
+    if reverse:
+        return graph._memo(("csr", True), lambda: _reverse(*adjacency(graph)))
+    return graph._memo(("csr", False), lambda: _outbound(graph))
+
+
+def _read_only(*arrays):
+    for values in arrays:
+        values.flags.writeable = False
+    return arrays
+
+
+def _outbound(graph):
+    if isinstance(graph, CompactGraph):
+        vertices, offsets, targets, _ = (np.asarray(values) for values in graph.csr_arrays())
+    else:
+        n = graph.get_no_vertices()
+        vertices = np.fromiter(graph.vertices_view(), dtype=np.int64, count=n)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.fromiter((graph.get_degree_out(vertex) for vertex in vertices.tolist()),
+                                            dtype=np.int64, count=n))
+        targets = np.fromiter(chain.from_iterable(graph.outbound_view(vertex) for vertex in vertices.tolist()),
+                              dtype=np.int64, count=offsets[-1])
+    return _read_only(vertices, offsets, _rows_of(vertices, targets))
+
+
+def _reverse(vertices, offsets, neighbours):
+    n = len(vertices)
+    sources = np.repeat(np.arange(n), np.diff(offsets))
+    #a stable sort keeps the inbound neighbours of every row in outbound order
+    order = np.argsort(neighbours, kind="stable")
+    in_offsets = np.zeros(n + 1, dtype=np.int64)
+    in_offsets[1:] = np.cumsum(np.bincount(neighbours, minlength=n))
+    return _read_only(vertices, in_offsets, sources[order])
+
+
+def _rows_of(vertices, values):
+    #rows of vertices that are known to exist
+    if np.array_equal(vertices, np.arange(len(vertices))):
+        return values
+    order = np.argsort(vertices)
+    return order[np.searchsorted(vertices, values, sorter=order)]
+
+
+def rows(graph, vertices):
+    """
+    Returns the rows of the given vertices as an int64 array.
+    Raises exception if a vertex doesn't exist.
+    :param graph: DirectedGraph or CompactGraph
+    :param vertices: iterable of int
+    """
+    all_vertices = adjacency(graph)[0]
+    values = np.fromiter(vertices, dtype=np.int64)
+    if not len(all_vertices):
+        if len(values):
+            raise GraphException("Vertex doesn't exist")
+        return values
+    order = np.argsort(all_vertices)
+    found = order[np.minimum(np.searchsorted(all_vertices, values, sorter=order), len(order) - 1)]
+    if not np.array_equal(all_vertices[found], values):
+        raise GraphException("Vertex doesn't exist")
+    return found
+
+
+def degrees(graph):
+    """
+    Returns the out degree and the in degree of every vertex as two int64 arrays.
+    :param graph: DirectedGraph or CompactGraph
+    """
+    vertices, offsets, neighbours = adjacency(graph)
+    return np.diff(offsets), np.bincount(neighbours, minlength=len(vertices))
+
+
+def degree_histogram(graph, reverse=False):
+    """
+    Returns an array whose element d is the number of vertices with out degree
+    d, or with in degree d with reverse.
+    :param graph: DirectedGraph or CompactGraph
+    :param reverse: bool
+    """
+    return np.bincount(degrees(graph)[1 if reverse else 0])
+
+
+def _gather(offsets, neighbours, frontier):
+    #the neighbours of every row of the frontier, as one array
+    starts = offsets[frontier]
+    counts = offsets[frontier + 1] - starts
+    before = np.cumsum(counts) - counts
+    return neighbours[np.repeat(starts - before, counts) + np.arange(counts.sum())]
+
+
+def bfs_levels(graph, sources, max_depth=None, reverse=False):
+    """
+    Returns the length of a shortest path from the closest of the sources to
+    every vertex, as an int64 array with -1 for the vertices it doesn't reach.
+    The search is level-synchronous and stops after max_depth levels if given.
+    With reverse the inbound edges are followed, giving the lengths towards the sources.
+    Raises exception if a source doesn't exist.
+    :param graph: DirectedGraph or CompactGraph
+    :param sources: iterable of int
+    :param max_depth: int or None
+    :param reverse: bool
+    """
+    vertices, offsets, neighbours = adjacency(graph, reverse)
+    levels = np.full(len(vertices), -1, dtype=np.int64)
+    frontier = np.unique(rows(graph, sources))
+    levels[frontier] = 0
+    #the last position of every row in the reached array, to drop its repeats without sorting
+    last = np.empty(len(vertices), dtype=np.int64)
+    depth = 0
+    scanned = 0
+    while len(frontier) and (max_depth is None or depth < max_depth):
+        reached = _gather(offsets, neighbours, frontier)
+        scanned += len(reached)
+        reached = reached[levels[reached] < 0]
+        depth += 1
+        levels[reached] = depth
+        positions = np.arange(len(reached))
+        last[reached] = positions
+        frontier = reached[last[reached] == positions]
+    if instrumentation.active is not None:
+        instrumentation.count("vertices_reached", int((levels >= 0).sum()))
+        instrumentation.count("edges_scanned", scanned)
+    return levels
+
+
+def k_hop(graph, sources, k, reverse=False):
+    """
+    Returns the vertices at most k edges away from the sources, sources included,
+    as an int64 array in row order. With reverse the vertices from which a source
+    is at most k edges away are returned.
+    Raises exception if a source doesn't exist.
+    :param graph: DirectedGraph or CompactGraph
+    :param sources: iterable of int
+    :param k: int
+    :param reverse: bool
+    """
+    return adjacency(graph)[0][bfs_levels(graph, sources, k, reverse) >= 0]
+
+
+def reachable(graph, sources, reverse=False):
+    """
+    Returns the vertices reachable from the sources, sources included, as an
+    int64 array in row order. With reverse the vertices that reach a source
+    are returned.
+    Raises exception if a source doesn't exist.
+    :param graph: DirectedGraph or CompactGraph
+    :param sources: iterable of int
+    :param reverse: bool
+    """
+    return adjacency(graph)[0][bfs_levels(graph, sources, None, reverse) >= 0]
+
+
+def level_histogram(graph, sources, reverse=False):
+    """
+    Returns an array whose element d is the number of vertices at distance d
+    from the closest of the sources.
+    Raises exception if a source doesn't exist.
+    :param graph: DirectedGraph or CompactGraph
+    :param sources: iterable of int
+    :param reverse: bool
+    """
+    levels = bfs_levels(graph, sources, None, reverse)
+    return np.bincount(levels[levels >= 0])
+
+
+def _bit_counts(words, bits):
+    #how many of the words have each of the lowest bits set
+    words = words[words != 0].astype("<u8")
+    return np.unpackbits(words.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")[:, :bits].sum(axis=0)
+
+
+def level_histograms(graph, sources, reverse=False):
+    """
+    Returns a 2D int64 array whose row i is the level histogram (see
+    level_histogram) of a BFS from sources[i] alone, padded with zeros.
+    WORD_BITS searches run together as the bits of one word per vertex, so a
+    level costs a few array operations for all of them: small frontiers are
+    scattered along their outbound rows, large ones gathered by every vertex
+    from its inbound rows.
+    Raises exception if a source doesn't exist.
+    :param graph: DirectedGraph or CompactGraph
+    :param sources: iterable of int
+    :param reverse: bool
+    """
+    vertices, offsets, neighbours = adjacency(graph, reverse)
+    _, in_offsets, in_neighbours = adjacency(graph, not reverse)
+    n = len(vertices)
+    #inbound rows with at least one edge, whose starts split the gathered words
+    pulled = np.flatnonzero(np.diff(in_offsets))
+    starts = in_offsets[pulled]
+    out_degrees = np.diff(offsets)
+    source_rows = rows(graph, sources)
+    histograms = []
+    for first in range(0, len(source_rows), WORD_BITS):
+        batch = source_rows[first:first + WORD_BITS]
+        seen = np.zeros(n, dtype=np.uint64)
+        np.bitwise_or.at(seen, batch, np.left_shift(np.uint64(1), np.arange(len(batch), dtype=np.uint64)))
+        frontier = seen.copy()
+        counts = [_bit_counts(frontier, len(batch))]
+        while True:
+            active = np.flatnonzero(frontier)
+            if not len(active):
+                break
+            reached = np.zeros(n, dtype=np.uint64)
+            if out_degrees[active].sum() * PULL_RATIO < len(neighbours):
+                targets = _gather(offsets, neighbours, active)
+                np.bitwise_or.at(reached, targets, np.repeat(frontier[active], out_degrees[active]))
+            elif len(starts):
+                reached[pulled] = np.bitwise_or.reduceat(frontier[in_neighbours], starts)
+            frontier = reached & ~seen
+            seen |= frontier
+            counts.append(_bit_counts(frontier, len(batch)))
+        histograms += np.array(counts[:-1]).T.tolist()
+    width = max((len(histogram) for histogram in histograms), default=0)
+    result = np.zeros((len(histograms), width), dtype=np.int64)
+    for row, histogram in enumerate(histograms):
+        result[row, :len(histogram)] = histogram
+    return result
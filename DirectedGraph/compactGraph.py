@@ -0,0 +1,640 @@
+import mmap
+import struct
+from array import array
+
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+from DirectedGraph.memo import LruMemo
+
+
+SNAPSHOT_MAGIC = b"DGRAPH01"
+# a snapshot without the inbound arrays
+OUTBOUND_SNAPSHOT_MAGIC = b"DGRAPHO1"
+# magic, number of vertices, number of edges
+SNAPSHOT_HEADER = struct.Struct("=8sqq")
+# number of integers handled at a time when streaming arrays in and out of files
+STREAM_CHUNK = 1 << 16
+
+
+class CompactGraph:
+    """
+    Read-only directed graph stored in compressed sparse row (CSR) form.
+    Row i of the outbound adjacency is out_targets[out_offsets[i]:out_offsets[i+1]]
+    with the matching costs in out_costs; the inbound adjacency is kept the
+    same way. Neighbours keep the order they had in the source graph.
+
+    A snapshot file is the header followed by the arrays vertices,
+    out_offsets, out_targets, out_costs, in_offsets, in_sources and in_costs,
+    all as native 64 bit integers, so it can be mapped back without parsing.
+    The inbound arrays are optional (OUTBOUND_SNAPSHOT_MAGIC); without them
+    the inbound queries raise, except the in degrees, which are counted once
+    from the outbound arrays.
+    """
+    def __init__(self, graph, inbound=True):
+        """
+        Builds the compact form of any graph exposing the DirectedGraph query API.
+        :param graph: DirectedGraph
+        :param inbound: bool, whether to keep the inbound arrays
+        """
+        vertices = list(graph.vertices_view())
+        if vertices == list(range(len(vertices))):
+            self.__index = None
+        else:
+            self.__index = {vertex: row for row, vertex in enumerate(vertices)}
+
+        out_offsets = array('q', [0])
+        out_targets = array('q')
+        out_costs = array('q')
+        in_offsets = array('q', [0])
+        in_sources = array('q')
+        in_costs = array('q')
+        for vertex in vertices:
+            for neighbour, cost in graph.outbound_cost_view(vertex):
+                out_targets.append(neighbour)
+                out_costs.append(cost)
+            out_offsets.append(len(out_targets))
+            if inbound:
+                for neighbour, cost in graph.inbound_cost_view(vertex):
+                    in_sources.append(neighbour)
+                    in_costs.append(cost)
+                in_offsets.append(len(in_sources))
+        #the arrays are only reached through read-only views from here on
+        (self.__vertices, self.__out_offsets, self.__out_targets, self.__out_costs,
+         self.__in_offsets, self.__in_sources, self.__in_costs) = (
+            memoryview(values).toreadonly() for values in
+            (array('q', vertices), out_offsets, out_targets, out_costs, in_offsets, in_sources, in_costs))
+        if not inbound:
+            self.__in_offsets = self.__in_sources = self.__in_costs = None
+        self.__buffer = None
+        self.__memo = LruMemo(DirectedGraph.MEMO_SIZE)
+
+    @staticmethod
+    def is_snapshot(file_name):
+        """
+        Returns True if the file starts like a snapshot and False otherwise.
+        Raises exception if the file can't be read.
+        :param file_name: str
+        """
+        try:
+            with open(file_name, "rb") as file:
+                return file.read(len(SNAPSHOT_MAGIC)) in (SNAPSHOT_MAGIC, OUTBOUND_SNAPSHOT_MAGIC)
+        except IOError:
+            raise GraphException("Wrong file name")
+
+    @staticmethod
+    def load_snapshot(file_name):
+        """
+        Returns a compact graph whose arrays are memory-mapped views of the
+        snapshot file, so nothing is read until it is used.
+        Raises exception if the file can't be read or is not a snapshot.
+        :param file_name: str
+        """
+        try:
+            with open(file_name, "rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, ValueError):
+            raise GraphException("Wrong file name")
+        return CompactGraph.from_buffer(buffer)
+
+    @staticmethod
+    def from_buffer(buffer):
+        """
+        Returns a compact graph viewing the snapshot stored in a buffer
+        (bytes, mmap, shared memory) without copying it.
+        Raises exception if the buffer doesn't hold a snapshot.
+        :param buffer: object supporting the buffer protocol
+        """
+        view = memoryview(buffer)
+        if len(view) < SNAPSHOT_HEADER.size:
+            raise GraphException("Invalid snapshot")
+        magic, n, m = SNAPSHOT_HEADER.unpack_from(view)
+        lengths = _array_lengths(n, m, magic == SNAPSHOT_MAGIC)
+        if magic not in (SNAPSHOT_MAGIC, OUTBOUND_SNAPSHOT_MAGIC) or \
+                len(view) < SNAPSHOT_HEADER.size + 8 * sum(lengths):
+            raise GraphException("Invalid snapshot")
+        graph = CompactGraph.__new__(CompactGraph)
+        graph.__buffer = buffer
+        graph.__memo = LruMemo(DirectedGraph.MEMO_SIZE)
+        arrays = []
+        position = SNAPSHOT_HEADER.size
+        for length in lengths:
+            arrays.append(view[position:position + 8 * length].cast('q').toreadonly())
+            position += 8 * length
+        arrays += [None] * (7 - len(arrays))
+        (graph.__vertices, graph.__out_offsets, graph.__out_targets, graph.__out_costs,
+         graph.__in_offsets, graph.__in_sources, graph.__in_costs) = arrays
+        #compared a chunk at a time, so mapping a huge snapshot of the vertices 0..n-1 needs no memory
+        vertices = graph.__vertices
+        if all(vertices[start:start + STREAM_CHUNK] == array('q', range(start, min(n, start + STREAM_CHUNK)))
+               for start in range(0, n, STREAM_CHUNK)):
+            graph.__index = None
+        else:
+            graph.__index = {vertex: row for row, vertex in enumerate(vertices.tolist())}
+        return graph
+
+    @staticmethod
+    def build_snapshot(text_file, snapshot_file, inbound=True, chunk_size=1 << 20):
+        """
+        Writes the snapshot of the graph stored in a text file (see
+        DirectedGraph.read_from_file) without building the graph in memory:
+        a first pass counts the degrees, a second one puts every edge straight
+        into its row of the memory-mapped snapshot, keeping the file order inside
+        a row. Only O(n) integers are kept in memory, so graphs larger than
+        the memory can be converted and then opened with load_snapshot.
+        Raises exception if a file can't be used or the text isn't a valid graph.
+        :param text_file, snapshot_file: str
+        :param inbound: bool, whether to write the inbound arrays
+        :param chunk_size: int, bytes of text read at a time
+        """
+        n, m = _read_header(text_file, chunk_size)
+        out_offsets = array('q', bytes(8 * (n + 1)))
+        in_offsets = array('q', bytes(8 * (n + 1)))
+        edges = 0
+        for sources, targets, _ in _read_edges(text_file, chunk_size, n, m):
+            for source in sources:
+                out_offsets[source + 1] += 1
+            if inbound:
+                for target in targets:
+                    in_offsets[target + 1] += 1
+            edges += len(sources)
+        if edges < m:
+            raise GraphException("Invalid graph file")
+        for row in range(n):
+            out_offsets[row + 1] += out_offsets[row]
+            in_offsets[row + 1] += in_offsets[row]
+        lengths = _array_lengths(n, m, inbound)
+        try:
+            with open(snapshot_file, "w+b") as file:
+                file.truncate(SNAPSHOT_HEADER.size + 8 * sum(lengths))
+                with mmap.mmap(file.fileno(), 0) as buffer:
+                    view = memoryview(buffer)
+                    arrays = []
+                    try:
+                        SNAPSHOT_HEADER.pack_into(view, 0, SNAPSHOT_MAGIC if inbound else OUTBOUND_SNAPSHOT_MAGIC,
+                                                  n, m)
+                        position = SNAPSHOT_HEADER.size
+                        for length in lengths:
+                            arrays.append(view[position:position + 8 * length].cast('q'))
+                            position += 8 * length
+                        for start in range(0, n, STREAM_CHUNK):
+                            end = min(n, start + STREAM_CHUNK)
+                            arrays[0][start:end] = array('q', range(start, end))
+                        arrays[1][:] = out_offsets
+                        #the offsets become the next free position of every row
+                        _fill_rows(text_file, chunk_size, n, m, out_offsets, arrays[2], arrays[3], False)
+                        if inbound:
+                            arrays[4][:] = in_offsets
+                            _fill_rows(text_file, chunk_size, n, m, in_offsets, arrays[5], arrays[6], True)
+                        _check_rows(arrays[1], arrays[2])
+                    finally:
+                        #the map can only be closed once no view of it is left
+                        for values in arrays:
+                            values.release()
+                        view.release()
+        except IOError:
+            raise GraphException("Wrong file name")
+
+    def has_inbound_index(self):
+        """
+        Returns True if the graph keeps its inbound arrays.
+        :param
+        """
+        return self.__in_offsets is not None
+
+    def csr_arrays(self):
+        """
+        Returns read-only views of the outbound arrays (vertices, out_offsets,
+        out_targets, out_costs), without copying them. out_offsets is indexed by
+        the position of a vertex in vertices and out_targets holds vertices.
+        :param
+        """
+        return self.__vertices, self.__out_offsets, self.__out_targets, self.__out_costs
+
+    def __snapshot_parts(self):
+        inbound = self.__in_offsets is not None
+        yield SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC if inbound else OUTBOUND_SNAPSHOT_MAGIC,
+                                   len(self.__vertices), len(self.__out_targets))
+        yield from (self.__vertices, self.__out_offsets, self.__out_targets, self.__out_costs)
+        if inbound:
+            yield from (self.__in_offsets, self.__in_sources, self.__in_costs)
+
+    def snapshot_size(self):
+        """
+        Returns the number of bytes of the snapshot of the graph.
+        :param
+        """
+        return sum(memoryview(part).nbytes for part in self.__snapshot_parts())
+
+    def write_snapshot(self, file_name):
+        """
+        Writes the graph to a file in the snapshot format.
+        Raises exception if the file can't be written.
+        :param file_name: str
+        """
+        try:
+            with open(file_name, "wb") as file:
+                for part in self.__snapshot_parts():
+                    file.write(part)
+        except IOError:
+            raise GraphException("Wrong file name")
+
+    def write_snapshot_to_buffer(self, buffer):
+        """
+        Copies the snapshot of the graph to the start of a writable buffer of
+        at least snapshot_size() bytes, e.g. shared memory.
+        :param buffer: writable object supporting the buffer protocol
+        """
+        view = memoryview(buffer).cast('B')
+        position = 0
+        for part in self.__snapshot_parts():
+            part = memoryview(part).cast('B')
+            view[position:position + part.nbytes] = part
+            position += part.nbytes
+
+    def write_to_file(self, file_name):
+        """
+        Writes the graph to a file in the text format.
+        Raises exception if the file can't be written.
+        :param file_name: str
+        """
+        try:
+            with open(file_name, "w") as file:
+                file.write(str(self.get_no_vertices()) + ' ' + str(self.get_no_edges()) + '\n')
+                file.writelines("%s %s %s\n" % edge for edge in self.iterate_edges_with_cost())
+        except IOError:
+            raise GraphException("Wrong file name")
+
+    def get_version(self):
+        """
+        Returns 0, a compact graph is never modified.
+        :param
+        """
+        return 0
+
+    def _memo(self, key, compute):
+        """
+        Returns the result stored for key, calling compute() to get it if it
+        isn't stored. Callers must not modify the result.
+        :param key: tuple
+        :param compute: function without parameters
+        """
+        return self.__memo.get(key, compute)
+
+    def set_memo_size(self, size):
+        """
+        Changes the number of computed results the graph keeps, 0 turns the
+        memo off.
+        :param size: int
+        """
+        self.__memo.resize(size)
+
+    def __row(self, vertex):
+        if self.__index is not None:
+            return self.__index[vertex]
+        if isinstance(vertex, int) and 0 <= vertex < len(self.__vertices):
+            return vertex
+        raise KeyError(vertex)
+
+    def __find(self, vertex1, vertex2):
+        """
+        Returns the position of the edge (vertex1, vertex2) in the outbound
+        arrays or -1 if the edge does not exist.
+        """
+        row = self.__row(vertex1)
+        start = self.__out_offsets[row]
+        try:
+            return start + self.__out_targets[start:self.__out_offsets[row + 1]].tolist().index(vertex2)
+        except ValueError:
+            return -1
+
+    def iterate_vertices(self):
+        """
+        Returns a list of all the vertices in the graph.
+        :param
+        """
+        return self.__vertices.tolist()
+
+    def get_no_vertices(self):
+        """
+        Returns an integer that represents the number of vertices
+        :param
+        """
+        return len(self.__vertices)
+
+    def get_no_edges(self):
+        """
+        Returns an integer that represents the number of edges.
+        :param
+        """
+        return len(self.__out_targets)
+
+    def exists_edge(self, vertex1, vertex2):
+        """
+        Returns True if the edge exists and False if it does not.
+        :param vertex1:int
+        :param vertex2:int
+        """
+        try:
+            return self.__find(vertex1, vertex2) != -1
+        except KeyError:
+            raise GraphException("This edge doesn't exist")
+
+    def get_degree_in(self, vertex):
+        """
+        Return an integer that represents the in degree of a specified vertex.
+        Raises exception if the vertex doesn’t exist.
+        :param vertex: int
+        """
+        try:
+            row = self.__row(vertex)
+        except KeyError:
+            raise GraphException("Vertex doesn't exist")
+        if self.__in_offsets is None:
+            return self._memo(("in_degrees",), self.__count_in_degrees)[row]
+        return self.__in_offsets[row + 1] - self.__in_offsets[row]
+
+    def __count_in_degrees(self):
+        degrees = array('q', bytes(8 * len(self.__vertices)))
+        index = self.__index
+        for start in range(0, len(self.__out_targets), STREAM_CHUNK):
+            for vertex in self.__out_targets[start:start + STREAM_CHUNK]:
+                degrees[vertex if index is None else index[vertex]] += 1
+        return degrees
+
+    def __inbound_row(self, vertex):
+        if self.__in_offsets is None:
+            raise GraphException("The graph has no inbound index")
+        try:
+            return self.__row(vertex)
+        except KeyError:
+            raise GraphException("This vertex doesn't have any inbound edges")
+
+    def get_degree_out(self, vertex):
+        """
+        Return an integer that represents the out degree of a specified vertex.
+        Raises exception if the vertex doesn’t exist.
+        :param vertex: int
+        """
+        try:
+            row = self.__row(vertex)
+        except KeyError:
+            raise GraphException("Vertex doesn't exist")
+        return self.__out_offsets[row + 1] - self.__out_offsets[row]
+
+    def iterate_outbound(self, vertex):
+        """
+        Returns a list of all the outbound neighbors of a specified vertex.
+        Raises exception if the vertex doesn’t exist.
+        :param vertex: int
+        """
+        try:
+            row = self.__row(vertex)
+        except KeyError:
+            raise GraphException("This vertex doesn't have any outbound edges")
+        return self.__out_targets[self.__out_offsets[row]:self.__out_offsets[row + 1]].tolist()
+
+    def iterate_inbound(self, vertex):
+        """
+        Returns a list of all the inbound neighbors of a specified vertex.
+        Raises exception if the vertex doesn’t exist.
+        :param vertex: int
+        """
+        row = self.__inbound_row(vertex)
+        return self.__in_sources[self.__in_offsets[row]:self.__in_offsets[row + 1]].tolist()
+
+    def iterate_edges(self):
+        """
+        Returns a list of all the edges in the graph, grouped by source vertex.
+        :param
+        """
+        return list(self.iter_edges())
+
+    def vertices_view(self):
+        """
+        Returns a read-only view of the vertices, without copying them.
+        :param
+        """
+        return self.__vertices
+
+    def outbound_view(self, vertex):
+        """
+        Returns a read-only view of the outbound neighbors of a specified vertex.
+        Raises exception if the vertex doesn’t exist.
+        :param vertex: int
+        """
+        try:
+            row = self.__row(vertex)
+        except KeyError:
+            raise GraphException("This vertex doesn't have any outbound edges")
+        return self.__out_targets[self.__out_offsets[row]:self.__out_offsets[row + 1]]
+
+    def inbound_view(self, vertex):
+        """
+        Returns a read-only view of the inbound neighbors of a specified vertex.
+        Raises exception if the vertex doesn’t exist.
+        :param vertex: int
+        """
+        row = self.__inbound_row(vertex)
+        return self.__in_sources[self.__in_offsets[row]:self.__in_offsets[row + 1]]
+
+    def outbound_cost_view(self, vertex):
+        """
+        Returns an iterable of the (neighbor, cost) pairs of the outbound edges
+        of a specified vertex.
+        Raises exception if the vertex doesn’t exist.
+        :param vertex: int
+        """
+        try:
+            row = self.__row(vertex)
+        except KeyError:
+            raise GraphException("This vertex doesn't have any outbound edges")
+        start, end = self.__out_offsets[row], self.__out_offsets[row + 1]
+        return zip(self.__out_targets[start:end], self.__out_costs[start:end])
+
+    def inbound_cost_view(self, vertex):
+        """
+        Returns an iterable of the (neighbor, cost) pairs of the inbound edges
+        of a specified vertex.
+        Raises exception if the vertex doesn’t exist.
+        :param vertex: int
+        """
+        row = self.__inbound_row(vertex)
+        start, end = self.__in_offsets[row], self.__in_offsets[row + 1]
+        return zip(self.__in_sources[start:end], self.__in_costs[start:end])
+
+    def iter_edges(self):
+        """
+        Yields the edges (vertex1, vertex2) of the graph, grouped by their first vertex.
+        :param
+        """
+        for vertex1, vertex2, cost in self.iterate_edges_with_cost():
+            yield vertex1, vertex2
+
+    def iterate_edges_with_cost(self):
+        """
+        Yields the triples (vertex1, vertex2, cost) of the graph, grouped by their first vertex.
+        :param
+        """
+        for row, vertex1 in enumerate(self.__vertices):
+            start, end = self.__out_offsets[row], self.__out_offsets[row + 1]
+            for vertex2, cost in zip(self.__out_targets[start:end], self.__out_costs[start:end]):
+                yield vertex1, vertex2, cost
+
+    def return_cost(self, vertex1, vertex2):
+        """
+        Returns an integer that represents the cost attached to the edge (vertex1, vertex2).
+        Raises exception if this edge does not exist.
+        :param vertex1, vertex2: int
+        """
+        try:
+            position = self.__find(vertex1, vertex2)
+        except KeyError:
+            position = -1
+        if position == -1:
+            raise GraphException("This edge does not exist.")
+        return self.__out_costs[position]
+
+    def modify_cost(self, vertex1, vertex2, new_cost):
+        raise GraphException("The graph is read-only")
+
+    def add_edge(self, vertex1, vertex2, cost):
+        raise GraphException("The graph is read-only")
+
+    def add_vertex(self, vertex):
+        raise GraphException("The graph is read-only")
+
+    def remove_edge(self, vertex1, vertex2):
+        raise GraphException("The graph is read-only")
+
+    def remove_vertex(self, vertex):
+        raise GraphException("The graph is read-only")
+
+    def copy_graph(self):
+        """
+        Returns the graph itself, a compact graph can't be modified.
+        :param
+        """
+        return self
+
+    def to_directed_graph(self):
+        """
+        Returns a mutable DirectedGraph with the same vertices, edges and costs.
+        :param
+        """
+        if self.__index is None:
+            graph = DirectedGraph(len(self.__vertices))
+        else:
+            graph = DirectedGraph(0)
+            for vertex in self.__vertices:
+                graph.add_vertex(vertex)
+        sources = []
+        for row, vertex in enumerate(self.__vertices.tolist()):
+            sources += [vertex] * (self.__out_offsets[row + 1] - self.__out_offsets[row])
+        graph.add_edges(zip(sources, self.__out_targets.tolist(), self.__out_costs.tolist()))
+        return graph
+
+    def __str__(self):
+        graph_str = ""
+        for vertex1, vertex2, cost in self.iterate_edges_with_cost():
+            graph_str += "Vertex1: "
+            graph_str += str(vertex1)
+            graph_str += " Vertex2: "
+            graph_str += str(vertex2)
+            graph_str += " The cost: "
+            graph_str += str(cost)
+            graph_str += '\n'
+        return graph_str
+
+    # the traversals only use the query API above, so they run unchanged on the compact arrays
+    BFS = DirectedGraph.BFS
+    bfs_distances = DirectedGraph.bfs_distances
+    bidirectional_bfs = DirectedGraph.bidirectional_bfs
+    topological_sorting = DirectedGraph.topological_sorting
+    _sort_topologically = DirectedGraph._sort_topologically
+    dag_paths = DirectedGraph.dag_paths
+    _relax_in_order = DirectedGraph._relax_in_order
+    highest_cost_path = DirectedGraph.highest_cost_path
+    k_highest_cost_paths = DirectedGraph.k_highest_cost_paths
+    lowest_cost_tree = DirectedGraph.lowest_cost_tree
+    lowest_cost_walk = DirectedGraph.lowest_cost_walk
+    dijkstra = DirectedGraph.dijkstra
+    bidirectional_dijkstra = DirectedGraph.bidirectional_dijkstra
+    dijkstra_tree = DirectedGraph.dijkstra_tree
+    landmark_walk = DirectedGraph.landmark_walk
+    k_lowest_cost_paths = DirectedGraph.k_lowest_cost_paths
+    construct_path = DirectedGraph.construct_path
+    strongly_connected_components = DirectedGraph.strongly_connected_components
+    _find_components = DirectedGraph._find_components
+    condensation = DirectedGraph.condensation
+    _condense = DirectedGraph._condense
+    condensed_topological_sorting = DirectedGraph.condensed_topological_sorting
+    condensed_highest_cost_path = DirectedGraph.condensed_highest_cost_path
+
+
+def _array_lengths(n, m, inbound):
+    #lengths of the arrays of a snapshot, in file order
+    if inbound:
+        return n, n + 1, m, m, n + 1, m, m
+    return n, n + 1, m, m
+
+
+def _read_header(text_file, chunk_size):
+    try:
+        with open(text_file, "rb") as file:
+            numbers = []
+            for chunk in DirectedGraph._read_numbers(file, chunk_size):
+                numbers += chunk
+                if len(numbers) >= 2:
+                    return numbers[0], numbers[1]
+    except IOError:
+        raise GraphException("Wrong file name")
+    except ValueError:
+        raise GraphException("Invalid graph file")
+    raise GraphException("Invalid graph file")
+
+
+def _read_edges(text_file, chunk_size, n, m):
+    """
+    Yields the edges of a text graph file as (sources, targets, costs) lists,
+    one chunk at a time, checking that every vertex is one of 0..n-1.
+    """
+    try:
+        with open(text_file, "rb") as file:
+            numbers = []
+            skip = 2
+            for chunk in DirectedGraph._read_numbers(file, chunk_size):
+                numbers += chunk[skip:]
+                skip = max(0, skip - len(chunk))
+                usable = min(len(numbers) // 3, m) * 3
+                if usable:
+                    sources, targets, costs = numbers[0:usable:3], numbers[1:usable:3], numbers[2:usable:3]
+                    if min(sources) < 0 or min(targets) < 0 or max(sources) >= n or max(targets) >= n:
+                        raise GraphException("Vertex doesn't exist")
+                    yield sources, targets, costs
+                    m -= usable // 3
+                    numbers = numbers[usable:]
+                if m == 0:
+                    return
+    except IOError:
+        raise GraphException("Wrong file name")
+    except ValueError:
+        raise GraphException("Invalid graph file")
+
+
+def _fill_rows(text_file, chunk_size, n, m, next_free, neighbours, costs, inbound):
+    #puts every edge at the next free position of its row, in the order of the file
+    for sources, targets, edge_costs in _read_edges(text_file, chunk_size, n, m):
+        if inbound:
+            sources, targets = targets, sources
+        for source, target, cost in zip(sources, targets, edge_costs):
+            position = next_free[source]
+            neighbours[position] = target
+            costs[position] = cost
+            next_free[source] = position + 1
+
+
+def _check_rows(offsets, neighbours):
+    for row in range(len(offsets) - 1):
+        start, end = offsets[row], offsets[row + 1]
+        if end - start > 1 and len(set(neighbours[start:end])) < end - start:
+            raise GraphException("This edge already exists")
@@ -1,21 +1,139 @@
-import copy
 import math
-import queue
+from collections import deque
 
+from DirectedGraph import instrumentation, shortestPaths
 from DirectedGraph.exceptions import GraphException
+from DirectedGraph.instrumentation import instrumented
+from DirectedGraph.memo import LruMemo
+from DirectedGraph.vertexIndex import VertexIndex
 
 
 class DirectedGraph:
+    #number of computed results (topological order, lowest cost trees, ...) kept per graph
+    MEMO_SIZE = 32
+
     def __init__(self, n):
+        #__dout[x] maps every outbound neighbour y of x to the cost of (x, y) and
+        #__din[y] maps every inbound neighbour x of y to the same cost, both in insertion order
         self.__din = {}
         self.__dout = {}
-        self.__dcost = {}
+        self.__no_edges = 0
+        #every edge (x, y) in the order it was added, so the edges are listed and written
+        #in that order; after copy_graph it is shared until one of the graphs changes an edge
+        self.__edges = {}
+        self.__shared_edges = False
+        #after copy_graph the neighbour dicts are shared with the copy, these sets hold the
+        #vertices whose dicts this graph copied since then; None means nothing is shared
+        self.__owned_in = None
+        self.__owned_out = None
+        #bumped by every modification, results in __memo belong to __memo_version
+        self.__version = 0
+        self.__memo = LruMemo(self.MEMO_SIZE)
+        self.__memo_version = 0
+        #functions called after every modification, see add_listener
+        self.__listeners = []
+        #dense index of every vertex, used by the matrices
+        self.__vertex_index = VertexIndex(n)
 
         for i in range(n):
-            self.__din[i] = []
-            self.__dout[i] = []
+            self.__din[i] = {}
+            self.__dout[i] = {}
 
         self.__parent=[]
+        #version of the graph self.next was computed for, its indices are only valid for that one
+        self.__next_version = None
+
+    def get_version(self):
+        """
+        Returns an integer that changes every time the graph is modified.
+        :param
+        """
+        return self.__version
+
+    def _memo(self, key, compute):
+        """
+        Returns the result stored for key, calling compute() to get it if the
+        graph changed since it was stored or it was dropped to keep the
+        memo within its size. Callers must not modify the result.
+        :param key: tuple
+        :param compute: function without parameters
+        """
+        if self.__memo_version != self.__version:
+            self.__memo.clear()
+            self.__memo_version = self.__version
+        return self.__memo.get(key, compute)
+
+    def set_memo_size(self, size):
+        """
+        Changes the number of computed results the graph keeps, 0 turns the
+        memo off.
+        :param size: int
+        """
+        self.__memo.resize(size)
+
+    def add_listener(self, listener):
+        """
+        Calls listener after every modification of the graph with the name of
+        the modification and its arguments:
+        ("add_edge", vertex1, vertex2, cost), ("remove_edge", vertex1, vertex2, cost),
+        ("modify_cost", vertex1, vertex2, old_cost, new_cost), ("add_vertex", vertex),
+        ("remove_vertex", vertex, outbound, inbound) where outbound and inbound map the
+        removed neighbours to the costs. add_edges reports every edge on its own.
+        Listeners must not modify the graph or raise exceptions.
+        :param listener: function
+        """
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Stops calling a listener added with add_listener.
+        Raises exception if it wasn't added.
+        :param listener: function
+        """
+        try:
+            self.__listeners.remove(listener)
+        except ValueError:
+            raise GraphException("Listener doesn't exist")
+
+    def __notify(self, *change):
+        for listener in self.__listeners:
+            listener(*change)
+
+    def __writable_out(self, vertex):
+        """
+        Returns __dout[vertex] after making sure no other graph shares it.
+        """
+        outbound = self.__dout[vertex]
+        if self.__owned_out is not None and vertex not in self.__owned_out:
+            outbound = self.__dout[vertex] = dict(outbound)
+            self.__owned_out.add(vertex)
+        return outbound
+
+    def __writable_in(self, vertex):
+        """
+        Returns __din[vertex] after making sure no other graph shares it.
+        """
+        inbound = self.__din[vertex]
+        if self.__owned_in is not None and vertex not in self.__owned_in:
+            inbound = self.__din[vertex] = dict(inbound)
+            self.__owned_in.add(vertex)
+        return inbound
+
+    def __writable_edges(self):
+        """
+        Returns __edges after making sure no other graph shares it.
+        """
+        if self.__shared_edges:
+            self.__edges = dict(self.__edges)
+            self.__shared_edges = False
+        return self.__edges
+
+    def has_inbound_index(self):
+        """
+        Returns True, the inbound neighbours are always kept.
+        :param
+        """
+        return True
 
     def iterate_vertices(self):
         """
@@ -36,7 +154,7 @@ class DirectedGraph:
         Returns an integer that represents the number of edges.
         :param
         """
-        return len(self.__dcost.keys())
+        return self.__no_edges
 
     def exists_edge(self, vertex1, vertex2):
         """
@@ -95,14 +213,82 @@ class DirectedGraph:
 
     def iterate_edges(self):
         """
-        Returns a list of all the edges in the graph.Raises exception if the
-        graph doesn’t have any edges.
+        Returns a list of all the edges in the graph, in the order they were added.
+        :param
+        """
+        return list(self.__edges)
+
+    def vertices_view(self):
+        """
+        Returns a read-only view of the vertices that follows later changes
+        of the graph, without copying them.
         :param
         """
+        return self.__dout.keys()
+
+    def outbound_view(self, vertex):
+        """
+        Returns a read-only view of the outbound neighbors of a specified vertex.
+        Raises exception if the vertex doesn’t exist.
+        :param vertex: int
+        """
+        try:
+            return self.__dout[vertex].keys()
+        except KeyError:
+            raise GraphException("This vertex doesn't have any outbound edges")
+
+    def inbound_view(self, vertex):
+        """
+        Returns a read-only view of the inbound neighbors of a specified vertex.
+        Raises exception if the vertex doesn’t exist.
+        :param vertex: int
+        """
+        try:
+            return self.__din[vertex].keys()
+        except KeyError:
+            raise GraphException("This vertex doesn't have any inbound edges")
+
+    def outbound_cost_view(self, vertex):
+        """
+        Returns a read-only view of the (neighbor, cost) pairs of the outbound
+        edges of a specified vertex.
+        Raises exception if the vertex doesn’t exist.
+        :param vertex: int
+        """
         try:
-            return list(self.__dcost.keys())
+            return self.__dout[vertex].items()
         except KeyError:
-            raise GraphException("The graph doesn't have edges")
+            raise GraphException("This vertex doesn't have any outbound edges")
+
+    def inbound_cost_view(self, vertex):
+        """
+        Returns a read-only view of the (neighbor, cost) pairs of the inbound
+        edges of a specified vertex.
+        Raises exception if the vertex doesn’t exist.
+        :param vertex: int
+        """
+        try:
+            return self.__din[vertex].items()
+        except KeyError:
+            raise GraphException("This vertex doesn't have any inbound edges")
+
+    def iter_edges(self):
+        """
+        Yields the edges (vertex1, vertex2) of the graph in the order they were
+        added. The graph must not change while the generator is used.
+        :param
+        """
+        yield from self.__edges
+
+    def iterate_edges_with_cost(self):
+        """
+        Yields the triples (vertex1, vertex2, cost) of the graph in the order
+        the edges were added. The graph must not change while the generator is used.
+        :param
+        """
+        dout = self.__dout
+        for vertex1, vertex2 in self.__edges:
+            yield vertex1, vertex2, dout[vertex1][vertex2]
 
     def modify_cost(self, vertex1, vertex2, new_cost):
         """
@@ -110,8 +296,13 @@ class DirectedGraph:
         edge does not exit it raises an exception.
         :param vertex1, vertex2, new_cost: int
         """
-        if (vertex1, vertex2) in self.__dcost.keys():
-            self.__dcost[(vertex1, vertex2)] = new_cost
+        if vertex1 in self.__dout and vertex2 in self.__dout[vertex1]:
+            old_cost = self.__dout[vertex1][vertex2]
+            self.__writable_out(vertex1)[vertex2] = new_cost
+            self.__writable_in(vertex2)[vertex1] = new_cost
+            self.__version += 1
+            if self.__listeners:
+                self.__notify("modify_cost", vertex1, vertex2, old_cost, new_cost)
         else:
             raise GraphException("This edge doesn't exist")
 
@@ -121,12 +312,58 @@ class DirectedGraph:
         Raises an exception if this edge already exists.
         :param vertex1, vertex2, new_cost: int
         """
-        if (vertex1, vertex2) in self.__dcost.keys():
+        if vertex1 in self.__dout and vertex2 in self.__dout[vertex1]:
             raise GraphException("This edge already exists")
+        #a missing vertex raises KeyError, before anything is changed
+        if vertex1 not in self.__dout:
+            raise KeyError(vertex1)
+        if vertex2 not in self.__din:
+            raise KeyError(vertex2)
         else:
-            self.__dout[vertex1].append(vertex2)
-            self.__din[vertex2].append(vertex1)
-            self.__dcost[(vertex1, vertex2)] = cost
+            self.__writable_out(vertex1)[vertex2] = cost
+            self.__writable_in(vertex2)[vertex1] = cost
+            self.__writable_edges()[vertex1, vertex2] = None
+            self.__no_edges += 1
+            self.__version += 1
+            if self.__listeners:
+                self.__notify("add_edge", vertex1, vertex2, cost)
+
+    def add_edges(self, edges):
+        """
+        Adds every (vertex1, vertex2, cost) triple of an iterable in a single
+        pass. Raises an exception if an edge already exists or one of its
+        vertices doesn't; the edges before it stay added.
+        :param edges: iterable of (int, int, int)
+        """
+        dout = self.__dout
+        din = self.__din
+        shared = self.__owned_out is not None
+        listeners = self.__listeners
+        registry = self.__writable_edges()
+        added = 0
+        try:
+            for vertex1, vertex2, cost in edges:
+                try:
+                    if shared:
+                        outbound = self.__writable_out(vertex1)
+                        inbound = self.__writable_in(vertex2)
+                    else:
+                        outbound = dout[vertex1]
+                        inbound = din[vertex2]
+                except KeyError:
+                    raise GraphException("Vertex doesn't exist")
+                if vertex2 in outbound:
+                    raise GraphException("This edge already exists")
+                outbound[vertex2] = cost
+                inbound[vertex1] = cost
+                registry[vertex1, vertex2] = None
+                added += 1
+                if listeners:
+                    self.__notify("add_edge", vertex1, vertex2, cost)
+        finally:
+            self.__no_edges += added
+            if added:
+                self.__version += 1
 
     def add_vertex(self, vertex):
         """
@@ -134,11 +371,18 @@ class DirectedGraph:
         already exists.
         :param vertex: int
         """
-        if vertex in self.iterate_vertices():
+        if vertex in self.__dout:
             raise GraphException("This vertex already exists")
         else:
-            self.__din[vertex] = []
-            self.__dout[vertex] = []
+            self.__din[vertex] = {}
+            self.__dout[vertex] = {}
+            self.__vertex_index.add(vertex)
+            self.__version += 1
+            if self.__owned_out is not None:
+                self.__owned_in.add(vertex)
+                self.__owned_out.add(vertex)
+            if self.__listeners:
+                self.__notify("add_vertex", vertex)
 
     def remove_edge(self, vertex1, vertex2):
         """
@@ -146,12 +390,17 @@ class DirectedGraph:
         doesn’t exist then it raises an exception
         :param vertex1, vertex2 : int
         """
-        if (vertex1, vertex2) not in self.__dcost.keys():
+        if vertex1 not in self.__dout or vertex2 not in self.__dout[vertex1]:
             raise GraphException("This edge doesn't exist")
         else:
-            self.__dcost.pop((vertex1, vertex2))
-            self.__dout[vertex1].remove(vertex2)
-            self.__din[vertex2].remove(vertex1)
+            cost = self.__dout[vertex1][vertex2]
+            del self.__writable_out(vertex1)[vertex2]
+            del self.__writable_in(vertex2)[vertex1]
+            del self.__writable_edges()[vertex1, vertex2]
+            self.__no_edges -= 1
+            self.__version += 1
+            if self.__listeners:
+                self.__notify("remove_edge", vertex1, vertex2, cost)
 
     def remove_vertex(self, vertex):
         """
@@ -159,26 +408,37 @@ class DirectedGraph:
         it raises an exception.
         :param vertex: int
         """
-        if vertex not in self.iterate_vertices():
+        if vertex not in self.__dout:
             raise GraphException("Vertex doesn't exist")
+        registry = self.__writable_edges()
         for item in self.__dout[vertex]:
-            self.__din[item].remove(vertex)
-            del self.__dcost[(vertex, item)]
+            del self.__writable_in(item)[vertex]
+            del registry[vertex, item]
+            self.__no_edges -= 1
+        #a loop (vertex, vertex) was already removed from __din[vertex] above
         for item in self.__din[vertex]:
-            self.__dout[item].remove(vertex)
-            del self.__dcost[(item, vertex)]
-        del self.__din[vertex]
-        del self.__dout[vertex]
+            del self.__writable_out(item)[vertex]
+            del registry[item, vertex]
+            self.__no_edges -= 1
+        outbound = self.__dout.pop(vertex)
+        inbound = self.__din.pop(vertex)
+        self.__vertex_index.remove(vertex)
+        self.__version += 1
+        if self.__owned_out is not None:
+            self.__owned_in.discard(vertex)
+            self.__owned_out.discard(vertex)
+        if self.__listeners:
+            self.__notify("remove_vertex", vertex, outbound, inbound)
 
     def __str__(self):
         graph_str = ""
-        for key in self.__dcost:
+        for vertex1, vertex2, cost in self.iterate_edges_with_cost():
             graph_str += "Vertex1: "
-            graph_str += str(key[0])
+            graph_str += str(vertex1)
             graph_str += " Vertex2: "
-            graph_str += str(key[1])
+            graph_str += str(vertex2)
             graph_str += " The cost: "
-            graph_str += str(self.__dcost[key])
+            graph_str += str(cost)
             graph_str += '\n'
         return graph_str
 
@@ -189,116 +449,478 @@ class DirectedGraph:
         Raises exception if this edge does not exist.
         :param vertex1, vertex2: int
         """
-        if (vertex1, vertex2) in self.__dcost.keys():
-            return self.__dcost[vertex1, vertex2]
-        raise GraphException("This edge does not exist.")
+        try:
+            return self.__dout[vertex1][vertex2]
+        except KeyError:
+            raise GraphException("This edge does not exist.")
 
     def copy_graph(self):
         """
-        Returns a copy of the graph.
+        Returns a copy of the graph in O(n): both graphs share the neighbour
+        dicts and the edge order, and each one copies a dict the first time it
+        changes it.
+        The listeners are not copied.
         :param
         """
-        graph_copy = DirectedGraph(self.get_no_vertices())
-        graph_copy.__din = copy.deepcopy(self.__din)
-        graph_copy.__dout = copy.deepcopy(self.__dout)
-        graph_copy.__dcost = copy.deepcopy(self.__dcost)
+        graph_copy = DirectedGraph(0)
+        graph_copy.__din = dict(self.__din)
+        graph_copy.__dout = dict(self.__dout)
+        graph_copy.__no_edges = self.__no_edges
+        graph_copy.__edges = self.__edges
+        self.__shared_edges = graph_copy.__shared_edges = True
+        graph_copy.__vertex_index = self.__vertex_index.copy()
+        for graph in (self, graph_copy):
+            graph.__owned_in = set()
+            graph.__owned_out = set()
         return graph_copy
 
+    @staticmethod
+    @instrumented("read_from_file")
+    def read_from_file(file_name, chunk_size=1 << 20):
+        """
+        Returns the graph stored in a file, either in the text format
+        ("n m" followed by m lines "vertex1 vertex2 cost") or in the binary
+        snapshot format written by write_snapshot. Text is read and converted
+        chunk_size bytes at a time.
+        Raises exception if the file can't be read or holds an invalid graph.
+        :param file_name: str
+        :param chunk_size: int
+        """
+        from DirectedGraph.compactGraph import CompactGraph
+
+        if CompactGraph.is_snapshot(file_name):
+            return CompactGraph.load_snapshot(file_name).to_directed_graph()
+        try:
+            with open(file_name, "rb") as file:
+                chunks = DirectedGraph._read_numbers(file, chunk_size)
+                numbers = []
+                for chunk in chunks:
+                    numbers += chunk
+                    if len(numbers) >= 2:
+                        break
+                if len(numbers) < 2:
+                    raise GraphException("Invalid graph file")
+                vertices, edges = numbers[0], numbers[1]
+                graph = DirectedGraph(vertices)
+                numbers = numbers[2:]
+                while edges > 0:
+                    usable = min(len(numbers) // 3, edges) * 3
+                    graph.add_edges(zip(numbers[0:usable:3], numbers[1:usable:3], numbers[2:usable:3]))
+                    edges -= usable // 3
+                    numbers = numbers[usable:]
+                    if edges > 0:
+                        chunk = next(chunks, None)
+                        if chunk is None:
+                            raise GraphException("Invalid graph file")
+                        numbers += chunk
+        except IOError:
+            raise GraphException("Wrong file name")
+        except ValueError:
+            raise GraphException("Invalid graph file")
+        if instrumentation.active is not None:
+            instrumentation.count("vertices_loaded", graph.get_no_vertices())
+            instrumentation.count("edges_loaded", graph.get_no_edges())
+        return graph
+
+    @staticmethod
+    def _read_numbers(file, chunk_size):
+        """
+        Yields the integers of a binary file as one list per chunk, never
+        splitting a number between two chunks.
+        """
+        rest = b""
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            chunk = rest + chunk
+            tokens = chunk.split()
+            rest = b""
+            if tokens and not chunk[-1:].isspace():
+                rest = tokens.pop()
+            yield list(map(int, tokens))
+        if rest:
+            yield [int(rest)]
+
+    @instrumented("write_to_file")
+    def write_to_file(self, file_name):
+        """
+        Writes the graph to a file in the text format read by read_from_file.
+        Raises exception if the file can't be written.
+        :param file_name: str
+        """
+        try:
+            with open(file_name, "w") as file:
+                file.write(str(self.get_no_vertices()) + ' ' + str(self.get_no_edges()) + '\n')
+                file.writelines("%s %s %s\n" % edge for edge in self.iterate_edges_with_cost())
+        except IOError:
+            raise GraphException("Wrong file name")
+        instrumentation.count("edges_written", self.get_no_edges())
+
+    @instrumented("write_snapshot")
+    def write_snapshot(self, file_name):
+        """
+        Writes the graph to a file in the binary snapshot format, which
+        read_from_file maps back in without parsing.
+        Raises exception if the file can't be written.
+        :param file_name: str
+        """
+        from DirectedGraph.compactGraph import CompactGraph
+
+        CompactGraph(self).write_snapshot(file_name)
+
+    @instrumented("BFS")
     def BFS(self,s,t):
-        visited= {}
-        for i in range(len(self.iterate_vertices())):
-            visited[i]=0
-        q=queue.Queue()
-        prev={}
-        for i in range(self.get_no_vertices()):
-            prev[i]=None
-        dist={}
-        for i in range(self.get_no_vertices()):
-            dist[i]=0
-        q.put(s)
-        visited[s]=1
-        dist[s]=0
-        found=False
-        while not q.empty() and not found:
-            x=q.get()
-            for i in range(self.get_degree_out(x)):
-                y=self.__dout[x][i]
-                if visited[y]==0:
-                    prev[y]=x
-                    dist[y]=dist[x]+1
-                    q.put(y)
-                    visited[y]=1
-                    if y==t:
-                        found=True
-        return dist[t],prev
+        """
+        Returns the length of a shortest path from s to t, or None if t can't be
+        reached, and a dictionary with the previous vertex of every vertex the
+        search reached (None for s). The search stops as soon as t is reached.
+        Raises exception if s or t doesn't exist.
+        :param s, t: int
+        """
+        self.get_degree_out(s)
+        self.get_degree_out(t)
+        prev = {s: None}
+        q = deque([s])
+        found = s == t
+        while q and not found:
+            x = q.popleft()
+            for y in self.outbound_view(x):
+                if y not in prev:
+                    prev[y] = x
+                    if y == t:
+                        found = True
+                        break
+                    q.append(y)
+        if instrumentation.active is not None:
+            #every reached vertex was popped except the ones still queued and t
+            instrumentation.count("vertices_reached", len(prev))
+            instrumentation.count("vertices_popped", len(prev) - len(q) - (found and s != t))
+        if not found:
+            return None, prev
+        dist = 0
+        while t != s:
+            t = prev[t]
+            dist += 1
+        return dist, prev
+
+    @instrumented("bfs_distances")
+    def bfs_distances(self, sources):
+        """
+        Returns the length of a shortest path from the closest of the sources to
+        every vertex reachable from them and the previous vertex on that path
+        (None for the sources). Only reachable vertices are keys.
+        Raises exception if a source doesn't exist.
+        :param sources: iterable of int
+        """
+        dist = {}
+        prev = {}
+        for source in sources:
+            self.get_degree_out(source)
+            dist[source] = 0
+            prev[source] = None
+        q = deque(dist)
+        while q:
+            x = q.popleft()
+            next_dist = dist[x] + 1
+            for y in self.outbound_view(x):
+                if y not in dist:
+                    dist[y] = next_dist
+                    prev[y] = x
+                    q.append(y)
+        if instrumentation.active is not None:
+            instrumentation.count("vertices_popped", len(dist))
+            instrumentation.count("edges_scanned", sum(self.get_degree_out(x) for x in dist))
+        return dist, prev
+
+    @instrumented("bidirectional_bfs")
+    def bidirectional_bfs(self, s, t):
+        """
+        Returns the length of a shortest path from s to t and the path itself,
+        or None and an empty list if t can't be reached. Searches forward from s
+        over the outbound edges and backward from t over the inbound edges, one
+        whole level at a time of whichever frontier is smaller; only forward
+        from s if the graph has no inbound index.
+        Raises exception if s or t doesn't exist.
+        :param s, t: int
+        """
+        self.get_degree_out(s)
+        self.get_degree_out(t)
+        if s == t:
+            return 0, [s]
+        if not self.has_inbound_index():
+            dist, prev = self.BFS(s, t)
+            if dist is None:
+                return None, []
+            path = [t]
+            while path[-1] != s:
+                path.append(prev[path[-1]])
+            path.reverse()
+            return dist, path
+        prev = {s: None}
+        succ = {t: None}
+        forward = [s]
+        backward = [t]
+        while forward and backward:
+            if len(forward) <= len(backward):
+                frontier, seen, other, neighbours = forward, prev, succ, self.outbound_view
+            else:
+                frontier, seen, other, neighbours = backward, succ, prev, self.inbound_view
+            level = []
+            meeting = None
+            for x in frontier:
+                for y in neighbours(x):
+                    if y not in seen:
+                        seen[y] = x
+                        level.append(y)
+                        #every vertex of the other side is at most its depth away, so any meeting on this level is shortest
+                        if y in other and meeting is None:
+                            meeting = y
+            if frontier is forward:
+                forward = level
+            else:
+                backward = level
+            if instrumentation.active is not None:
+                instrumentation.count("vertices_popped", len(frontier))
+            if meeting is not None:
+                path = []
+                vertex = meeting
+                while vertex is not None:
+                    path.append(vertex)
+                    vertex = prev[vertex]
+                path.reverse()
+                vertex = succ[meeting]
+                while vertex is not None:
+                    path.append(vertex)
+                    vertex = succ[vertex]
+                return len(path) - 1, path
+        return None, []
 
     #LAB3
 
 
+    def vertex_index(self, compact=False):
+        """
+        Returns the VertexIndex giving every vertex its row in the matrices of
+        the graph. With compact the free indices left by removed vertices are
+        dropped first, so the indices are 0..n-1. The index must not be modified.
+        :param compact: bool
+        """
+        if compact:
+            self.__vertex_index.compact()
+        return self.__vertex_index
+
     def get_weight_matrix(self):
-        matrix=[["inf" for i in range(self.get_no_vertices())] for j in range(self.get_no_vertices())]
+        #rows and columns follow vertex_index, the matrices are n x n even after vertices were removed
+        index = self.vertex_index(compact=True)
+        matrix=[[math.inf for i in range(self.get_no_vertices())] for j in range(self.get_no_vertices())]
         for i in range(self.get_no_vertices()):
-            for j in range(self.get_no_vertices()):
-                if(i==j):
-                    matrix[i][j]=0
-                elif(self.exists_edge(i,j)):
-                    matrix[i][j]=self.__dcost[(i,j)]
-                else:
-                    matrix[i][j]=math.inf
+            matrix[i][i]=0
+        for vertex, outbound in self.__dout.items():
+            i = index.index_of(vertex)
+            for vertex2,cost in outbound.items():
+                j = index.index_of(vertex2)
+                if i!=j:
+                    matrix[i][j]=cost
         return matrix
 
+    @instrumented("matrix_multiplication")
     def matrix_multiplication(self,M1,M2):
+        instrumentation.count("matrix_cells", self.get_no_vertices() ** 3)
         matrix=M1[:]
         for i in range(self.get_no_vertices()):
             for j in range(self.get_no_vertices()):
                 for k in range(self.get_no_vertices()):
                     if (matrix[i][j] > matrix[i][k] + M2[k][j]):
                         matrix[i][j]=min(matrix[i][j],matrix[i][k]+M2[k][j])
-                        self.next[i][j] = copy.deepcopy(self.next[i][k])
+                        self.next[i][j] = self.next[i][k]
         return matrix
 
+    @instrumented("lowest_cost_tree")
+    def lowest_cost_tree(self, source):
+        """
+        Returns the lowest cost from source to every vertex reachable from it and
+        the previous vertex on each lowest cost walk, using Bellman-Ford with a
+        queue (only vertices whose cost just dropped get relaxed again).
+        Raises exception if a negative cost cycle is reachable from source.
+        :param source: int
+        """
+        #raises if source doesn't exist
+        self.get_degree_out(source)
+        n = self.get_no_vertices()
+        dist = {source: 0}
+        prev = {source: None}
+        #number of edges on the walk that currently gives dist, a walk with n edges repeats a vertex
+        length = {source: 0}
+        q = deque([source])
+        in_queue = {source}
+        popped = relaxed = 0
+        while q:
+            x = q.popleft()
+            in_queue.discard(x)
+            popped += 1
+            for y, edge_cost in self.outbound_cost_view(x):
+                cost = dist[x] + edge_cost
+                if y not in dist or cost < dist[y]:
+                    dist[y] = cost
+                    prev[y] = x
+                    length[y] = length[x] + 1
+                    relaxed += 1
+                    if length[y] >= n:
+                        raise GraphException("It has negative cost cycles!")
+                    if y not in in_queue:
+                        q.append(y)
+                        in_queue.add(y)
+        if instrumentation.active is not None:
+            instrumentation.count("vertices_popped", popped)
+            instrumentation.count("edges_relaxed", relaxed)
+        return dist, prev
+
     def lowest_cost_walk(self,vertex1,vertex2):
-        weight_matrix=self.get_weight_matrix()
-        all_multiplications=[]
-        self._next()
-        all_multiplications.append(copy.deepcopy(weight_matrix))
-        for i in range(1,self.get_no_vertices()-1):
-            all_multiplications.append(copy.deepcopy(self.matrix_multiplication(all_multiplications[i-1],weight_matrix)))
-            
-        self.validate_negative_costs(all_multiplications[-1])
         """
-        for i in range(len(weight_matrix)):
-            print(weight_matrix[i])
-            print()
-        for i in range(len(all_multiplications)):
-            for j in range(len(all_multiplications[i])):
-                print(all_multiplications[i][j])
+        Returns the lowest cost of a walk from vertex1 to vertex2 and the walk
+        itself. The cost is inf and the walk is empty if vertex2 can't be reached.
+        The lowest cost tree of vertex1 is kept until the graph is modified, so
+        later walks from vertex1 cost O(walk length).
+        Raises exception if a negative cost cycle is reachable from vertex1.
+        :param vertex1, vertex2: int
+        """
+        dist, prev = self._memo(("lowest_cost_tree", vertex1), lambda: self.lowest_cost_tree(vertex1))
+        if vertex2 not in dist:
+            return math.inf, []
+        path = [vertex2]
+        while path[-1] != vertex1:
+            path.append(prev[path[-1]])
+        path.reverse()
+        return dist[vertex2], path
+
+    @instrumented("dijkstra")
+    def dijkstra(self, vertex1, vertex2, heuristic=None):
+        """
+        Returns the lowest cost of a walk from vertex1 to vertex2 and the walk
+        itself, like lowest_cost_walk, using Dijkstra's algorithm with a heap and
+        stopping when vertex2 is settled. With a heuristic, a function giving a
+        lower bound of the cost from a vertex to vertex2, the search is A*.
+        Raises exception if a vertex doesn't exist or the graph has negative costs.
+        :param vertex1, vertex2: int
+        :param heuristic: function or None
+        """
+        return shortestPaths.dijkstra(self, vertex1, vertex2, heuristic)
 
-            print()
+    @instrumented("bidirectional_dijkstra")
+    def bidirectional_dijkstra(self, vertex1, vertex2):
+        """
+        Returns the lowest cost of a walk from vertex1 to vertex2 and the walk
+        itself, searching forward from vertex1 and backward from vertex2 at the
+        same time until the two searches meet.
+        Raises exception if a vertex doesn't exist or the graph has negative costs.
+        :param vertex1, vertex2: int
         """
-        cost=all_multiplications[-1][vertex1][vertex2]
-        path = self.get_path(vertex1,vertex2)
+        return shortestPaths.bidirectional_dijkstra(self, vertex1, vertex2)
 
-        return cost,path
+    @instrumented("dijkstra_tree")
+    def dijkstra_tree(self, source, reverse=False):
+        """
+        Returns the lowest cost from source to every vertex it reaches and the
+        previous vertex on each walk (None for source). With reverse it returns
+        the lowest costs to source and the next vertex on each walk instead.
+        Raises exception if source doesn't exist or the graph has negative costs.
+        :param source: int
+        :param reverse: bool
+        """
+        self.get_degree_out(source)
+        shortestPaths.check_costs(self)
+        return shortestPaths.search(self, source, reverse=reverse)
+
+    @instrumented("landmark_walk")
+    def landmark_walk(self, vertex1, vertex2, landmarks=8, active=3):
+        """
+        Returns the lowest cost of a walk from vertex1 to vertex2 and the walk
+        itself using A* with landmark (ALT) lower bounds, taken from the active
+        landmarks that bound the cost from vertex1 best. The landmarks and their
+        costs are computed by the first search and reused until the graph is modified.
+        Raises exception if a vertex doesn't exist or the graph has negative costs.
+        :param vertex1, vertex2: int
+        :param landmarks: int, number of landmarks
+        :param active: int
+        """
+        self.get_degree_out(vertex1)
+        self.get_degree_out(vertex2)
+        heuristic = shortestPaths.landmark_heuristic(self, vertex1, vertex2, landmarks, active)
+        return shortestPaths.dijkstra(self, vertex1, vertex2, heuristic)
+
+    @instrumented("k_lowest_cost_paths")
+    def k_lowest_cost_paths(self, vertex1, vertex2, k):
+        """
+        Returns the k lowest cost simple paths from vertex1 to vertex2 as a list
+        of (cost, path) in increasing cost, fewer if there aren't k of them,
+        using Yen's algorithm on one reverse Dijkstra tree of vertex2, which is
+        kept until the graph is modified (see kPaths).
+        Raises exception if a vertex doesn't exist or the graph has negative costs.
+        :param vertex1, vertex2: int
+        :param k: int
+        """
+        from DirectedGraph import kPaths
+
+        return kPaths.lowest_cost_paths(self, vertex1, vertex2, k)
 
     def _next(self):
+        index = self.vertex_index(compact=True)
         self.next = [[None for i in range(self.get_no_vertices())] for j in range(self.get_no_vertices())]
+        self.__next_version = self.__version
         for i in range(self.get_no_vertices()):
-            for j in range(self.get_no_vertices()):
-                if self.exists_edge(i, j):
-                    self.next[i][j] = copy.deepcopy(j)
-                elif i == j:
-                    self.next[i][j] = copy.deepcopy(j)
+            self.next[i][i] = i
+        for vertex, outbound in self.__dout.items():
+            i = index.index_of(vertex)
+            for vertex2 in outbound:
+                self.next[i][index.index_of(vertex2)] = index.index_of(vertex2)
 
     def get_path(self,v1,v2):
-        if self.next[v1][v2]==None:
+        #self.next is either a list of lists with None or a NumPy matrix with -1 where there is no walk,
+        #indexed by vertex_index as it was when it was computed; a removed vertex's index may
+        #have gone to another vertex since, so the matrix can't be used after a modification
+        if self.__next_version != self.__version:
+            raise GraphException("The graph changed since the paths were computed")
+        index = self.__vertex_index
+        i, j = index.index_of(v1), index.index_of(v2)
+        if self.next[i][j] is None or self.next[i][j] < 0:
             return []
         path = [v1]
-        while v1!=v2:
-            v1 = self.next[v1][v2]
-            path.append(copy.deepcopy(v1))
+        while i!=j:
+            i = int(self.next[i][j])
+            path.append(index.vertex_of(i))
         return path
 
+    @instrumented("all_pairs_lowest_cost")
+    def all_pairs_lowest_cost(self, method="floyd_warshall", **options):
+        """
+        Returns the lowest cost matrix of the graph as a NumPy array (inf where
+        there is no walk) and stores the next-hop matrix in self.next, so
+        get_path works afterwards, until the graph is modified. The method is "floyd_warshall", "squaring"
+        (log n min-plus products) or "blocked" (tiled Floyd-Warshall on a process
+        pool, taking the options workers and tile_size). Needs NumPy. Rows and
+        columns follow vertex_index(compact=True), so any vertices work. Both
+        matrices are read-only and kept until the graph is modified.
+        Raises exception if the graph has negative cost cycles.
+        :param method: str
+        :param options: keyword arguments of the method
+        """
+        from DirectedGraph.allPairs import METHODS
+
+        if method not in METHODS:
+            raise GraphException("Unknown all pairs method")
+
+        def compute():
+            #every method counts the matrix cells it touches
+            matrices = METHODS[method](self, **options)
+            for matrix in matrices:
+                matrix.flags.writeable = False
+            return matrices
+
+        dist, self.next = self._memo(("all_pairs_lowest_cost", method), compute)
+        self.__next_version = self.__version
+        return dist
+
     def validate_negative_costs(self,matrix):
         for i in range(self.get_no_vertices()):
             for j in range(self.get_no_vertices()):
@@ -313,58 +935,226 @@ class DirectedGraph:
         algorithm based on predecessor counters;
         if it is a DAG, finds a highest cost path between two given vertices, in O(m+n)."""
 
+    @instrumented("topological_sorting")
     def topological_sorting(self):
+        """
+        Returns the vertices in topological order, found with predecessor
+        counters, or None if the graph is not a DAG. The order is computed once
+        and reused until the graph is modified.
+        :param
+        """
+        sorted = self._memo(("topological_sorting",), self._sort_topologically)
+        if sorted is None:
+            return None
+        return list(sorted)
+
+    @instrumented("sort_topologically")
+    def _sort_topologically(self):
         sorted = []
-        q=queue.Queue()
+        q=deque()
         count = {}
-        for vertex in self.iterate_vertices():
+        for vertex in self.vertices_view():
             count[vertex] = self.get_degree_in(vertex)
             #we put the vertices with 0 inbound neighbours in the queue
             if(count[vertex]==0):
-                q.put(vertex)
-        while not q.empty():
-            vertex = q.get()
+                q.append(vertex)
+        while q:
+            vertex = q.popleft()
             sorted.append(vertex)
             #for every neighbour of vertex we decrease the count(the edges) when the count is 0 then we add it in the queue
-            for neighbour in self.iterate_outbound(vertex):
+            for neighbour in self.outbound_view(vertex):
                 count[neighbour]-=1
                 if(count[neighbour]==0):
-                    q.put(neighbour)
+                    q.append(neighbour)
 
+        instrumentation.count("vertices_popped", len(sorted))
         #it the length of the list is < than the number of vertices then the graph is not a dag
         if len(sorted) < self.get_no_vertices():
             sorted = None
 
         return sorted
 
+    @instrumented("dag_paths")
+    def dag_paths(self, source, longest=True):
+        """
+        Returns the highest cost (or the lowest cost if longest is False) of a
+        path from source to every vertex of a DAG and the previous vertex on it,
+        in O(n+m). Vertices that can't be reached cost -inf (inf for lowest
+        costs) and, like source, have -1 as previous vertex.
+        Raises exception if the graph is not a DAG or source doesn't exist.
+        :param source: int
+        :param longest: bool
+        """
+        self.get_degree_out(source)
+        sorted = self._memo(("topological_sorting",), self._sort_topologically)
+        if sorted is None:
+            raise GraphException("The graph is not a DAG")
+        return self._relax_in_order(sorted, source, longest)
+
+    def _relax_in_order(self, sorted, source, longest):
+        unreachable = -math.inf if longest else math.inf
+        dist = dict.fromkeys(sorted, unreachable)
+        previous = dict.fromkeys(sorted, -1)
+        dist[source] = 0
+        start = sorted.index(source)
+        instrumentation.count("vertices_popped", len(sorted) - start)
+        #only the vertices after source in the topological order can be reached from it
+        for x in sorted[start:]:
+            if dist[x] == unreachable:
+                continue
+            for y, cost in self.outbound_cost_view(x):
+                if (dist[x] + cost > dist[y]) if longest else (dist[x] + cost < dist[y]):
+                    dist[y] = dist[x] + cost
+                    previous[y] = x
+        return dist, previous
 
+    @instrumented("highest_cost_path")
     def highest_cost_path(self,vertex1):
-        sorted = self.topological_sorting()
-        dist={}
-        previous = {}
-        ok=False
-        #for every vertex in sorted
-        for y in sorted:
-            if ok:
-                for x in self.__din[y]:
-                    #if y is not already in the distance dictory or if the new cost of dist[x] and the cost of the edge is greated than dist[y]
-                    if y not in dist or dist[x]+self.__dcost[(x,y)]>dist[y]:
-                        #we change the distance
-                        #we change the previous of y
-                        dist[y]=dist[x] +self.__dcost[(x,y)]
-                        previous[y]=x
-            #if we didn't get yet to the starting vertex the distance will be infinite
-            else:
-                dist[y] = "inf"
-                previous[y]=-1
-            if y == vertex1:
-                dist[y]=0
-                previous[y]=-1
-                ok=True
+        """
+        Returns the highest cost of a path from vertex1 to every vertex of a DAG
+        (-inf if there is none) and the previous vertex on it (-1 for vertex1
+        and the vertices it can't reach). The result is kept until the graph is
+        modified and the dictionaries are shared, they must not be modified.
+        Raises exception if the graph is not a DAG or vertex1 doesn't exist.
+        :param vertex1: int
+        """
+        return self._memo(("dag_paths", vertex1, True), lambda: self.dag_paths(vertex1, True))
 
-        return dist,previous
+    @instrumented("k_highest_cost_paths")
+    def k_highest_cost_paths(self, vertex1, vertex2, k, longest=True):
+        """
+        Returns the k highest cost paths (lowest if longest is False) from
+        vertex1 to vertex2 of a DAG as a list of (cost, path), best first, fewer
+        if there aren't k of them, found in O(k(n+m)) over the topological order.
+        The k best costs from vertex1 to every vertex are kept until the graph is modified.
+        Raises exception if the graph is not a DAG or a vertex doesn't exist.
+        :param vertex1, vertex2: int
+        :param k: int
+        :param longest: bool
+        """
+        from DirectedGraph import kPaths
+
+        return kPaths.dag_k_paths(self, vertex1, vertex2, k, longest)
 
     def construct_path(self,path,s,t,prev):
-        if prev[t] != prev[s]:
-            self.construct_path(path, s, prev[t], prev)
-            path.append(t)
\ No newline at end of file
+        """
+        Appends to path the vertices after s on the path from s to t stored in
+        prev, as returned by highest_cost_path; appends nothing if t can't be reached.
+        :param path: list
+        :param s, t: int
+        :param prev: dict
+        """
+        vertices = []
+        while prev[t] != prev[s]:
+            vertices.append(t)
+            t = prev[t]
+        vertices.reverse()
+        path.extend(vertices)
+
+    @instrumented("strongly_connected_components")
+    def strongly_connected_components(self):
+        """
+        Returns the strongly connected components as lists of vertices, ordered
+        so that every edge between two components goes from an earlier one to a
+        later one. Uses Tarjan's algorithm without recursion, in O(n+m); the
+        result is computed once and reused until the graph is modified.
+        :param
+        """
+        components, _ = self._memo(("strongly_connected_components",), self._find_components)
+        return [list(component) for component in components]
+
+    def _find_components(self):
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in self.vertices_view():
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            #each entry is a vertex and the iterator over the neighbours it has left to visit
+            work = [(root, iter(self.outbound_view(root)))]
+            while work:
+                vertex, neighbours = work[-1]
+                for neighbour in neighbours:
+                    if neighbour not in index:
+                        index[neighbour] = low[neighbour] = len(index)
+                        stack.append(neighbour)
+                        on_stack.add(neighbour)
+                        work.append((neighbour, iter(self.outbound_view(neighbour))))
+                        break
+                    if neighbour in on_stack and index[neighbour] < low[vertex]:
+                        low[vertex] = index[neighbour]
+                else:
+                    work.pop()
+                    if work and low[vertex] < low[work[-1][0]]:
+                        low[work[-1][0]] = low[vertex]
+                    if low[vertex] == index[vertex]:
+                        component = []
+                        while True:
+                            item = stack.pop()
+                            on_stack.discard(item)
+                            component.append(item)
+                            if item == vertex:
+                                break
+                        components.append(component)
+        #Tarjan finds a component after every component it reaches
+        components.reverse()
+        component_of = {}
+        for number, component in enumerate(components):
+            for vertex in component:
+                component_of[vertex] = number
+        return components, component_of
+
+    @instrumented("condensation")
+    def condensation(self, longest=True):
+        """
+        Returns the condensation of the graph and the component of every vertex.
+        The condensation is a DAG with one vertex per strongly connected component,
+        numbered 0..k-1 in topological order as in strongly_connected_components,
+        and an edge between two components if an edge joins their vertices; its
+        cost is the highest of those costs (the lowest if longest is False).
+        Runs in O(n+m); the result is kept until the graph is modified and it
+        is shared, it must not be modified.
+        :param longest: bool
+        """
+        return self._memo(("condensation", longest), lambda: self._condense(longest))
+
+    def _condense(self, longest):
+        components, component_of = self._memo(("strongly_connected_components",), self._find_components)
+        best = max if longest else min
+        costs = {}
+        for vertex1, vertex2, cost in self.iterate_edges_with_cost():
+            edge = (component_of[vertex1], component_of[vertex2])
+            if edge[0] == edge[1]:
+                continue
+            costs[edge] = best(costs[edge], cost) if edge in costs else cost
+        condensed = DirectedGraph(len(components))
+        condensed.add_edges((vertex1, vertex2, cost) for (vertex1, vertex2), cost in costs.items())
+        return condensed, component_of
+
+    def condensed_topological_sorting(self):
+        """
+        Returns the strongly connected components in topological order of the
+        condensation; unlike topological_sorting it works on graphs with cycles.
+        :param
+        """
+        return self.strongly_connected_components()
+
+    def condensed_highest_cost_path(self, vertex1):
+        """
+        Returns the highest cost path from the component of vertex1 to every
+        component in the condensation (see condensation), which is a DAG even if
+        the graph has cycles, and the component of every vertex. The costs and
+        previous components are those of highest_cost_path on the condensation,
+        indexed by component. Runs in O(n+m).
+        Raises exception if vertex1 doesn't exist.
+        :param vertex1: int
+        """
+        self.get_degree_out(vertex1)
+        condensed, component_of = self.condensation(True)
+        dist, prev = condensed.highest_cost_path(component_of[vertex1])
+        return dist, prev, component_of
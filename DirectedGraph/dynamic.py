@@ -0,0 +1,294 @@
+"""
+Results that follow a DirectedGraph as it is modified instead of being recomputed.
+Both classes listen to the graph (DirectedGraph.add_listener) and repair only the part
+of their result the modification touches:
+DynamicTopologicalOrder keeps a topological order with the Pearce-Kelly algorithm and
+DynamicShortestPaths keeps a lowest cost tree from one source in the spirit of
+Ramalingam-Reps. Call detach when a result is no longer needed.
+"""
+import math
+from heapq import heappush, heappop
+
+from DirectedGraph.exceptions import GraphException
+
+
+class DynamicTopologicalOrder:
+    """
+    Topological order of a graph kept up to date under modifications. Adding
+    an edge (x, y) only reorders the vertices placed between y and x, and an
+    edge that closes a cycle is detected when it is added.
+    """
+    def __init__(self, graph):
+        self.__graph = graph
+        #__slots[i] is the vertex at position i (None if it was removed), __position is the inverse
+        self.__slots = []
+        self.__position = {}
+        self.__holes = 0
+        #the order is None while the graph has a cycle, stale means it has to be recomputed
+        self.__cyclic = False
+        self.__stale = True
+        graph.add_listener(self._update)
+
+    def detach(self):
+        """
+        Stops following the graph.
+        :param
+        """
+        self.__graph.remove_listener(self._update)
+
+    def __refresh(self):
+        if not self.__stale:
+            return
+        sorted = self.__graph.topological_sorting()
+        self.__cyclic = sorted is None
+        self.__slots = sorted or []
+        self.__position = {vertex: i for i, vertex in enumerate(self.__slots)}
+        self.__holes = 0
+        self.__stale = False
+
+    def is_dag(self):
+        """
+        Returns True if the graph has no cycles.
+        :param
+        """
+        self.__refresh()
+        return not self.__cyclic
+
+    def order(self):
+        """
+        Returns the vertices in topological order or None if the graph has a cycle.
+        :param
+        """
+        self.__refresh()
+        if self.__cyclic:
+            return None
+        if self.__holes:
+            return [vertex for vertex in self.__slots if vertex is not None]
+        return list(self.__slots)
+
+    def precedes(self, vertex1, vertex2):
+        """
+        Returns True if vertex1 comes before vertex2 in the order, in O(1).
+        Raises exception if the graph has a cycle or a vertex doesn't exist.
+        :param vertex1, vertex2: int
+        """
+        self.__refresh()
+        if self.__cyclic:
+            raise GraphException("The graph is not a DAG")
+        try:
+            return self.__position[vertex1] < self.__position[vertex2]
+        except KeyError:
+            raise GraphException("Vertex doesn't exist")
+
+    def dag_paths(self, source, longest=True):
+        """
+        Same as DirectedGraph.dag_paths, but walks the kept order instead of
+        sorting the graph again.
+        Raises exception if the graph is not a DAG or source doesn't exist.
+        :param source: int
+        :param longest: bool
+        """
+        self.__graph.get_degree_out(source)
+        sorted = self.order()
+        if sorted is None:
+            raise GraphException("The graph is not a DAG")
+        return self.__graph._relax_in_order(sorted, source, longest)
+
+    def _update(self, change, vertex, *arguments):
+        if change == "add_edge":
+            if not self.__stale and not self.__cyclic:
+                self.__add_edge(vertex, arguments[0])
+        elif change == "remove_edge":
+            #removing an edge keeps an order valid, but it may break the last cycle
+            if self.__cyclic:
+                self.__stale = True
+        elif change == "add_vertex":
+            if not self.__stale and not self.__cyclic:
+                self.__position[vertex] = len(self.__slots)
+                self.__slots.append(vertex)
+        elif change == "remove_vertex":
+            if self.__cyclic:
+                self.__stale = True
+            elif not self.__stale:
+                self.__slots[self.__position.pop(vertex)] = None
+                self.__holes += 1
+                if 2 * self.__holes > len(self.__slots):
+                    self.__slots = [vertex for vertex in self.__slots if vertex is not None]
+                    self.__position = {vertex: i for i, vertex in enumerate(self.__slots)}
+                    self.__holes = 0
+
+    def __add_edge(self, vertex1, vertex2):
+        position = self.__position
+        lower, upper = position[vertex2], position[vertex1]
+        if lower > upper:
+            return
+        #vertices reachable from vertex2 that are placed up to vertex1, reaching vertex1 closes a cycle
+        forward = self.__search(vertex2, self.__graph.outbound_view, lambda p: p <= upper, vertex1)
+        if forward is None:
+            self.__cyclic = True
+            self.__slots = []
+            self.__position = {}
+            self.__holes = 0
+            return
+        #vertices that reach vertex1 and are placed after vertex2
+        backward = self.__search(vertex1, self.__graph.inbound_view, lambda p: p > lower, None)
+        #the backward vertices take the first of the freed positions, keeping their relative order
+        forward.sort(key=position.__getitem__)
+        backward.sort(key=position.__getitem__)
+        positions = sorted(position[vertex] for vertex in backward + forward)
+        for i, vertex in zip(positions, backward + forward):
+            position[vertex] = i
+            self.__slots[i] = vertex
+
+    def __search(self, start, neighbours, inside, target):
+        visited = {start}
+        stack = [start]
+        while stack:
+            vertex = stack.pop()
+            for neighbour in neighbours(vertex):
+                if neighbour == target:
+                    return None
+                if neighbour not in visited and inside(self.__position[neighbour]):
+                    visited.add(neighbour)
+                    stack.append(neighbour)
+        return list(visited)
+
+
+class DynamicShortestPaths:
+    """
+    Lowest costs and walks from one source kept up to date under modifications.
+    A cheaper or new edge only relaxes the vertices whose cost drops; a dearer
+    or removed edge of the lowest cost tree only recomputes the vertices below
+    it in the tree. Negative costs are allowed; if a modification creates a
+    negative cost cycle reachable from source the queries raise until one
+    removes it.
+    """
+    def __init__(self, graph, source):
+        self.__graph = graph
+        self.__source = source
+        self.__dist, self.__prev = graph.lowest_cost_tree(source)
+        self.__stale = False
+        graph.add_listener(self._update)
+
+    def detach(self):
+        """
+        Stops following the graph.
+        :param
+        """
+        self.__graph.remove_listener(self._update)
+
+    def __refresh(self):
+        if self.__stale:
+            self.__dist, self.__prev = self.__graph.lowest_cost_tree(self.__source)
+            self.__stale = False
+
+    def tree(self):
+        """
+        Returns the lowest cost of every vertex reachable from source and the
+        previous vertex on its walk, like DirectedGraph.lowest_cost_tree. The
+        dictionaries are the kept ones, they must not be modified.
+        Raises exception if source was removed or a negative cost cycle is
+        reachable from it.
+        :param
+        """
+        self.__refresh()
+        return self.__dist, self.__prev
+
+    def walk(self, vertex):
+        """
+        Returns the lowest cost of a walk from source to vertex and the walk,
+        like DirectedGraph.lowest_cost_walk, in O(walk length).
+        Raises exception if source was removed or a negative cost cycle is
+        reachable from it.
+        :param vertex: int
+        """
+        dist, prev = self.tree()
+        if vertex not in dist:
+            return math.inf, []
+        path = [vertex]
+        while path[-1] != self.__source:
+            path.append(prev[path[-1]])
+        path.reverse()
+        return dist[vertex], path
+
+    def _update(self, change, vertex, *arguments):
+        if self.__stale:
+            return
+        if change == "add_edge":
+            self.__decrease(vertex, arguments[0], arguments[1])
+        elif change == "modify_cost":
+            vertex2, old_cost, new_cost = arguments
+            if new_cost < old_cost:
+                self.__decrease(vertex, vertex2, new_cost)
+            elif new_cost > old_cost and self.__prev.get(vertex2) == vertex:
+                self.__rebuild([vertex2])
+        elif change == "remove_edge":
+            if self.__prev.get(arguments[0]) == vertex:
+                self.__rebuild([arguments[0]])
+        elif change == "remove_vertex":
+            if vertex == self.__source:
+                self.__stale = True
+            elif vertex in self.__dist:
+                del self.__dist[vertex]
+                del self.__prev[vertex]
+                self.__rebuild([item for item in arguments[0] if self.__prev.get(item) == vertex])
+
+    def __decrease(self, vertex1, vertex2, cost):
+        dist = self.__dist
+        if vertex1 not in dist:
+            return
+        if vertex2 not in dist or dist[vertex1] + cost < dist[vertex2]:
+            dist[vertex2] = dist[vertex1] + cost
+            self.__prev[vertex2] = vertex1
+            #a negative cost cycle created by the edge goes back to vertex1 and lowers its cost
+            self.__relax([(dist[vertex2], vertex2)], vertex1)
+
+    def __rebuild(self, roots):
+        dist = self.__dist
+        prev = self.__prev
+        #the vertices below the roots in the tree lost the walk they had
+        affected = set(roots)
+        stack = list(roots)
+        while stack:
+            vertex = stack.pop()
+            for neighbour in self.__graph.outbound_view(vertex):
+                if neighbour not in affected and prev.get(neighbour) == vertex:
+                    affected.add(neighbour)
+                    stack.append(neighbour)
+        for vertex in affected:
+            del dist[vertex]
+            del prev[vertex]
+        #each one starts from its cheapest edge coming from the rest of the tree
+        heap = []
+        for vertex in affected:
+            for neighbour, cost in self.__graph.inbound_cost_view(vertex):
+                if neighbour in dist and neighbour not in affected and \
+                        (vertex not in dist or dist[neighbour] + cost < dist[vertex]):
+                    dist[vertex] = dist[neighbour] + cost
+                    prev[vertex] = neighbour
+            if vertex in dist:
+                heappush(heap, (dist[vertex], vertex))
+        self.__relax(heap, None)
+
+    def __relax(self, heap, guard):
+        #Dijkstra over the changed vertices; with negative costs a vertex may be popped again
+        dist = self.__dist
+        prev = self.__prev
+        n = self.__graph.get_no_vertices()
+        #number of edges relaxed since the walk left the heap's starting vertices, a chain of n
+        #edges repeats a vertex, so a negative cost cycle the change made reachable is left
+        #to lowest_cost_tree instead of being walked around forever
+        length = {vertex: 0 for _, vertex in heap}
+        while heap:
+            cost, vertex = heappop(heap)
+            if cost > dist[vertex]:
+                continue
+            for neighbour, edge_cost in self.__graph.outbound_cost_view(vertex):
+                if neighbour not in dist or cost + edge_cost < dist[neighbour]:
+                    length[neighbour] = length[vertex] + 1
+                    if neighbour == guard or neighbour == self.__source or length[neighbour] >= n:
+                        self.__stale = True
+                        return
+                    dist[neighbour] = cost + edge_cost
+                    prev[neighbour] = vertex
+                    heappush(heap, (dist[neighbour], neighbour))
@@ -0,0 +1,157 @@
+"""
+Seedable generators of synthetic graphs. Every generator yields (vertex1, vertex2, cost)
+triples one at a time over the vertices 0..n-1, with costs in range(max_cost), so the
+edges can go straight into DirectedGraph.add_edges or write_graph without building lists.
+"""
+import math
+import random
+from itertools import islice
+
+from DirectedGraph.exceptions import GraphException
+
+
+def _shuffled_range(size, rng):
+    """
+    Yields the numbers of range(size) in a random order with O(1) memory: a
+    4-round Feistel network permutes the numbers below the next power of 4,
+    and the ones that are not below size are skipped (at most 3 in 4).
+    :param size: int
+    :param rng: random.Random
+    """
+    half = max(1, ((size - 1).bit_length() + 1) // 2)
+    mask = (1 << half) - 1
+    keys = [rng.getrandbits(64) for _ in range(4)]
+    bits = (1 << 64) - 1
+    for index in range(1 << (2 * half)):
+        left, right = index >> half, index & mask
+        for key in keys:
+            #the round function is the splitmix64 finalizer of right ^ key
+            x = right ^ key
+            x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & bits
+            x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & bits
+            left, right = right, left ^ ((x ^ (x >> 31)) & mask)
+        value = (left << half) | right
+        if value < size:
+            yield value
+
+
+def random_edges(n, m, seed=None, max_cost=100):
+    """
+    Yields m distinct random edges without loops, chosen uniformly.
+    Raises exception if there are more than n*(n-1) edges.
+    :param n, m: int
+    :param seed: int or None
+    :param max_cost: int
+    """
+    if m > n * (n - 1):
+        raise GraphException("Too many edges")
+    rng = random.Random(seed)
+    #every index of range(n*(n-1)) is one ordered pair without loops
+    for index in islice(_shuffled_range(n * (n - 1), rng), m):
+        vertex1, vertex2 = divmod(index, n - 1)
+        if vertex2 >= vertex1:
+            vertex2 += 1
+        yield vertex1, vertex2, rng.randrange(max_cost)
+
+
+def dag_edges(n, m, seed=None, max_cost=100):
+    """
+    Yields m distinct random edges of a DAG whose topological order is a
+    random permutation of the vertices.
+    Raises exception if there are more than n*(n-1)/2 edges.
+    :param n, m: int
+    :param seed: int or None
+    :param max_cost: int
+    """
+    pairs = n * (n - 1) // 2
+    if m > pairs:
+        raise GraphException("Too many edges")
+    rng = random.Random(seed)
+    order = list(range(n))
+    rng.shuffle(order)
+    for index in islice(_shuffled_range(pairs, rng), m):
+        #the pairs (u, v), u < v, are numbered from the end: the last row has r + 1 = 1 pair, and so on
+        reverse = pairs - 1 - index
+        r = (math.isqrt(8 * reverse + 1) - 1) // 2
+        first = n - 2 - r
+        second = n - 1 - (reverse - r * (r + 1) // 2)
+        yield order[first], order[second], rng.randrange(max_cost)
+
+
+def grid_edges(rows, columns, seed=None, max_cost=100):
+    """
+    Yields the edges of a rows x columns grid where every cell is linked both
+    ways to its right and lower neighbours. Cell (r, c) is the vertex r*columns + c.
+    :param rows, columns: int
+    :param seed: int or None
+    :param max_cost: int
+    """
+    rng = random.Random(seed)
+    for row in range(rows):
+        for column in range(columns):
+            vertex = row * columns + column
+            if column + 1 < columns:
+                yield vertex, vertex + 1, rng.randrange(max_cost)
+                yield vertex + 1, vertex, rng.randrange(max_cost)
+            if row + 1 < rows:
+                yield vertex, vertex + columns, rng.randrange(max_cost)
+                yield vertex + columns, vertex, rng.randrange(max_cost)
+
+
+def grid_size(rows, columns):
+    """
+    Returns the number of edges yielded by grid_edges.
+    :param rows, columns: int
+    """
+    return 2 * (rows * (columns - 1) + columns * (rows - 1))
+
+
+def power_law_edges(n, m, seed=None, max_cost=100, exponent=2.5):
+    """
+    Yields m distinct edges without loops whose endpoints are drawn with
+    weights following a power law (Chung-Lu model), so a few hubs get most of
+    the edges and the degrees have a heavy tail with the given exponent.
+    Unlike the other generators it keeps the edges yielded so far to skip
+    repeated ones, so it needs O(n + m) memory.
+    Raises exception if there are more than n*(n-1)/2 edges.
+    :param n, m: int
+    :param seed: int or None
+    :param max_cost: int
+    :param exponent: float, greater than 2
+    """
+    if m > n * (n - 1) // 2:
+        raise GraphException("Too many edges")
+    rng = random.Random(seed)
+    cumulative = []
+    total = 0.0
+    for vertex in range(n):
+        total += (vertex + 1) ** (-1.0 / (exponent - 1))
+        cumulative.append(total)
+    labels = list(range(n))
+    rng.shuffle(labels)
+    seen = set()
+    while len(seen) < m:
+        batch = min(m - len(seen), 1 << 16)
+        sources = rng.choices(labels, cum_weights=cumulative, k=batch)
+        targets = rng.choices(labels, cum_weights=cumulative, k=batch)
+        for vertex1, vertex2 in zip(sources, targets):
+            if vertex1 != vertex2 and (vertex1, vertex2) not in seen and len(seen) < m:
+                seen.add((vertex1, vertex2))
+                yield vertex1, vertex2, rng.randrange(max_cost)
+
+
+def write_graph(file_name, n, m, edges):
+    """
+    Writes n, m and the edges to a file in the text format, without keeping
+    the edges in memory.
+    Raises exception if the file can't be written.
+    :param file_name: str
+    :param n, m: int
+    :param edges: iterable of (int, int, int)
+    """
+    try:
+        with open(file_name, "w") as file:
+            file.write(str(n) + ' ' + str(m) + '\n')
+            file.writelines("%s %s %s\n" % edge for edge in edges)
+    except IOError:
+        raise GraphException("Wrong file name")
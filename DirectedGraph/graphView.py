@@ -0,0 +1,370 @@
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+from DirectedGraph.memo import LruMemo
+
+
+class GraphView:
+    """
+    Read-only view of a graph that keeps only some of its vertices and edges
+    and can reverse the edges, without copying anything: the filters are
+    evaluated while the algorithms walk the view, so a query only pays for the
+    edges it visits. A vertex is kept if it is in vertices (when given) and
+    vertex_filter(vertex) is True (when given); an edge is kept if both its
+    vertices are and edge_filter(vertex1, vertex2, cost) is True for it as it
+    is in the underlying graph, before reversing.
+
+    The view follows later changes of the graph and the filters must give the
+    same answers while it is used. Reversing a graph without an inbound index
+    leaves the view without outbound edges.
+    """
+    def __init__(self, graph, vertices=None, vertex_filter=None, edge_filter=None, reverse=False):
+        """
+        :param graph: DirectedGraph, CompactGraph or GraphView
+        :param vertices: iterable of int or None, the vertices of an induced subgraph
+        :param vertex_filter: function or None
+        :param edge_filter: function or None
+        :param reverse: bool
+        """
+        self.__graph = graph
+        #kept in their first order, so iterating the view is deterministic
+        self.__vertices = None if vertices is None else dict.fromkeys(vertices)
+        self.__vertex_filter = vertex_filter
+        self.__edge_filter = edge_filter
+        self.__reverse = reverse
+        self.__memo = LruMemo(DirectedGraph.MEMO_SIZE)
+        self.__memo_version = graph.get_version()
+
+    @staticmethod
+    def induced(graph, vertices):
+        """
+        Returns the view of the subgraph induced by the given vertices, which
+        must exist in the graph.
+        :param graph: DirectedGraph, CompactGraph or GraphView
+        :param vertices: iterable of int
+        """
+        return GraphView(graph, vertices=vertices)
+
+    @staticmethod
+    def reversed(graph):
+        """
+        Returns the view of the graph with every edge reversed.
+        :param graph: DirectedGraph, CompactGraph or GraphView
+        """
+        return GraphView(graph, reverse=True)
+
+    def __filters_vertices(self):
+        return self.__vertices is not None or self.__vertex_filter is not None
+
+    def __filters(self):
+        return self.__filters_vertices() or self.__edge_filter is not None
+
+    def __keeps(self, vertex):
+        return (self.__vertices is None or vertex in self.__vertices) and \
+            (self.__vertex_filter is None or self.__vertex_filter(vertex))
+
+    def __check(self, vertex, message):
+        if not self.__keeps(vertex):
+            raise GraphException(message)
+
+    def __costs(self, vertex, outbound, message):
+        #the (neighbour, cost) pairs of the kept edges of vertex, in the direction of the view
+        self.__check(vertex, message)
+        graph = self.__graph
+        if outbound != self.__reverse:
+            pairs = graph.outbound_cost_view(vertex)
+        else:
+            pairs = graph.inbound_cost_view(vertex)
+        if not self.__filters():
+            return pairs
+        keeps = self.__keeps
+        edge_filter = self.__edge_filter
+        if edge_filter is None:
+            return ((neighbour, cost) for neighbour, cost in pairs if keeps(neighbour))
+        if outbound != self.__reverse:
+            return ((neighbour, cost) for neighbour, cost in pairs
+                    if keeps(neighbour) and edge_filter(vertex, neighbour, cost))
+        return ((neighbour, cost) for neighbour, cost in pairs
+                if keeps(neighbour) and edge_filter(neighbour, vertex, cost))
+
+    def __neighbours(self, vertex, outbound, message):
+        if not self.__filters():
+            graph = self.__graph
+            return graph.outbound_view(vertex) if outbound != self.__reverse else graph.inbound_view(vertex)
+        return (neighbour for neighbour, _ in self.__costs(vertex, outbound, message))
+
+    def has_inbound_index(self):
+        """
+        Returns True if the inbound edges of the view can be followed.
+        :param
+        """
+        return self.__reverse or self.__graph.has_inbound_index()
+
+    def get_version(self):
+        """
+        Returns the version of the underlying graph, which changes every time it is modified.
+        :param
+        """
+        return self.__graph.get_version()
+
+    def _memo(self, key, compute):
+        """
+        Returns the result stored for key, calling compute() to get it if the
+        underlying graph changed since it was stored or it was dropped.
+        Callers must not modify the result.
+        :param key: tuple
+        :param compute: function without parameters
+        """
+        version = self.__graph.get_version()
+        if self.__memo_version != version:
+            self.__memo.clear()
+            self.__memo_version = version
+        return self.__memo.get(key, compute)
+
+    def set_memo_size(self, size):
+        """
+        Changes the number of computed results the view keeps, 0 turns the memo off.
+        :param size: int
+        """
+        self.__memo.resize(size)
+
+    def vertices_view(self):
+        """
+        Returns an iterable of the kept vertices, evaluated while it is iterated.
+        :param
+        """
+        if not self.__filters_vertices():
+            return self.__graph.vertices_view()
+        return _KeptVertices(self)
+
+    def _iter_vertices(self):
+        if self.__vertices is not None:
+            graph = self.__graph
+            for vertex in self.__vertices:
+                #raises if the vertex is not in the graph
+                graph.get_degree_out(vertex)
+                if self.__vertex_filter is None or self.__vertex_filter(vertex):
+                    yield vertex
+        else:
+            yield from filter(self.__vertex_filter, self.__graph.vertices_view())
+
+    def iterate_vertices(self):
+        """
+        Returns a list of all the vertices of the view.
+        :param
+        """
+        return list(self.vertices_view())
+
+    def get_no_vertices(self):
+        """
+        Returns the number of vertices of the view, counted once per version of the graph.
+        :param
+        """
+        if not self.__filters_vertices():
+            return self.__graph.get_no_vertices()
+        return self._memo(("no_vertices",), lambda: sum(1 for _ in self._iter_vertices()))
+
+    def get_no_edges(self):
+        """
+        Returns the number of edges of the view, counted once per version of the graph.
+        :param
+        """
+        if not self.__filters():
+            return self.__graph.get_no_edges()
+        return self._memo(("no_edges",), lambda: sum(1 for _ in self.iter_edges()))
+
+    def exists_edge(self, vertex1, vertex2):
+        """
+        Returns True if the edge exists in the view and False if it does not.
+        Raises exception if vertex1 is not in the view.
+        :param vertex1, vertex2: int
+        """
+        return any(neighbour == vertex2 for neighbour in self.__neighbours(vertex1, True, "This edge doesn't exist"))
+
+    def return_cost(self, vertex1, vertex2):
+        """
+        Returns the cost of the edge (vertex1, vertex2).
+        Raises exception if the edge is not in the view.
+        :param vertex1, vertex2: int
+        """
+        for neighbour, cost in self.__costs(vertex1, True, "This edge does not exist."):
+            if neighbour == vertex2:
+                return cost
+        raise GraphException("This edge does not exist.")
+
+    def get_degree_in(self, vertex):
+        """
+        Return the number of kept inbound edges of a vertex, counted in O(degree) when edges are filtered.
+        Raises exception if the vertex is not in the view.
+        :param vertex: int
+        """
+        self.__check(vertex, "Vertex doesn't exist")
+        if not self.__filters():
+            graph = self.__graph
+            return graph.get_degree_out(vertex) if self.__reverse else graph.get_degree_in(vertex)
+        return sum(1 for _ in self.__costs(vertex, False, "Vertex doesn't exist"))
+
+    def get_degree_out(self, vertex):
+        """
+        Return the number of kept outbound edges of a vertex, counted in O(degree) when edges are filtered.
+        Raises exception if the vertex is not in the view.
+        :param vertex: int
+        """
+        self.__check(vertex, "Vertex doesn't exist")
+        if not self.__filters():
+            graph = self.__graph
+            return graph.get_degree_in(vertex) if self.__reverse else graph.get_degree_out(vertex)
+        return sum(1 for _ in self.__costs(vertex, True, "Vertex doesn't exist"))
+
+    def iterate_outbound(self, vertex):
+        """
+        Returns a list of the outbound neighbors of a vertex in the view.
+        Raises exception if the vertex is not in the view.
+        :param vertex: int
+        """
+        return list(self.outbound_view(vertex))
+
+    def iterate_inbound(self, vertex):
+        """
+        Returns a list of the inbound neighbors of a vertex in the view.
+        Raises exception if the vertex is not in the view.
+        :param vertex: int
+        """
+        return list(self.inbound_view(vertex))
+
+    def outbound_view(self, vertex):
+        """
+        Returns an iterable of the outbound neighbors of a vertex, filtered while it is iterated.
+        Raises exception if the vertex is not in the view.
+        :param vertex: int
+        """
+        return self.__neighbours(vertex, True, "This vertex doesn't have any outbound edges")
+
+    def inbound_view(self, vertex):
+        """
+        Returns an iterable of the inbound neighbors of a vertex, filtered while it is iterated.
+        Raises exception if the vertex is not in the view.
+        :param vertex: int
+        """
+        return self.__neighbours(vertex, False, "This vertex doesn't have any inbound edges")
+
+    def outbound_cost_view(self, vertex):
+        """
+        Returns an iterable of the (neighbor, cost) pairs of the outbound edges of a vertex in the view.
+        Raises exception if the vertex is not in the view.
+        :param vertex: int
+        """
+        return self.__costs(vertex, True, "This vertex doesn't have any outbound edges")
+
+    def inbound_cost_view(self, vertex):
+        """
+        Returns an iterable of the (neighbor, cost) pairs of the inbound edges of a vertex in the view.
+        Raises exception if the vertex is not in the view.
+        :param vertex: int
+        """
+        return self.__costs(vertex, False, "This vertex doesn't have any inbound edges")
+
+    def iterate_edges(self):
+        """
+        Returns a list of all the edges of the view, grouped by their first vertex.
+        :param
+        """
+        return list(self.iter_edges())
+
+    def iter_edges(self):
+        """
+        Yields the edges (vertex1, vertex2) of the view, grouped by their first vertex.
+        :param
+        """
+        for vertex1, vertex2, _ in self.iterate_edges_with_cost():
+            yield vertex1, vertex2
+
+    def iterate_edges_with_cost(self):
+        """
+        Yields the triples (vertex1, vertex2, cost) of the view, grouped by their first vertex.
+        :param
+        """
+        for vertex1 in self.vertices_view():
+            for vertex2, cost in self.outbound_cost_view(vertex1):
+                yield vertex1, vertex2, cost
+
+    def modify_cost(self, vertex1, vertex2, new_cost):
+        raise GraphException("The graph is read-only")
+
+    def add_edge(self, vertex1, vertex2, cost):
+        raise GraphException("The graph is read-only")
+
+    def add_vertex(self, vertex):
+        raise GraphException("The graph is read-only")
+
+    def remove_edge(self, vertex1, vertex2):
+        raise GraphException("The graph is read-only")
+
+    def remove_vertex(self, vertex):
+        raise GraphException("The graph is read-only")
+
+    def copy_graph(self):
+        """
+        Returns the view itself, a view can't be modified.
+        :param
+        """
+        return self
+
+    def to_directed_graph(self):
+        """
+        Returns a mutable DirectedGraph with the vertices, edges and costs of the view.
+        :param
+        """
+        graph = DirectedGraph(0)
+        for vertex in self.vertices_view():
+            graph.add_vertex(vertex)
+        graph.add_edges(self.iterate_edges_with_cost())
+        return graph
+
+    def __str__(self):
+        graph_str = ""
+        for vertex1, vertex2, cost in self.iterate_edges_with_cost():
+            graph_str += "Vertex1: "
+            graph_str += str(vertex1)
+            graph_str += " Vertex2: "
+            graph_str += str(vertex2)
+            graph_str += " The cost: "
+            graph_str += str(cost)
+            graph_str += '\n'
+        return graph_str
+
+    # the traversals only use the query API above, so they run unchanged on the view
+    BFS = DirectedGraph.BFS
+    bfs_distances = DirectedGraph.bfs_distances
+    bidirectional_bfs = DirectedGraph.bidirectional_bfs
+    topological_sorting = DirectedGraph.topological_sorting
+    _sort_topologically = DirectedGraph._sort_topologically
+    dag_paths = DirectedGraph.dag_paths
+    _relax_in_order = DirectedGraph._relax_in_order
+    highest_cost_path = DirectedGraph.highest_cost_path
+    k_highest_cost_paths = DirectedGraph.k_highest_cost_paths
+    lowest_cost_tree = DirectedGraph.lowest_cost_tree
+    lowest_cost_walk = DirectedGraph.lowest_cost_walk
+    dijkstra = DirectedGraph.dijkstra
+    bidirectional_dijkstra = DirectedGraph.bidirectional_dijkstra
+    dijkstra_tree = DirectedGraph.dijkstra_tree
+    landmark_walk = DirectedGraph.landmark_walk
+    k_lowest_cost_paths = DirectedGraph.k_lowest_cost_paths
+    construct_path = DirectedGraph.construct_path
+    strongly_connected_components = DirectedGraph.strongly_connected_components
+    _find_components = DirectedGraph._find_components
+    condensation = DirectedGraph.condensation
+    _condense = DirectedGraph._condense
+    condensed_topological_sorting = DirectedGraph.condensed_topological_sorting
+    condensed_highest_cost_path = DirectedGraph.condensed_highest_cost_path
+
+
+class _KeptVertices:
+    #the vertices of a view that filters them, iterable any number of times
+    def __init__(self, view):
+        self.__view = view
+
+    def __iter__(self):
+        return self.__view._iter_vertices()
+
+    def __len__(self):
+        return self.__view.get_no_vertices()
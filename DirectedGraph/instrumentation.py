@@ -0,0 +1,170 @@
+"""
+Opt-in instrumentation of the graph algorithms and of loading and writing graphs.
+
+    stats = instrumentation.enable()
+    graph.highest_cost_path(0)
+    print(stats)
+    instrumentation.disable()
+
+While enabled every instrumented call is a phase whose calls and wall time (and, with
+trace_memory, the peak of the memory it allocated) are added up per name, and the
+algorithms add counters such as vertices popped, edges relaxed and matrix cells touched.
+A callback given to enable is called after every phase. While disabled an instrumented
+call costs one extra function call and the counters are not computed at all.
+"""
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+#the Stats being filled, None while instrumentation is disabled
+active = None
+
+
+class Stats:
+    """
+    Counters and per phase totals collected while instrumentation is enabled.
+    phases maps a phase name to [calls, seconds, peak allocated bytes].
+    """
+    def __init__(self, callback=None, trace_memory=False):
+        self.counters = {}
+        self.phases = {}
+        self.trace_memory = trace_memory
+        #whether enable started tracemalloc, only then disable stops it
+        self.started_tracing = False
+        self.__callback = callback
+        #[memory when the phase started, highest memory seen] of the running phases
+        self.__memory = []
+
+    def count(self, name, amount=1):
+        """
+        Adds amount to a counter.
+        :param name: str
+        :param amount: int
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        """
+        Drops every counter and phase total.
+        :param
+        """
+        self.counters = {}
+        self.phases = {}
+
+    def as_dict(self):
+        """
+        Returns the counters and phase totals as a dictionary that can be dumped as JSON.
+        :param
+        """
+        return {"counters": dict(self.counters),
+                "phases": {name: {"calls": calls, "seconds": seconds, "peak_bytes": peak}
+                           for name, (calls, seconds, peak) in self.phases.items()}}
+
+    def _start(self):
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            #a nested phase resets the peak, so the outer one keeps what it saw so far
+            if self.__memory:
+                self.__memory[-1][1] = max(self.__memory[-1][1], peak)
+            tracemalloc.reset_peak()
+            self.__memory.append([current, current])
+        return time.perf_counter()
+
+    def _stop(self, name, start):
+        seconds = time.perf_counter() - start
+        allocated = 0
+        if self.trace_memory:
+            peak = max(self.__memory[-1][1], tracemalloc.get_traced_memory()[1])
+            allocated = peak - self.__memory.pop()[0]
+            if self.__memory:
+                self.__memory[-1][1] = max(self.__memory[-1][1], peak)
+        totals = self.phases.setdefault(name, [0, 0.0, 0])
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] = max(totals[2], allocated)
+        if self.__callback is not None:
+            self.__callback(name, seconds, allocated)
+
+    def __str__(self):
+        lines = ["%-30s %8d calls %12.6fs  peak %10d bytes" % (name, calls, seconds, peak)
+                 for name, (calls, seconds, peak) in sorted(self.phases.items())]
+        lines += ["%-30s %12d" % (name, value) for name, value in sorted(self.counters.items())]
+        return "\n".join(lines)
+
+
+def enable(callback=None, trace_memory=False):
+    """
+    Starts collecting into a new Stats and returns it. callback(name, seconds,
+    allocated_bytes) is called after every phase; trace_memory measures the
+    memory of the phases with tracemalloc, which slows them down.
+    :param callback: function or None
+    :param trace_memory: bool
+    """
+    global active
+    previous, active = active, Stats(callback, trace_memory)
+    #tracing started for a Stats that is replaced now is stopped by the next disable
+    active.started_tracing = previous is not None and previous.started_tracing
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        active.started_tracing = True
+    return active
+
+
+def disable():
+    """
+    Stops collecting and returns the Stats collected, None if it wasn't enabled.
+    tracemalloc is only stopped if enable started it.
+    """
+    global active
+    stats, active = active, None
+    if stats is not None and stats.started_tracing and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return stats
+
+
+def count(name, amount=1):
+    """
+    Adds amount to a counter of the active Stats, if there is one.
+    :param name: str
+    :param amount: int
+    """
+    if active is not None:
+        active.count(name, amount)
+
+
+@contextmanager
+def phase(name):
+    """
+    Context manager that records the block as a phase of the active Stats, if there is one.
+    :param name: str
+    """
+    stats = active
+    if stats is None:
+        yield
+        return
+    start = stats._start()
+    try:
+        yield
+    finally:
+        stats._stop(name, start)
+
+
+def instrumented(name):
+    """
+    Decorator that records every call of a function as a phase.
+    :param name: str
+    """
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            stats = active
+            if stats is None:
+                return function(*args, **kwargs)
+            start = stats._start()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats._stop(name, start)
+        return wrapper
+    return decorate
@@ -0,0 +1,186 @@
+"""
+The k best simple paths between two vertices.
+
+lowest_cost_paths is Yen's algorithm for graphs without negative costs. It computes
+the lowest cost to the target from every vertex once (one reverse Dijkstra tree, kept
+by the graph until it is modified, so queries towards the same target share it) and
+searches every deviation with A* over a GraphView of the vertices and edges it may use,
+the tree costs being an exact lower bound: the search stops at the first vertex it
+settles whose tree path finishes the deviation, usually one of the first few. A path
+only deviates from the path it was found from at or after the vertex where that one
+deviated (Lawler), so the same deviations are never searched twice.
+
+dag_paths keeps the k best costs of a path from the source to every vertex of a DAG,
+in one pass over its topological order, so the k best paths to every target are
+known after O(k(n+m)) work.
+"""
+import heapq
+
+from DirectedGraph import instrumentation, shortestPaths
+from DirectedGraph.exceptions import GraphException
+from DirectedGraph.graphView import GraphView
+
+
+def _tree_path(next_vertex, vertex):
+    path = [vertex]
+    while next_vertex[path[-1]] is not None:
+        path.append(next_vertex[path[-1]])
+    return path
+
+
+def _prefix_costs(graph, path):
+    #prefix[i] is the cost of path[:i+1]
+    prefix = [0]
+    for vertex1, vertex2 in zip(path, path[1:]):
+        prefix.append(prefix[-1] + graph.return_cost(vertex1, vertex2))
+    return prefix
+
+
+def _deviate(view, spur, removed, blocked, to_target, next_vertex):
+    #A* from spur over the view; the first settled vertex whose tree path to the target
+    #is allowed and doesn't go back through its own walk ends the search, since nothing
+    #left in the heap can cost less. Returns the cost and the path, None if there is none
+    dist = {spur: 0}
+    prev = {spur: None}
+    heap = [(to_target[spur], 0, spur)]
+    popped = 0
+    while heap:
+        _, cost, vertex = heapq.heappop(heap)
+        if cost > dist[vertex]:
+            continue
+        popped += 1
+        walk = _tree_path(prev, vertex)
+        tail = _tree_path(next_vertex, vertex)[1:]
+        if blocked.isdisjoint(tail) and (vertex != spur or tail[0] not in removed) \
+                and set(walk).isdisjoint(tail):
+            instrumentation.count("vertices_popped", popped)
+            walk.reverse()
+            return cost + to_target[vertex], walk + tail
+        for neighbour, edge_cost in view.outbound_cost_view(vertex):
+            new_cost = cost + edge_cost
+            if neighbour in to_target and (neighbour not in dist or new_cost < dist[neighbour]):
+                dist[neighbour] = new_cost
+                prev[neighbour] = vertex
+                heapq.heappush(heap, (new_cost + to_target[neighbour], new_cost, neighbour))
+    instrumentation.count("vertices_popped", popped)
+    return None
+
+
+def lowest_cost_paths(graph, source, target, k):
+    """
+    Returns the k lowest cost simple paths from source to target as a list of
+    (cost, path) in increasing cost, fewer if there aren't k of them.
+    Raises exception if a vertex doesn't exist, the graph has negative costs or
+    it has no inbound index.
+    :param graph: DirectedGraph, CompactGraph or GraphView
+    :param source, target: int
+    :param k: int
+    """
+    graph.get_degree_out(source)
+    graph.get_degree_out(target)
+    shortestPaths.check_costs(graph)
+    if k <= 0:
+        return []
+    #the lowest cost from every vertex to target and the next vertex on its walk
+    to_target, next_vertex = graph._memo(("dijkstra_tree", target, True),
+                                         lambda: shortestPaths.search(graph, target, reverse=True))
+    if source not in to_target:
+        return []
+    path = _tree_path(next_vertex, source)
+    found = [(to_target[source], path)]
+    #the next vertices of the found paths after each of their prefixes, the edges a deviation can't take
+    branches = {}
+    candidates = []
+    seen = {tuple(path)}
+    deviation = 0
+    while len(found) < k:
+        prefix = _prefix_costs(graph, path)
+        for i in range(len(path) - 1):
+            branches.setdefault(tuple(path[:i + 1]), set()).add(path[i + 1])
+        for i in range(deviation, len(path) - 1):
+            spur = path[i]
+            blocked = set(path[:i])
+            removed = branches[tuple(path[:i + 1])]
+            #every deviation enters target through one of its inbound edges, without one
+            #left the search would settle all the vertices spur reaches for nothing
+            if all(vertex in blocked or (vertex == spur and target in removed)
+                   for vertex in graph.inbound_view(target)):
+                continue
+            view = GraphView(graph, vertex_filter=lambda vertex: vertex not in blocked,
+                             edge_filter=lambda vertex1, vertex2, cost: vertex1 != spur or vertex2 not in removed)
+            deviation_path = _deviate(view, spur, removed, blocked, to_target, next_vertex)
+            if deviation_path is None:
+                continue
+            spur_cost, spur_path = deviation_path
+            candidate = path[:i] + spur_path
+            if tuple(candidate) not in seen:
+                seen.add(tuple(candidate))
+                heapq.heappush(candidates, (prefix[i] + spur_cost, len(seen), i, candidate))
+        if not candidates:
+            break
+        cost, _, deviation, path = heapq.heappop(candidates)
+        found.append((cost, path))
+    return found
+
+
+def dag_paths(graph, source, k, longest=True):
+    """
+    Returns, for every vertex a DAG reaches from source, the list of the k
+    highest costs (lowest if longest is False) of its paths from source, best
+    first, each as (cost, previous vertex, position of the rest of the path in
+    the list of the previous vertex); the entry of source is (0, None, 0).
+    Raises exception if the graph is not a DAG or source doesn't exist.
+    :param graph: DirectedGraph, CompactGraph or GraphView
+    :param source: int
+    :param k: int
+    :param longest: bool
+    """
+    graph.get_degree_out(source)
+    sorted = graph._memo(("topological_sorting",), graph._sort_topologically)
+    if sorted is None:
+        raise GraphException("The graph is not a DAG")
+    best = heapq.nlargest if longest else heapq.nsmallest
+    paths = {source: [(0, None, 0)]}
+    reaching = {}
+    start = sorted.index(source)
+    instrumentation.count("vertices_popped", len(sorted) - start)
+    #every path to x comes from a vertex before it, so its candidates are complete when x is reached
+    for x in sorted[start:]:
+        if x in reaching:
+            paths[x] = best(k, reaching.pop(x), key=lambda entry: entry[0])
+        elif x not in paths:
+            continue
+        for y, cost in graph.outbound_cost_view(x):
+            reaching.setdefault(y, []).extend(
+                (path_cost + cost, x, rank) for rank, (path_cost, _, _) in enumerate(paths[x]))
+    return paths
+
+
+def dag_k_paths(graph, source, target, k, longest=True):
+    """
+    Returns the k highest cost paths (lowest if longest is False) from source
+    to target of a DAG as a list of (cost, path), best first, fewer if there
+    aren't k of them. The costs of the paths from source are kept until the
+    graph is modified, so other targets of the same source only rebuild their paths.
+    Raises exception if the graph is not a DAG or a vertex doesn't exist.
+    :param graph: DirectedGraph, CompactGraph or GraphView
+    :param source, target: int
+    :param k: int
+    :param longest: bool
+    """
+    graph.get_degree_out(target)
+    if k <= 0:
+        return []
+    paths = graph._memo(("dag_k_paths", source, k, longest), lambda: dag_paths(graph, source, k, longest))
+    found = []
+    for rank, (cost, _, _) in enumerate(paths.get(target, ())):
+        path = [target]
+        vertex = target
+        while True:
+            _, vertex, rank = paths[vertex][rank]
+            if vertex is None:
+                break
+            path.append(vertex)
+        path.reverse()
+        found.append((cost, path))
+    return found
@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+
+
+class LruMemo:
+    """
+    Bounded store of computed results; once it holds size results, storing a
+    new one drops the least recently used. It can be shared by threads, two of
+    them asking for a missing result at once may both compute it.
+    """
+    def __init__(self, size):
+        self.__size = size
+        self.__results = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        Returns the result stored for key, calling compute() and storing its
+        result if there is none. Exceptions raised by compute are not stored.
+        :param key: hashable
+        :param compute: function without parameters
+        """
+        with self.__lock:
+            if key in self.__results:
+                self.__results.move_to_end(key)
+                return self.__results[key]
+        result = compute()
+        with self.__lock:
+            if self.__size > 0:
+                self.__results[key] = result
+                if len(self.__results) > self.__size:
+                    self.__results.popitem(last=False)
+        return result
+
+    def clear(self):
+        """
+        Drops every stored result.
+        :param
+        """
+        with self.__lock:
+            self.__results.clear()
+
+    def resize(self, size):
+        """
+        Changes the number of results kept, dropping the least recently used
+        ones if there are too many.
+        :param size: int
+        """
+        with self.__lock:
+            self.__size = size
+            while len(self.__results) > max(size, 0):
+                self.__results.popitem(last=False)
+
+    def __len__(self):
+        return len(self.__results)
@@ -0,0 +1,306 @@
+"""
+Write-ahead log of the modifications of a DirectedGraph, so small changes to a huge
+graph are saved in O(1) I/O instead of rewriting the whole file.
+
+    log = MutationLog(graph, "data/graph")      # first snapshot, then logs every change
+    graph.add_edge(1, 2, 5)                     # appended to data/graph.0.log
+    log.compact(background=True)                # folds the log into data/graph.1.snapshot
+    log.close()
+    log = MutationLog.recover("data/graph")     # last snapshot + the logs written after it
+    graph = log.graph
+
+Generation g is the snapshot base.g.snapshot and the log base.g.log of the changes made
+after it. Compacting writes base.(g+1).snapshot from a copy of the graph taken when
+base.(g+1).log is started, and only deletes the older files once the new snapshot has
+been renamed into place, so recovery after a crash at any point starts from the
+newest complete snapshot and replays the logs of its generation and the later ones.
+
+A log is LOG_MAGIC followed by RECORD records: the operation, three integers and the
+CRC32 of the first four fields. A record torn by a crash fails its CRC and is dropped,
+with everything after it, by the next recovery.
+"""
+import glob
+import os
+import re
+import struct
+import threading
+import zlib
+
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+
+LOG_MAGIC = b"DGRAPHL1"
+# operation, vertex1 (or the vertex), vertex2, cost, CRC32 of the fields before it
+RECORD = struct.Struct("=BqqqI")
+# the operation of every modification reported to the listeners and the number of its fields logged
+OPERATIONS = {"add_edge": (1, 3), "remove_edge": (2, 2), "modify_cost": (3, 3),
+              "add_vertex": (4, 1), "remove_vertex": (5, 1)}
+
+
+def _encode(name, *fields):
+    operation, count = OPERATIONS[name]
+    #modify_cost reports the old cost before the new one, only the new one is logged
+    fields = (fields[0], fields[1], fields[3]) if name == "modify_cost" else fields[:count]
+    fields += (0,) * (3 - len(fields))
+    payload = RECORD.pack(operation, *fields, 0)[:-4]
+    return payload + struct.pack("=I", zlib.crc32(payload))
+
+
+def _apply(graph, operation, vertex1, vertex2, cost):
+    if operation == 1:
+        graph.add_edge(vertex1, vertex2, cost)
+    elif operation == 2:
+        graph.remove_edge(vertex1, vertex2)
+    elif operation == 3:
+        graph.modify_cost(vertex1, vertex2, cost)
+    elif operation == 4:
+        graph.add_vertex(vertex1)
+    elif operation == 5:
+        graph.remove_vertex(vertex1)
+    else:
+        raise GraphException("Invalid mutation log")
+
+
+def replay(graph, file_name):
+    """
+    Applies the records of a log file to the graph in order and returns the
+    number of bytes of the valid records (header included), which is less than
+    the size of the file if its end was torn by a crash.
+    Raises exception if the file can't be read, is not a log or a record can't be applied.
+    :param graph: DirectedGraph
+    :param file_name: str
+    """
+    try:
+        with open(file_name, "rb") as file:
+            data = file.read()
+    except IOError:
+        raise GraphException("Wrong file name")
+    if data[:len(LOG_MAGIC)] != LOG_MAGIC:
+        raise GraphException("Invalid mutation log")
+    position = len(LOG_MAGIC)
+    while position + RECORD.size <= len(data):
+        operation, vertex1, vertex2, cost, crc = RECORD.unpack_from(data, position)
+        if zlib.crc32(data[position:position + RECORD.size - 4]) != crc:
+            break
+        try:
+            _apply(graph, operation, vertex1, vertex2, cost)
+        except KeyError:
+            #add_edge with a missing vertex
+            raise GraphException("Invalid mutation log")
+        position += RECORD.size
+    return position
+
+
+def _generations(base_name, suffix):
+    #generation -> file name of the files of base_name ending with suffix
+    pattern = re.compile(re.escape(base_name) + r"\.(\d+)\." + re.escape(suffix) + "$")
+    found = {}
+    for file_name in glob.glob(glob.escape(base_name) + ".*." + suffix):
+        match = pattern.match(file_name)
+        if match:
+            found[int(match.group(1))] = file_name
+    return found
+
+
+class MutationLog:
+    """
+    Logs every modification of a DirectedGraph, as it happens, to the log of
+    the current generation, see the module documentation.
+    """
+    def __init__(self, graph, base_name, sync=False):
+        """
+        Writes the graph as the first snapshot of base_name and logs its
+        modifications from then on.
+        Raises exception if base_name already has snapshots or logs or the files can't be written.
+        :param graph: DirectedGraph
+        :param base_name: str, path prefix of the files
+        :param sync: bool, whether every record is forced to the disk (fsync) before the modification returns
+        """
+        if _generations(base_name, "snapshot") or _generations(base_name, "log"):
+            raise GraphException("A mutation log with this name already exists")
+        self.__start(graph, base_name, sync, 0)
+        self.__write_snapshot(graph, 0)
+        self.__open_log(0, truncate=None)
+
+    def __start(self, graph, base_name, sync, generation):
+        self.graph = graph
+        self.__base_name = base_name
+        self.__sync = sync
+        self.__generation = generation
+        self.__file = None
+        self.__records = 0
+        #the first error of a write made by the listener, raised by every later call
+        self.__error = None
+        #the background compaction running and the error it ended with
+        self.__compaction = None
+        self.__compaction_error = None
+
+    @staticmethod
+    def exists(base_name):
+        """
+        Returns True if base_name has a snapshot to recover from.
+        :param base_name: str
+        """
+        return bool(_generations(base_name, "snapshot"))
+
+    @staticmethod
+    def recover(base_name, sync=False):
+        """
+        Returns the log of base_name with the graph rebuilt from its newest
+        snapshot and the logs written after it; the logged modifications of
+        the graph continue in the newest log. A record torn by a crash is cut off.
+        Raises exception if base_name has no snapshot or a file can't be used.
+        :param base_name: str
+        :param sync: bool, see MutationLog
+        """
+        snapshots = _generations(base_name, "snapshot")
+        if not snapshots:
+            raise GraphException("No snapshot to recover from")
+        generation = max(snapshots)
+        graph = DirectedGraph.read_from_file(snapshots[generation])
+        logs = sorted((number, file_name) for number, file_name in _generations(base_name, "log").items()
+                      if number >= generation)
+        valid = None
+        for number, file_name in logs:
+            valid = replay(graph, file_name)
+        log = MutationLog.__new__(MutationLog)
+        log.__start(graph, base_name, sync, logs[-1][0] if logs else generation)
+        log.__open_log(log.__generation, truncate=valid)
+        log.__remove_before(generation)
+        return log
+
+    def __name(self, generation, suffix):
+        return "%s.%d.%s" % (self.__base_name, generation, suffix)
+
+    def __open_log(self, generation, truncate):
+        #truncate is the valid length of an existing log, None to create a new one
+        try:
+            if truncate is None:
+                self.__file = open(self.__name(generation, "log"), "wb", buffering=0)
+                self.__file.write(LOG_MAGIC)
+            else:
+                self.__file = open(self.__name(generation, "log"), "r+b", buffering=0)
+                self.__file.truncate(truncate)
+                self.__file.seek(truncate)
+            if self.__sync:
+                os.fsync(self.__file.fileno())
+        except IOError:
+            raise GraphException("Wrong file name")
+        self.graph.add_listener(self._record)
+
+    def _record(self, *change):
+        """
+        Listener appending one modification of the graph to the current log.
+        """
+        if self.__error is not None:
+            return
+        try:
+            self.__file.write(_encode(*change))
+            if self.__sync:
+                os.fsync(self.__file.fileno())
+            self.__records += 1
+        except (IOError, ValueError, struct.error) as ex:
+            #listeners must not raise, the error surfaces at the next call of the log
+            self.__error = ex
+
+    def __check(self):
+        if self.__error is not None:
+            raise GraphException("The mutation log can't be written: %s" % self.__error)
+
+    def records(self):
+        """
+        Returns the number of modifications logged since the log was opened or last compacted.
+        :param
+        """
+        return self.__records
+
+    def flush(self):
+        """
+        Forces the logged modifications to the disk.
+        Raises exception if a modification couldn't be logged.
+        :param
+        """
+        self.__check()
+        os.fsync(self.__file.fileno())
+
+    def __write_snapshot(self, graph, generation):
+        #written under a temporary name and renamed, so a snapshot file is always complete
+        name = self.__name(generation, "snapshot")
+        graph.write_snapshot(name + ".tmp")
+        try:
+            with open(name + ".tmp", "rb") as file:
+                os.fsync(file.fileno())
+            os.replace(name + ".tmp", name)
+        except IOError:
+            raise GraphException("Wrong file name")
+
+    def __remove_before(self, generation):
+        for suffix in ("snapshot", "log"):
+            for number, file_name in _generations(self.__base_name, suffix).items():
+                if number < generation:
+                    os.remove(file_name)
+        for file_name in glob.glob(glob.escape(self.__base_name) + ".*.snapshot.tmp"):
+            os.remove(file_name)
+
+    def __fold(self, graph, generation):
+        self.__write_snapshot(graph, generation)
+        self.__remove_before(generation)
+
+    def compact(self, background=False):
+        """
+        Starts a new log and folds the graph as it is now into a new snapshot,
+        then deletes the older snapshot and logs. Only copying the graph (O(n))
+        happens before returning if background is True; writing the snapshot
+        runs in a thread while the graph keeps being modified and logged.
+        Raises exception if a modification couldn't be logged or a file can't be written.
+        :param background: bool
+        """
+        self.__check()
+        self.wait()
+        self.graph.remove_listener(self._record)
+        self.__file.close()
+        graph = self.graph.copy_graph()
+        self.__generation += 1
+        self.__open_log(self.__generation, truncate=None)
+        self.__records = 0
+        if background:
+            self.__compaction = threading.Thread(target=self.__run_compaction, args=(graph, self.__generation))
+            self.__compaction.start()
+        else:
+            self.__fold(graph, self.__generation)
+
+    def __run_compaction(self, graph, generation):
+        try:
+            self.__fold(graph, generation)
+        except (GraphException, OSError) as ex:
+            #the previous snapshot and logs are still there, so nothing is lost
+            self.__compaction_error = ex
+
+    def wait(self):
+        """
+        Waits for a background compaction to finish.
+        Raises exception if it failed.
+        :param
+        """
+        if self.__compaction is not None:
+            self.__compaction.join()
+            self.__compaction = None
+        error, self.__compaction_error = self.__compaction_error, None
+        if error is not None:
+            raise GraphException("The compaction failed: %s" % error)
+        self.__check()
+
+    def close(self):
+        """
+        Waits for a background compaction, stops logging the modifications of
+        the graph and closes the log.
+        Raises exception if a modification couldn't be logged.
+        :param
+        """
+        try:
+            self.wait()
+        finally:
+            self.graph.remove_listener(self._record)
+            if self.__sync:
+                os.fsync(self.__file.fileno())
+            self.__file.close()
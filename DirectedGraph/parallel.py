@@ -0,0 +1,119 @@
+"""
+Answers large batches of (source, target) queries on a process pool. The graph is
+copied once into shared memory in the snapshot format and every worker views it as a
+CompactGraph, so nothing but the queries and the answers is pickled. The queries are
+grouped by source and each source is solved once for all its targets.
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from DirectedGraph.compactGraph import CompactGraph
+from DirectedGraph.exceptions import GraphException
+
+# the graph viewed by a worker process, set by _attach
+_graph = None
+_memory = None
+
+
+def _attach(name):
+    global _graph, _memory
+    _memory = shared_memory.SharedMemory(name=name)
+    _graph = CompactGraph.from_buffer(_memory.buf)
+
+
+def _path(prev, source, target):
+    path = [target]
+    while path[-1] != source:
+        path.append(prev[path[-1]])
+    path.reverse()
+    return path
+
+
+def solve_source(graph, kind, source, targets):
+    """
+    Returns the answers from source to every target after a single run of the
+    single source algorithm of the given kind:
+    "bfs" answers (distance, path) like bidirectional_bfs,
+    "lowest-cost" answers (cost, walk) like lowest_cost_walk,
+    "longest-path" answers (cost, path) of a highest cost path in a DAG.
+    Raises exception if a vertex doesn't exist or the algorithm fails.
+    :param graph: DirectedGraph or CompactGraph
+    :param kind: str
+    :param source: int
+    :param targets: list of int
+    """
+    answers = []
+    if kind == "bfs":
+        dist, prev = graph.bfs_distances([source])
+        for target in targets:
+            graph.get_degree_out(target)
+            if target in dist:
+                answers.append((dist[target], _path(prev, source, target)))
+            else:
+                answers.append((None, []))
+    elif kind == "lowest-cost":
+        dist, prev = graph.lowest_cost_tree(source)
+        for target in targets:
+            graph.get_degree_out(target)
+            if target in dist:
+                answers.append((dist[target], _path(prev, source, target)))
+            else:
+                answers.append((math.inf, []))
+    elif kind == "longest-path":
+        dist, prev = graph.dag_paths(source, True)
+        for target in targets:
+            if target not in dist:
+                raise GraphException("Vertex doesn't exist")
+            if dist[target] == -math.inf:
+                answers.append((-math.inf, []))
+            else:
+                answers.append((dist[target], _path(prev, source, target)))
+    else:
+        raise GraphException("Unknown query kind")
+    return answers
+
+
+def _solve_in_worker(task):
+    kind, source, targets = task
+    return solve_source(_graph, kind, source, targets)
+
+
+def batch_queries(graph, pairs, kind="bfs", workers=None):
+    """
+    Returns the answers to every (source, target) pair, in the order of pairs,
+    spreading the distinct sources over a pool of worker processes that share
+    the graph in read-only memory. See solve_source for the answers.
+    Raises exception if a vertex doesn't exist or an algorithm fails.
+    :param graph: DirectedGraph or CompactGraph
+    :param pairs: list of (int, int)
+    :param kind: str, "bfs", "lowest-cost" or "longest-path"
+    :param workers: int, number of processes, os.cpu_count() by default
+    """
+    targets = {}
+    for source, target in pairs:
+        targets.setdefault(source, []).append(target)
+    tasks = [(kind, source, source_targets) for source, source_targets in targets.items()]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+
+    if workers <= 1:
+        solved = [solve_source(graph, *task) for task in tasks]
+    else:
+        if not isinstance(graph, CompactGraph):
+            graph = CompactGraph(graph)
+        memory = shared_memory.SharedMemory(create=True, size=max(1, graph.snapshot_size()))
+        try:
+            graph.write_snapshot_to_buffer(memory.buf)
+            with ProcessPoolExecutor(workers, initializer=_attach, initargs=(memory.name,)) as executor:
+                solved = list(executor.map(_solve_in_worker, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+        finally:
+            memory.close()
+            memory.unlink()
+
+    answers = {}
+    for (_, source, source_targets), source_answers in zip(tasks, solved):
+        answers[source] = iter(source_answers)
+    return [next(answers[source]) for source, _ in pairs]
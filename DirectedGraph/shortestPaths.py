@@ -0,0 +1,219 @@
+"""
+Point-to-point lowest cost searches for graphs without negative costs: Dijkstra with a
+binary heap (stale heap entries are skipped instead of decreased), bidirectional Dijkstra
+over the inbound edges, and A* with a caller's heuristic or landmark (ALT) lower bounds.
+Every search stops as soon as the target is settled. The functions only use the query
+API, so they work on DirectedGraph and CompactGraph alike.
+"""
+import math
+from heapq import heappush, heappop
+
+from DirectedGraph import instrumentation
+from DirectedGraph.exceptions import GraphException
+
+
+def check_costs(graph):
+    """
+    Raises exception if the graph has a negative cost; the answer is kept until
+    the graph is modified.
+    :param graph: DirectedGraph or CompactGraph
+    """
+    negative = graph._memo(("negative_costs",),
+                           lambda: any(cost < 0 for _, _, cost in graph.iterate_edges_with_cost()))
+    if negative:
+        raise GraphException("Negative costs are not allowed")
+
+
+def _walk(prev, target):
+    path = [target]
+    while prev[path[-1]] is not None:
+        path.append(prev[path[-1]])
+    path.reverse()
+    return path
+
+
+def search(graph, source, target=None, heuristic=None, reverse=False):
+    """
+    Returns the lowest cost of the vertices settled from source and the previous
+    vertex on their walks (None for source). Stops once target is settled, or
+    settles every reachable vertex if target is None. heuristic(vertex) must not
+    overestimate the cost from vertex to target and may return inf for vertices
+    that can't reach it. With reverse the inbound edges are followed, giving the
+    costs towards source.
+    :param graph: DirectedGraph or CompactGraph
+    :param source: int
+    :param target: int or None
+    :param heuristic: function or None
+    :param reverse: bool
+    """
+    neighbours = graph.inbound_cost_view if reverse else graph.outbound_cost_view
+    dist = {source: 0}
+    prev = {source: None}
+    heap = [(0, 0, source)]
+    popped = 0
+    while heap:
+        _, cost, vertex = heappop(heap)
+        if cost > dist[vertex]:
+            continue
+        if vertex == target:
+            break
+        popped += 1
+        for neighbour, edge_cost in neighbours(vertex):
+            new_cost = cost + edge_cost
+            if neighbour not in dist or new_cost < dist[neighbour]:
+                estimate = new_cost
+                if heuristic is not None:
+                    estimate += heuristic(neighbour)
+                    if estimate == math.inf:
+                        continue
+                dist[neighbour] = new_cost
+                prev[neighbour] = vertex
+                heappush(heap, (estimate, new_cost, neighbour))
+    if instrumentation.active is not None:
+        instrumentation.count("vertices_popped", popped)
+        instrumentation.count("vertices_reached", len(dist))
+    return dist, prev
+
+
+def dijkstra(graph, source, target, heuristic=None):
+    """
+    Returns the lowest cost of a walk from source to target and the walk, (inf, [])
+    if target can't be reached. With a heuristic the search is A*.
+    Raises exception if a vertex doesn't exist or a cost is negative.
+    :param graph: DirectedGraph or CompactGraph
+    :param source, target: int
+    :param heuristic: function or None
+    """
+    graph.get_degree_out(source)
+    graph.get_degree_out(target)
+    check_costs(graph)
+    dist, prev = search(graph, source, target, heuristic)
+    if target not in dist:
+        return math.inf, []
+    return dist[target], _walk(prev, target)
+
+
+def bidirectional_dijkstra(graph, source, target):
+    """
+    Returns the lowest cost of a walk from source to target and the walk, (inf, [])
+    if target can't be reached. Searches forward from source and backward from
+    target, always growing the side with the cheaper next vertex, and stops when
+    no walk through the unsettled vertices can beat the best one found. Graphs
+    without an inbound index are only searched forward.
+    Raises exception if a vertex doesn't exist or a cost is negative.
+    :param graph: DirectedGraph or CompactGraph
+    :param source, target: int
+    """
+    if not graph.has_inbound_index():
+        return dijkstra(graph, source, target)
+    graph.get_degree_out(source)
+    graph.get_degree_out(target)
+    check_costs(graph)
+    sides = [({source: 0}, {source: None}, [(0, source)], graph.outbound_cost_view),
+             ({target: 0}, {target: None}, [(0, target)], graph.inbound_cost_view)]
+    best = 0 if source == target else math.inf
+    meeting = source
+    popped = 0
+    while sides[0][2] and sides[1][2] and sides[0][2][0][0] + sides[1][2][0][0] < best:
+        side = 0 if sides[0][2][0][0] <= sides[1][2][0][0] else 1
+        dist, prev, heap, neighbours = sides[side]
+        other = sides[1 - side][0]
+        cost, vertex = heappop(heap)
+        if cost > dist[vertex]:
+            continue
+        popped += 1
+        for neighbour, edge_cost in neighbours(vertex):
+            new_cost = cost + edge_cost
+            if neighbour not in dist or new_cost < dist[neighbour]:
+                dist[neighbour] = new_cost
+                prev[neighbour] = vertex
+                heappush(heap, (new_cost, neighbour))
+                if neighbour in other and new_cost + other[neighbour] < best:
+                    best = new_cost + other[neighbour]
+                    meeting = neighbour
+    if instrumentation.active is not None:
+        instrumentation.count("vertices_popped", popped)
+    if best == math.inf:
+        return math.inf, []
+    path = _walk(sides[0][1], meeting)
+    backward = _walk(sides[1][1], meeting)
+    backward.reverse()
+    return best, path + backward[1:]
+
+
+def landmarks(graph, count):
+    """
+    Returns up to count landmarks with the lowest costs from and to each of them,
+    as (landmark, from_landmark, to_landmark) triples. The first landmark is the
+    first vertex and each next one is the vertex whose lowest cost from the
+    chosen landmarks is the highest, which spreads them over the graph.
+    The landmarks are chosen once and reused until the graph is modified.
+    Raises exception if a cost is negative.
+    :param graph: DirectedGraph or CompactGraph
+    :param count: int
+    """
+    check_costs(graph)
+
+    def choose():
+        tables = []
+        #lowest cost from the chosen landmarks to every vertex they reach
+        nearest = {}
+        candidate = next(iter(graph.vertices_view()), None)
+        while candidate is not None and len(tables) < count:
+            from_landmark = search(graph, candidate)[0]
+            to_landmark = search(graph, candidate, reverse=True)[0]
+            tables.append((candidate, from_landmark, to_landmark))
+            for vertex, cost in from_landmark.items():
+                if vertex not in nearest or cost < nearest[vertex]:
+                    nearest[vertex] = cost
+            candidate = max(nearest, key=nearest.__getitem__)
+            if nearest[candidate] == 0:
+                candidate = None
+        return tables
+
+    return graph._memo(("landmarks", count), choose)
+
+
+def _landmark_bound(from_landmark, to_landmark, landmark_to_target, target_to_landmark, vertex):
+    #lower bound of the cost from vertex to target given by one landmark, None for unknown costs
+    bound = 0
+    landmark_to_vertex = from_landmark.get(vertex)
+    if landmark_to_vertex is not None:
+        #a landmark that reaches vertex but not target proves vertex can't reach target
+        if landmark_to_target is None:
+            return math.inf
+        bound = landmark_to_target - landmark_to_vertex
+    if target_to_landmark is not None:
+        vertex_to_landmark = to_landmark.get(vertex)
+        if vertex_to_landmark is None:
+            return math.inf
+        if vertex_to_landmark - target_to_landmark > bound:
+            bound = vertex_to_landmark - target_to_landmark
+    return bound
+
+
+def landmark_heuristic(graph, source, target, count=8, active=3):
+    """
+    Returns a heuristic for A* from source towards target built from the
+    landmarks of the graph with the triangle inequality: the cost from v to target
+    is at least cost(L, target) - cost(L, v) and cost(v, L) - cost(target, L)
+    for every landmark L. Only the active landmarks giving the best bounds at
+    source are used, and the bound of every vertex is computed once.
+    Raises exception if a cost is negative.
+    :param graph: DirectedGraph or CompactGraph
+    :param source, target: int
+    :param count: int, number of landmarks of the graph
+    :param active: int, number of landmarks used by the search
+    """
+    tables = [(from_landmark, to_landmark, from_landmark.get(target), to_landmark.get(target))
+              for _, from_landmark, to_landmark in landmarks(graph, count)]
+    tables.sort(key=lambda table: _landmark_bound(*table, source), reverse=True)
+    tables = tables[:active]
+    known = {}
+
+    def heuristic(vertex):
+        if vertex not in known:
+            known[vertex] = max([_landmark_bound(*table, vertex) for table in tables], default=0)
+        return known[vertex]
+
+    return heuristic
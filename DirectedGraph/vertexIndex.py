@@ -0,0 +1,168 @@
+from DirectedGraph.exceptions import GraphException
+
+
+class VertexIndex:
+    """
+    Gives every vertex of a graph a dense index, so per vertex state can live in
+    flat arrays and matrices whatever the vertices are. The index of a removed
+    vertex goes to a free list and is given to the next vertex added; compact
+    renumbers the vertices so that no index is free.
+    While the vertices are exactly 0..n-1 with every vertex its own index,
+    nothing but n is stored.
+    """
+    def __init__(self, n=0):
+        """
+        Creates the index of the vertices 0..n-1.
+        :param n: int
+        """
+        self.__count = n
+        #__vertices[i] is the vertex with index i (None for a free index) and __index the
+        #reverse mapping; both are None while every vertex is its own index
+        self.__vertices = None
+        self.__index = None
+        self.__free = []
+
+    def __len__(self):
+        return self.__count
+
+    def __contains__(self, vertex):
+        if self.__index is None:
+            return isinstance(vertex, int) and 0 <= vertex < self.__count
+        return vertex in self.__index
+
+    def is_identity(self):
+        """
+        Returns True if the vertices are 0..n-1 and every vertex is its own index.
+        :param
+        """
+        return self.__index is None
+
+    def capacity(self):
+        """
+        Returns the number of indices in use or free, the length flat arrays indexed by it need.
+        :param
+        """
+        return self.__count + len(self.__free)
+
+    def free_count(self):
+        """
+        Returns the number of free indices.
+        :param
+        """
+        return len(self.__free)
+
+    def index_of(self, vertex):
+        """
+        Returns the index of a vertex.
+        Raises exception if the vertex doesn't exist.
+        :param vertex: int
+        """
+        if self.__index is None:
+            if isinstance(vertex, int) and 0 <= vertex < self.__count:
+                return vertex
+        elif vertex in self.__index:
+            return self.__index[vertex]
+        raise GraphException("Vertex doesn't exist")
+
+    def vertex_of(self, index):
+        """
+        Returns the vertex with the given index.
+        Raises exception if the index is not in use.
+        :param index: int
+        """
+        if self.__vertices is None:
+            if 0 <= index < self.__count:
+                return index
+        elif 0 <= index < len(self.__vertices) and self.__vertices[index] is not None:
+            return self.__vertices[index]
+        raise GraphException("Index not in use")
+
+    def vertices(self):
+        """
+        Returns the list of the vertices ordered by index, None for the free indices.
+        :param
+        """
+        if self.__vertices is None:
+            return list(range(self.__count))
+        return list(self.__vertices)
+
+    def __materialize(self):
+        self.__vertices = list(range(self.__count))
+        self.__index = {vertex: vertex for vertex in self.__vertices}
+
+    def add(self, vertex):
+        """
+        Gives a new vertex the most recently freed index, or the next unused one,
+        and returns it.
+        Raises exception if the vertex already has an index.
+        :param vertex: int
+        """
+        if vertex in self:
+            raise GraphException("This vertex already exists")
+        if self.__index is None:
+            if vertex == self.__count:
+                self.__count += 1
+                return vertex
+            self.__materialize()
+        index = self.__free.pop() if self.__free else len(self.__vertices)
+        if index == len(self.__vertices):
+            self.__vertices.append(vertex)
+        else:
+            self.__vertices[index] = vertex
+        self.__index[vertex] = index
+        self.__count += 1
+        return index
+
+    def remove(self, vertex):
+        """
+        Frees the index of a vertex and returns it.
+        Raises exception if the vertex doesn't exist.
+        :param vertex: int
+        """
+        index = self.index_of(vertex)
+        if self.__index is None:
+            if index == self.__count - 1:
+                self.__count -= 1
+                return index
+            self.__materialize()
+        del self.__index[vertex]
+        self.__vertices[index] = None
+        self.__free.append(index)
+        self.__count -= 1
+        if not self.__count:
+            self.__vertices = self.__index = None
+            self.__free = []
+        return index
+
+    def compact(self):
+        """
+        Renumbers the vertices 0..n-1 keeping their order, so no index is free,
+        and returns the list of the new index of every old one (None for the
+        free ones), or None if nothing moved.
+        :param
+        """
+        if not self.__free:
+            return None
+        moved = [None] * len(self.__vertices)
+        vertices = [vertex for vertex in self.__vertices if vertex is not None]
+        for new, vertex in enumerate(vertices):
+            moved[self.__index[vertex]] = new
+        self.__free = []
+        if vertices == list(range(len(vertices))):
+            self.__vertices = self.__index = None
+        else:
+            self.__vertices = vertices
+            self.__index = {vertex: index for index, vertex in enumerate(vertices)}
+        return moved
+
+    def copy(self):
+        """
+        Returns an independent copy of the index.
+        :param
+        """
+        index_copy = VertexIndex(self.__count)
+        if self.__index is not None:
+            index_copy.__vertices = list(self.__vertices)
+            index_copy.__index = dict(self.__index)
+            index_copy.__free = list(self.__free)
+        return index_copy
@@ -0,0 +1,52 @@
+"""
+Loads a graph once and answers a stream of queries without the interactive menu.
+
+    python batch.py graph10k.txt queries.txt > answers.jsonl
+    echo "bfs 0 9999" | python batch.py graph.snapshot --read-only
+    python batch.py huge.txt queries.txt --snapshot huge.snapshot --no-inbound
+
+One query per line: bfs s t, lowest-cost s t, dijkstra s t, topo, scc, longest-path s t,
+k-paths s t k, k-longest-paths s t k, reach v, khop v k, degree v, outbound v, inbound v, edge u v, add-edge u v c, remove-edge u v, modify-cost u v c.
+Every answer is written as one JSON line. --snapshot converts a text graph to a
+snapshot file without loading it in memory and answers the queries on the mapped
+snapshot, so graphs larger than the memory can be queried.
+"""
+import argparse
+import sys
+
+from DirectedGraph.exceptions import GraphException
+from menu.batch import QueryRunner, load_graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer graph queries as JSON lines.")
+    parser.add_argument("graph", help="text or snapshot graph file")
+    parser.add_argument("queries", nargs="*", help="query files, standard input if there are none")
+    parser.add_argument("--read-only", action="store_true",
+                        help="use the compact read-only graph (no add-edge/remove-edge/modify-cost)")
+    parser.add_argument("--output", help="write the answers to this file instead of standard output")
+    parser.add_argument("--snapshot", help="convert a text graph to this snapshot file without loading it "
+                                           "and answer on the mapped snapshot (read-only)")
+    parser.add_argument("--no-inbound", action="store_true",
+                        help="leave the inbound index out of the snapshot (halves it, no inbound queries)")
+    args = parser.parse_args()
+
+    try:
+        graph = load_graph(args.graph, args.read_only, args.snapshot, not args.no_inbound)
+    except GraphException as ex:
+        sys.exit(str(ex))
+    runner = QueryRunner(graph)
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        if not args.queries:
+            runner.run_stream(sys.stdin, output)
+        for file_name in args.queries:
+            with open(file_name) as queries:
+                runner.run_stream(queries, output)
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
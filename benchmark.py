@@ -0,0 +1,235 @@
+"""
+Benchmarks the graph operations on synthetic graphs of increasing size.
+
+    python benchmark.py --sizes 1000 10000 100000 --kind random --output new.json
+    python benchmark.py --sizes 1000 10000 100000 --kind random --compare new.json
+
+Every operation is timed --repeat times (best and median wall time are kept) and run
+once more under tracemalloc for its peak memory. --output saves the results as JSON and
+--compare prints them next to a saved run, exiting with 1 if an operation got slower
+than --tolerance (and --min-time) allows.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from DirectedGraph.compactGraph import CompactGraph
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.dynamic import DynamicShortestPaths
+from DirectedGraph.exceptions import GraphException
+from DirectedGraph.generators import random_edges, dag_edges, grid_edges, grid_size, power_law_edges, write_graph
+
+QUERIES = 20
+MUTATIONS = 1000
+
+
+def generate(kind, n, degree, seed):
+    """
+    Returns the number of vertices, the number of edges and a generator of
+    the edges of a synthetic graph.
+    """
+    if kind == "grid":
+        side = max(2, math.isqrt(n))
+        return side * side, grid_size(side, side), grid_edges(side, side, seed)
+    m = min(degree * n, n * (n - 1) // 2)
+    if kind == "dag":
+        return n, m, dag_edges(n, m, seed)
+    if kind == "powerlaw":
+        return n, m, power_law_edges(n, m, seed)
+    return n, m, random_edges(n, m, seed)
+
+
+def measure(setup, operation, repeat):
+    """
+    Returns the best and median time of operation(setup()) over repeat runs and
+    the peak memory allocated by one more run. setup is not timed.
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        operation(state)
+        times.append(time.perf_counter() - start)
+    state = setup()
+    tracemalloc.start()
+    operation(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), statistics.median(times), peak
+
+
+def invalidate(graph):
+    """
+    Modifies the graph without changing it, so memoised results are recomputed.
+    """
+    for vertex1, vertex2, cost in graph.iterate_edges_with_cost():
+        graph.modify_cost(vertex1, vertex2, cost)
+        return
+
+
+def mutate(graph, rng):
+    vertices = graph.iterate_vertices()
+    for _ in range(MUTATIONS):
+        vertex1, vertex2 = rng.choice(vertices), rng.choice(vertices)
+        try:
+            if graph.exists_edge(vertex1, vertex2):
+                if rng.random() < 0.5:
+                    graph.remove_edge(vertex1, vertex2)
+                else:
+                    graph.modify_cost(vertex1, vertex2, rng.randrange(100))
+            elif vertex1 != vertex2:
+                graph.add_edge(vertex1, vertex2, rng.randrange(100))
+        except GraphException:
+            pass
+
+
+def run_size(kind, size, degree, seed, repeat, directory):
+    """
+    Returns the results of every operation on a graph of the given kind and size.
+    """
+    results = []
+    n, m, edges = generate(kind, size, degree, seed)
+    text_file = os.path.join(directory, "%s_%d.txt" % (kind, n))
+    snapshot_file = os.path.join(directory, "%s_%d.snapshot" % (kind, n))
+    write_graph(text_file, n, m, edges)
+    graph = DirectedGraph.read_from_file(text_file)
+    graph.write_snapshot(snapshot_file)
+    dag_n, dag_m, edges = generate("dag", n, max(1, m // max(1, n)), seed)
+    dag = DirectedGraph(dag_n)
+    dag.add_edges(edges)
+
+    rng = random.Random(seed)
+    vertices = graph.iterate_vertices()
+    pairs = [(rng.choice(vertices), rng.choice(vertices)) for _ in range(QUERIES)]
+
+    def record(operation, setup, run):
+        best, median, peak = measure(setup, run, repeat)
+        results.append({"kind": kind, "n": n, "m": m, "operation": operation,
+                        "best": best, "median": median, "peak_bytes": peak})
+        print("%-10s n=%-9d m=%-10d %-26s best %10.4fs  median %10.4fs  peak %8.1f MiB"
+              % (kind, n, m, operation, best, median, peak / 2 ** 20), flush=True)
+
+    record("load_text", lambda: text_file, DirectedGraph.read_from_file)
+    record("load_snapshot", lambda: snapshot_file, DirectedGraph.read_from_file)
+    record("map_snapshot", lambda: snapshot_file, CompactGraph.load_snapshot)
+    record("build_snapshot", lambda: text_file,
+           lambda name: CompactGraph.build_snapshot(name, os.path.join(directory, "built.snapshot")))
+    record("bfs x%d" % QUERIES, lambda: graph,
+           lambda g: [g.BFS(s, t) for s, t in pairs])
+    record("bidirectional_bfs x%d" % QUERIES, lambda: graph,
+           lambda g: [g.bidirectional_bfs(s, t) for s, t in pairs])
+    def fresh_graph():
+        invalidate(graph)
+        return graph
+
+    def fresh_dag():
+        invalidate(dag)
+        return dag
+
+    record("lowest_cost_walk x5", fresh_graph,
+           lambda g: [g.lowest_cost_walk(s, t) for s, t in pairs[:5]])
+    record("lowest_cost_walk cached", lambda: graph,
+           lambda g: [g.lowest_cost_walk(s, t) for s, t in pairs[:5]])
+    record("dijkstra x%d" % QUERIES, lambda: graph,
+           lambda g: [g.dijkstra(s, t) for s, t in pairs])
+    record("bidirectional_dijkstra x%d" % QUERIES, lambda: graph,
+           lambda g: [g.bidirectional_dijkstra(s, t) for s, t in pairs])
+    record("landmark_walk x%d" % QUERIES, lambda: graph,
+           lambda g: [g.landmark_walk(s, t) for s, t in pairs])
+    record("k_lowest_cost_paths k=10 x5", fresh_graph,
+           lambda g: [g.k_lowest_cost_paths(s, t, 10) for s, t in pairs[:5]])
+
+    record("bfs_distances", lambda: graph, lambda g: g.bfs_distances([pairs[0][0]]))
+    try:
+        from DirectedGraph import analytics
+    except ImportError:
+        print("%-10s n=%-9d m=%-10d analytics_* skipped, NumPy is not installed" % (kind, n, m), flush=True)
+    else:
+        record("analytics_csr", fresh_graph, lambda g: analytics.adjacency(g, True))
+        record("analytics_reachable", lambda: graph, lambda g: analytics.reachable(g, [pairs[0][0]]))
+        record("analytics_level_histograms", lambda: graph,
+               lambda g: analytics.level_histograms(g, [s for s, _ in pairs]))
+
+    record("topological_sorting", fresh_dag, lambda g: g.topological_sorting())
+    record("highest_cost_path", fresh_dag, lambda g: g.highest_cost_path(g.topological_sorting()[0]))
+    record("k_highest_cost_paths k=10", fresh_dag,
+           lambda g: g.k_highest_cost_paths(g.topological_sorting()[0], g.topological_sorting()[-1], 10))
+    record("copy_graph", lambda: graph, lambda g: g.copy_graph())
+    record("mutation x%d" % MUTATIONS, lambda: (graph.copy_graph(), random.Random(seed)),
+           lambda state: mutate(*state))
+
+    def dynamic_setup():
+        copy = graph.copy_graph()
+        return copy, DynamicShortestPaths(copy, pairs[0][0]), random.Random(seed)
+
+    def dynamic_run(state):
+        copy, paths, rng = state
+        mutate(copy, rng)
+        paths.tree()
+
+    record("dynamic_sssp x%d" % MUTATIONS, dynamic_setup, dynamic_run)
+    return results
+
+
+def compare(results, baseline_file, tolerance, min_time):
+    """
+    Prints every result next to the matching one of a saved run and returns
+    True if none of them is slower than the tolerance allows. Slowdowns below
+    min_time seconds are treated as noise.
+    """
+    with open(baseline_file) as file:
+        baseline = json.load(file)
+    previous = {(r["kind"], r["n"], r["m"], r["operation"]): r for r in baseline["results"]}
+    ok = True
+    for result in results:
+        old = previous.get((result["kind"], result["n"], result["m"], result["operation"]))
+        if old is None:
+            continue
+        ratio = result["best"] / old["best"] if old["best"] > 0 else 1.0
+        regressed = ratio > 1 + tolerance and result["best"] - old["best"] > min_time
+        ok = ok and not regressed
+        print("%-10s n=%-9d %-26s %10.4fs -> %10.4fs  x%.2f  peak %8.1f -> %8.1f MiB%s"
+              % (result["kind"], result["n"], result["operation"], old["best"], result["best"], ratio,
+                 old["peak_bytes"] / 2 ** 20, result["peak_bytes"] / 2 ** 20, "  REGRESSION" if regressed else ""))
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DirectedGraph operations.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="numbers of vertices")
+    parser.add_argument("--degree", type=int, default=4, help="average out degree")
+    parser.add_argument("--kind", choices=["random", "dag", "grid", "powerlaw"], default="random")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="compare with the results saved in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown when comparing, 0.2 means 20%%")
+    parser.add_argument("--min-time", type=float, default=0.001,
+                        help="slowdowns smaller than this many seconds are ignored")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            results += run_size(args.kind, size, args.degree, args.seed, args.repeat, directory)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"python": sys.version, "platform": platform.platform(), "args": vars(args),
+                       "results": results}, file, indent=1)
+    if args.compare and not compare(results, args.compare, args.tolerance, args.min_time):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,8 @@
-from random import sample, choice
-
+from DirectedGraph import instrumentation
 from DirectedGraph.directedGraph import DirectedGraph
 from DirectedGraph.exceptions import GraphException
+from DirectedGraph.generators import random_edges
+from DirectedGraph.mutationLog import MutationLog
 
 
 class Ui:
@@ -25,8 +26,14 @@ class Ui:
                           "17": self.create_random_graph,
                           "18": self.print_bfs,
                           "19": self.matrix_multiplication,
-                          "20": self.dag
+                          "20": self.dag,
+                          "21": self.write_snapshot,
+                          "22": self.dijkstra,
+                          "23": self.instrumentation,
+                          "24": self.mutation_log,
+                          "25": self.compact_log
                           }
+        self.__log = None
 
     @staticmethod
     def print_menu():
@@ -50,6 +57,11 @@ class Ui:
         print("18-Print the shortest path from one vertex to another")
         print("19-Print the lowest cost path from one vertex to another")
         print("20-Verify if the graph is a DAG and perform topological sorting")
+        print("21-Save graph snapshot (binary, loads without parsing)")
+        print("22-Print the lowest cost path from one vertex to another (no negative costs, faster)")
+        print("23-Turn the time and work counters on/off (prints them when turned off)")
+        print("24-Save every modification as it happens in a snapshot and log (recovers an existing one)")
+        print("25-Fold the modification log into a new snapshot")
 
     def run_menu(self):
         while True:
@@ -66,36 +78,33 @@ class Ui:
 
     def load_from_file(self):
         file_name = input(r"Enter the file:")
-        try:
-            with open(file_name, "r") as file:
-                line = file.readline()
-                line = line.strip().split()
-                vertices, edges = int(line[0]), int(line[1])
-                self.__graph = DirectedGraph(vertices)
-                for edge in range(edges):
-                    line = file.readline()
-                    line = line.strip().split()
-                    vertex1, vertex2, cost = int(line[0]), int(line[1]), int(line[2])
-                    self.__graph.add_edge(vertex1, vertex2, cost)
-            print("done loading")
-        except IOError:
-            raise GraphException("Wrong file name")
+        with instrumentation.phase("ui_load"):
+            self.__graph = DirectedGraph.read_from_file(file_name)
+        #the log follows the graph it was opened with, the new one isn't logged
+        if self.__log is not None:
+            self.__close_log()
+            print("modification log closed")
+        print("done loading")
 
     def write_to_file(self):
         file_name = input(r"Enter the file:")
-        with open(file_name, "w") as f:
-            f.write(str(self.__graph.get_no_vertices()) + ' ' + str(self.__graph.get_no_edges()) + '\n')
-            for k in self.__graph.iterate_edges():
-                f.write(str(k[0]) + ' ' + str(k[1]) + ' ' + str(self.__graph.return_cost(k[0], k[1])) + '\n')
+        with instrumentation.phase("ui_write"):
+            self.__graph.write_to_file(file_name)
         print("done printing")
 
+    def write_snapshot(self):
+        file_name = input(r"Enter the file:")
+        with instrumentation.phase("ui_write_snapshot"):
+            self.__graph.write_snapshot(file_name)
+        print("done saving")
+
     def random_graph(self):
         pass
 
     def print_graph_to_console(self):
         print(self.__graph.get_no_vertices(), self.__graph.get_no_edges())
-        for k in self.__graph.iterate_edges():
-            print(k[0], k[1], self.__graph.return_cost(k[0], k[1]))
+        for vertex1, vertex2, cost in self.__graph.iterate_edges_with_cost():
+            print(vertex1, vertex2, cost)
 
     def get_number_of_vertices(self):
         print(self.__graph.get_no_vertices())
@@ -181,33 +190,15 @@ class Ui:
             n = int(input("Enter the number of vertices:"))
             e = int(input("Enter the number of edges:"))
             random_graph = DirectedGraph(n)
-            vertices = list(range(n))
-            if(e > n*(n-1)):
-                raise GraphException("Too many edges")
-            costs = sample(range(0, 100), e)
-            index = 0
-            while index < len(costs):
-                try:
-                    vertex1 = choice(vertices)
-                    vertex2 = choice(vertices)
-                    random_graph.add_edge(vertex1, vertex2, costs[index])
-                    index+=1
-                except GraphException:
-                    pass
+            random_graph.add_edges(random_edges(n, e))
             self.write_any_graph_to_file(random_graph)
         except ValueError:
             print("The number of vertices and edges should be an integer")
 
     def write_any_graph_to_file(self, graph):
-        try:
-            file_name = input(r"Enter the file:")
-            with open(file_name, "w") as f:
-                f.write(str(graph.get_no_vertices()) + ' ' + str(graph.get_no_edges()) + '\n')
-                for k in graph.iterate_edges():
-                    f.write(str(k[0]) + ' ' + str(k[1]) + ' ' + str(graph.return_cost(k[0], k[1])) + '\n')
-            print("done copying")
-        except IOError:
-            raise GraphException("Wrong file name")
+        file_name = input(r"Enter the file:")
+        graph.write_to_file(file_name)
+        print("done copying")
 
     def modify_cost(self):
         edge = input("Enter the edge and a new cost(vertex1, vertex2, new cost):")
@@ -221,18 +212,11 @@ class Ui:
     def print_bfs(self):
        vertex1 = int(input("enter first:"))
        vertex2 = int(input("enter second:"))
-       dist,prev=self.__graph.BFS(vertex1,vertex2)
-       path=[]
-       if(dist==0):
+       dist,path=self.__graph.bidirectional_bfs(vertex1,vertex2)
+       if(dist is None):
            print("There is no path")
        else:
            print("The distance is:",dist)
-           current = vertex2
-           path.append(current)
-           while prev[current]!=None:
-               path.append(prev[current])
-               current = prev[current]
-           path.reverse()
            print(path)
 
     def matrix_multiplication(self):
@@ -242,15 +226,70 @@ class Ui:
         print("cost = ",cost)
         print("path = ", path)
 
+    def dijkstra(self):
+        vertex1 = int(input("v1:"))
+        vertex2 = int(input("v2:"))
+        cost, path = self.__graph.bidirectional_dijkstra(vertex1, vertex2)
+        print("cost = ", cost)
+        print("path = ", path)
+
+    @staticmethod
+    def instrumentation():
+        if instrumentation.active is None:
+            instrumentation.enable()
+            print("Counters on")
+        else:
+            print(instrumentation.disable())
+
+    def mutation_log(self):
+        base_name = input(r"Enter the log name:")
+        if self.__log is not None:
+            self.__close_log()
+        if MutationLog.exists(base_name):
+            self.__log = MutationLog.recover(base_name)
+            self.__graph = self.__log.graph
+            print("recovered", self.__graph.get_no_vertices(), "vertices and", self.__graph.get_no_edges(), "edges")
+        else:
+            self.__log = MutationLog(self.__graph, base_name)
+            print("logging the modifications")
+
+    def __close_log(self):
+        log, self.__log = self.__log, None
+        log.close()
+
+    def compact_log(self):
+        if self.__log is None:
+            print("No modification log")
+            return
+        self.__log.compact(background=True)
+        print("compacting")
+
     def dag(self):
         sorted = self.__graph.topological_sorting()
         if(sorted==None):
             print("The graph is not a dag")
+            components = self.__graph.strongly_connected_components()
+            print("Components with cycles: ", [component for component in components if len(component) > 1
+                                               or self.__graph.exists_edge(component[0], component[0])])
+            vertex1 = int(input("vertex1:"))
+            vertex2 = int(input("vertex2:"))
+            #raises if a vertex doesn't exist
+            self.__graph.get_degree_out(vertex1)
+            self.__graph.get_degree_out(vertex2)
+            dist, prev, component = self.__graph.condensed_highest_cost_path(vertex1)
+            path = [component[vertex1]]
+            self.__graph.construct_path(path, component[vertex1], component[vertex2], prev)
+            if(len(path)==1):
+                print("No path between different components")
+            else:
+                print("The path through the components is:", [components[number] for number in path])
         else:
             print("The graph is a dag")
             print("Topological sorting: ", sorted)
             vertex1= int(input("vertex1:"))
             vertex2 = int(input("vertex2:"))
+            self.__graph.get_degree_out(vertex1)
+            self.__graph.get_degree_out(vertex2)
             dist,prev = self.__graph.highest_cost_path(vertex1)
             path = [vertex1]
             self.__graph.construct_path(path,vertex1,vertex2,prev)
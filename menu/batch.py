@@ -0,0 +1,181 @@
+import json
+import math
+
+from DirectedGraph.compactGraph import CompactGraph
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+
+#queries that modify the graph
+MUTATIONS = {"add-edge", "remove-edge", "modify-cost"}
+
+
+def load_graph(file_name, read_only, snapshot=None, inbound=True):
+    """
+    Returns the graph stored in a text or snapshot file. A read-only graph is
+    a CompactGraph, mapped straight from a snapshot when possible. A text file
+    with a snapshot file name is converted to it first, and read-only.
+    """
+    if snapshot is not None and not CompactGraph.is_snapshot(file_name):
+        CompactGraph.build_snapshot(file_name, snapshot, inbound)
+        return CompactGraph.load_snapshot(snapshot)
+    if read_only and CompactGraph.is_snapshot(file_name):
+        return CompactGraph.load_snapshot(file_name)
+    graph = DirectedGraph.read_from_file(file_name)
+    if read_only:
+        return CompactGraph(graph)
+    return graph
+
+
+def _analytics():
+    """
+    Returns the analytics module, imported on first use because it needs NumPy.
+    Raises GraphException if NumPy is not installed.
+    """
+    try:
+        from DirectedGraph import analytics
+    except ImportError:
+        raise GraphException("NumPy is required for this query")
+    return analytics
+
+
+class QueryRunner:
+    """
+    Answers text queries, one per line, against a graph that stays loaded
+    between them. Every answer is a dictionary that can be dumped as JSON;
+    unreachable targets and infinite costs are reported as null.
+    """
+    def __init__(self, graph):
+        self.__graph = graph
+        self._commands = {"bfs": (self.bfs, 2),
+                          "lowest-cost": (self.lowest_cost, 2),
+                          "dijkstra": (self.dijkstra, 2),
+                          "topo": (self.topo, 0),
+                          "scc": (self.scc, 0),
+                          "longest-path": (self.longest_path, 2),
+                          "k-paths": (self.k_paths, 3),
+                          "k-longest-paths": (self.k_longest_paths, 3),
+                          "reach": (self.reach, 1),
+                          "khop": (self.k_hop, 2),
+                          "degree": (self.degree, 1),
+                          "outbound": (self.outbound, 1),
+                          "inbound": (self.inbound, 1),
+                          "edge": (self.edge, 2),
+                          "add-edge": (self.add_edge, 3),
+                          "remove-edge": (self.remove_edge, 2),
+                          "modify-cost": (self.modify_cost, 3)
+                          }
+
+    def run(self, line):
+        """
+        Returns the answer to one query line, None for blank lines and comments.
+        Errors are answered with an "error" key instead of raising.
+        :param line: str
+        """
+        words = line.split()
+        if not words or words[0].startswith("#"):
+            return None
+        answer = {"query": " ".join(words)}
+        if words[0] not in self._commands:
+            answer["error"] = "Unknown query"
+            return answer
+        command, arity = self._commands[words[0]]
+        try:
+            arguments = [int(word) for word in words[1:]]
+            if len(arguments) != arity:
+                raise ValueError
+            answer.update(command(*arguments))
+        except ValueError:
+            answer["error"] = "Expected %d integer arguments" % arity
+        except GraphException as ex:
+            answer["error"] = str(ex)
+        return answer
+
+    def run_stream(self, lines, output):
+        """
+        Answers every line of an iterable and writes the answers to output as
+        JSON lines. Returns the number of answers written.
+        :param lines: iterable of str
+        :param output: text file
+        """
+        count = 0
+        for line in lines:
+            answer = self.run(line)
+            if answer is not None:
+                output.write(json.dumps(answer) + "\n")
+                count += 1
+        return count
+
+    def bfs(self, source, target):
+        dist, path = self.__graph.bidirectional_bfs(source, target)
+        return {"distance": dist, "path": path}
+
+    def lowest_cost(self, source, target):
+        cost, path = self.__graph.lowest_cost_walk(source, target)
+        return {"cost": None if cost == math.inf else cost, "path": path}
+
+    def dijkstra(self, source, target):
+        cost, path = self.__graph.bidirectional_dijkstra(source, target)
+        return {"cost": None if cost == math.inf else cost, "path": path}
+
+    def topo(self):
+        sorted = self.__graph.topological_sorting()
+        return {"dag": sorted is not None, "order": sorted}
+
+    def scc(self):
+        return {"components": self.__graph.strongly_connected_components()}
+
+    def longest_path(self, source, target):
+        #raise for a missing vertex before the result is indexed with it
+        self.__graph.get_degree_out(source)
+        self.__graph.get_degree_out(target)
+        dist, prev = self.__graph.highest_cost_path(source)
+        if dist.get(target, -math.inf) == -math.inf:
+            return {"cost": None, "path": []}
+        path = [source]
+        self.__graph.construct_path(path, source, target, prev)
+        return {"cost": dist[target], "path": path}
+
+    def k_paths(self, source, target, k):
+        paths = self.__graph.k_lowest_cost_paths(source, target, k)
+        return {"paths": [{"cost": cost, "path": path} for cost, path in paths]}
+
+    def k_longest_paths(self, source, target, k):
+        paths = self.__graph.k_highest_cost_paths(source, target, k)
+        return {"paths": [{"cost": cost, "path": path} for cost, path in paths]}
+
+    def reach(self, vertex):
+        analytics = _analytics()
+        return {"count": len(analytics.reachable(self.__graph, [vertex]))}
+
+    def k_hop(self, vertex, k):
+        analytics = _analytics()
+        return {"vertices": analytics.k_hop(self.__graph, [vertex], k).tolist()}
+
+    def degree(self, vertex):
+        return {"in": self.__graph.get_degree_in(vertex), "out": self.__graph.get_degree_out(vertex)}
+
+    def outbound(self, vertex):
+        return {"neighbours": list(self.__graph.outbound_view(vertex))}
+
+    def inbound(self, vertex):
+        return {"neighbours": list(self.__graph.inbound_view(vertex))}
+
+    def edge(self, vertex1, vertex2):
+        if self.__graph.exists_edge(vertex1, vertex2):
+            return {"exists": True, "cost": self.__graph.return_cost(vertex1, vertex2)}
+        return {"exists": False, "cost": None}
+
+    def add_edge(self, vertex1, vertex2, cost):
+        #DirectedGraph.add_edge raises KeyError for a missing vertex, answered like the other errors
+        self.__graph.get_degree_out(vertex1)
+        self.__graph.get_degree_in(vertex2)
+        self.__graph.add_edge(vertex1, vertex2, cost)
+        return {"done": True}
+
+    def remove_edge(self, vertex1, vertex2):
+        self.__graph.remove_edge(vertex1, vertex2)
+        return {"done": True}
+
+    def modify_cost(self, vertex1, vertex2, cost):
+        self.__graph.modify_cost(vertex1, vertex2, cost)
+        return {"done": True}
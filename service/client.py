@@ -0,0 +1,88 @@
+"""
+Client of service.server.
+
+    python -m service.client --port 8765 "bfs 0 9999" "topo"
+    echo "degree 5" | python -m service.client --unix /tmp/graph.sock
+"""
+import argparse
+import asyncio
+import json
+import sys
+from collections import deque
+
+
+class GraphClient:
+    """
+    Connection to a graph server. Queries can be sent without waiting for the
+    previous answers; the server answers them in order.
+    """
+    def __init__(self, reader, writer):
+        self.__reader = reader
+        self.__writer = writer
+        self.__waiting = deque()
+        self.__receiver = asyncio.get_running_loop().create_task(self.__receive())
+
+    @staticmethod
+    async def connect(host="127.0.0.1", port=8765, unix=None):
+        """
+        Returns a client connected to a TCP port, or to a Unix socket if unix is a path.
+        """
+        if unix is not None:
+            reader, writer = await asyncio.open_unix_connection(unix)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return GraphClient(reader, writer)
+
+    async def __receive(self):
+        try:
+            while True:
+                line = await self.__reader.readline()
+                if not line:
+                    break
+                self.__waiting.popleft().set_result(json.loads(line))
+        finally:
+            while self.__waiting:
+                self.__waiting.popleft().set_exception(ConnectionError("The server closed the connection"))
+
+    async def query(self, line):
+        """
+        Returns the answer of the server to one query line, as a dictionary.
+        :param line: str, not blank
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.__waiting.append(future)
+        self.__writer.write((line.strip() + "\n").encode())
+        await self.__writer.drain()
+        return await future
+
+    async def close(self):
+        self.__writer.close()
+        await self.__writer.wait_closed()
+        await self.__receiver
+
+
+async def run(queries, host, port, unix):
+    client = await GraphClient.connect(host, port, unix)
+    try:
+        answers = await asyncio.gather(*(client.query(query) for query in queries))
+        for answer in answers:
+            print(json.dumps(answer))
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send queries to a graph server.")
+    parser.add_argument("queries", nargs="*", help="queries, standard input if there are none")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="connect to this Unix socket path instead of TCP")
+    args = parser.parse_args()
+
+    queries = args.queries or sys.stdin.read().splitlines()
+    queries = [query for query in queries if query.strip() and not query.lstrip().startswith("#")]
+    asyncio.run(run(queries, args.host, args.port, args.unix))
+
+
+if __name__ == '__main__':
+    main()
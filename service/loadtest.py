@@ -0,0 +1,100 @@
+"""
+Load test of a running graph server: several clients keep a few queries each in flight
+and the throughput and latency percentiles are printed at the end.
+
+    python -m service.server graph10k.txt --port 8765 &
+    python -m service.loadtest --port 8765 --clients 16 --requests 500 --kind bfs --sources 20
+
+Queries go from a pool of --sources sources to random targets, so the server can answer
+concurrent queries from the same source together; the batches per query reported at the
+end show how much it did. --mutations adds that share of modify-cost queries to
+exercise the writer side of the lock.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from service.client import GraphClient
+
+
+def percentile(values, fraction):
+    """
+    Returns the value below which the given fraction of the sorted values lie.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def run_client(client, queries, pipeline, latencies, errors):
+    slots = asyncio.Semaphore(pipeline)
+
+    async def one(query):
+        async with slots:
+            start = time.perf_counter()
+            answer = await client.query(query)
+            latencies.append(time.perf_counter() - start)
+            if "error" in answer:
+                errors.append(answer["error"])
+
+    await asyncio.gather(*(one(query) for query in queries))
+
+
+async def load_test(args):
+    clients = [await GraphClient.connect(args.host, args.port, args.unix) for _ in range(args.clients)]
+    before = await clients[0].query("stats")
+    n = before["vertices"]
+    rng = random.Random(args.seed)
+    sources = [rng.randrange(n) for _ in range(args.sources)]
+    edges = []
+    if args.mutations:
+        for source in sources:
+            answer = await clients[0].query("outbound %d" % source)
+            edges += [(source, target) for target in answer.get("neighbours", [])]
+
+    def make_query():
+        if edges and rng.random() < args.mutations:
+            return "modify-cost %d %d %d" % (*rng.choice(edges), rng.randrange(100))
+        return "%s %d %d" % (args.kind, rng.choice(sources), rng.randrange(n))
+
+    workload = [[make_query() for _ in range(args.requests)] for _ in clients]
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(client, queries, args.pipeline, latencies, errors)
+                           for client, queries in zip(clients, workload)))
+    elapsed = time.perf_counter() - start
+    after = await clients[0].query("stats")
+    for client in clients:
+        await client.close()
+
+    latencies.sort()
+    print("%d queries in %.3fs: %.1f queries/s, %d errors"
+          % (len(latencies), elapsed, len(latencies) / elapsed, len(errors)))
+    print("latency ms: p50 %.2f  p90 %.2f  p99 %.2f  max %.2f"
+          % tuple(1000 * value for value in (percentile(latencies, 0.5), percentile(latencies, 0.9),
+                                              percentile(latencies, 0.99), latencies[-1])))
+    batched = after["batched"] - before["batched"]
+    if batched:
+        print("%d batches for %d batched queries (%.2f per query)"
+              % (after["batches"] - before["batches"], batched, (after["batches"] - before["batches"]) / batched))
+    if errors:
+        print("first error:", errors[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a graph server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="connect to this Unix socket path instead of TCP")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent connections")
+    parser.add_argument("--requests", type=int, default=200, help="queries per client")
+    parser.add_argument("--pipeline", type=int, default=4, help="queries in flight per client")
+    parser.add_argument("--kind", choices=["bfs", "lowest-cost", "dijkstra", "longest-path"], default="bfs")
+    parser.add_argument("--sources", type=int, default=20, help="number of distinct sources")
+    parser.add_argument("--mutations", type=float, default=0.0, help="share of modify-cost queries")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(load_test(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
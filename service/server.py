@@ -0,0 +1,266 @@
+"""
+Serves one loaded graph to many client processes over a TCP or Unix socket.
+
+    python -m service.server graph10k.txt --port 8765
+    python -m service.server graph.snapshot --read-only --unix /tmp/graph.sock
+
+Clients send the text queries of batch.py, one per line, and get one JSON answer per
+line, in the order of their queries. Concurrent bfs, lowest-cost and longest-path
+queries from the same source are answered together: lowest-cost and longest-path from
+one traversal, bfs from one traversal once there are enough of them to beat a
+bidirectional search per query. The batches and the other queries run on a thread
+pool while the event loop keeps accepting requests; queries share the graph and a
+modification waits until none is running (and new queries wait for the modification),
+so the answers never see a half-done change.
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from DirectedGraph.exceptions import GraphException
+from DirectedGraph.parallel import solve_source
+from menu.batch import MUTATIONS, QueryRunner, load_graph
+
+#queries answered from one traversal per source, see parallel.solve_source
+BATCHED = {"bfs", "lowest-cost", "longest-path"}
+
+
+class ReadWriteLock:
+    """
+    asyncio lock held by many readers or a single writer. A waiting writer
+    keeps new readers out, so a stream of queries can't starve modifications.
+    """
+    def __init__(self):
+        self.__condition = asyncio.Condition()
+        self.__readers = 0
+        self.__writing = False
+        self.__waiting_writers = 0
+
+    @asynccontextmanager
+    async def reading(self):
+        async with self.__condition:
+            await self.__condition.wait_for(lambda: not self.__writing and not self.__waiting_writers)
+            self.__readers += 1
+        try:
+            yield
+        finally:
+            async with self.__condition:
+                self.__readers -= 1
+                if not self.__readers:
+                    self.__condition.notify_all()
+
+    @asynccontextmanager
+    async def writing(self):
+        async with self.__condition:
+            self.__waiting_writers += 1
+            try:
+                await self.__condition.wait_for(lambda: not self.__writing and not self.__readers)
+            finally:
+                self.__waiting_writers -= 1
+            self.__writing = True
+        try:
+            yield
+        finally:
+            async with self.__condition:
+                self.__writing = False
+                self.__condition.notify_all()
+
+
+def _answer(kind, result):
+    #the answer QueryRunner gives for the same query
+    cost, path = result
+    if kind == "bfs":
+        return {"distance": cost, "path": path}
+    return {"cost": None if cost in (math.inf, -math.inf) else cost, "path": path}
+
+
+def _error(ex):
+    #GraphException messages are meant for the client, other failures also name their type
+    if isinstance(ex, GraphException):
+        return str(ex)
+    return "%s: %s" % (type(ex).__name__, ex)
+
+
+class GraphServer:
+    """
+    Answers the queries of QueryRunner for many connections at once, batching
+    the single source ones by (query, source).
+    """
+    def __init__(self, graph, workers=None, batch_window=0.0, traversal_min=16):
+        """
+        :param graph: DirectedGraph or CompactGraph
+        :param workers: int, threads running the queries, as ThreadPoolExecutor by default
+        :param batch_window: float, seconds a new batch waits for more queries from its source
+        :param traversal_min: int, bfs queries from one source answered by a whole traversal
+        """
+        self.__traversal_min = traversal_min
+        self.__graph = graph
+        self.__runner = QueryRunner(graph)
+        self.__executor = ThreadPoolExecutor(workers)
+        self.__lock = ReadWriteLock()
+        self.__batch_window = batch_window
+        #(query, source) -> [(target, future)] of the batch that hasn't started yet
+        self.__batches = {}
+        self.__stats = {"requests": 0, "batched": 0, "batches": 0, "mutations": 0}
+
+    async def answer(self, line):
+        """
+        Returns the answer to one query line, None for blank lines and comments.
+        Errors are answered with an "error" key instead of raising, like QueryRunner.run.
+        :param line: str
+        """
+        words = line.split()
+        if not words or words[0].startswith("#"):
+            return None
+        try:
+            return await self.__answer(words, line)
+        except Exception as ex:
+            #an unexpected failure of one query must not end the connection
+            return {"query": " ".join(words), "error": _error(ex)}
+
+    async def __answer(self, words, line):
+        self.__stats["requests"] += 1
+        if words[0] == "stats":
+            return dict(self.__stats, query="stats", vertices=self.__graph.get_no_vertices(),
+                        edges=self.__graph.get_no_edges())
+        if words[0] in MUTATIONS:
+            async with self.__lock.writing():
+                self.__stats["mutations"] += 1
+                return self.__runner.run(line)
+        if words[0] in BATCHED and len(words) == 3:
+            try:
+                source, target = int(words[1]), int(words[2])
+                self.__graph.get_degree_out(target)
+            except (ValueError, GraphException):
+                pass
+            else:
+                answer = {"query": " ".join(words)}
+                try:
+                    answer.update(_answer(words[0], await self.__solve(words[0], source, target)))
+                except Exception as ex:
+                    answer["error"] = _error(ex)
+                return answer
+        async with self.__lock.reading():
+            return await asyncio.get_running_loop().run_in_executor(self.__executor, self.__runner.run, line)
+
+    async def __solve(self, kind, source, target):
+        loop = asyncio.get_running_loop()
+        key = (kind, source)
+        if key not in self.__batches:
+            self.__batches[key] = []
+            loop.create_task(self.__run_batch(key))
+        future = loop.create_future()
+        self.__batches[key].append((target, future))
+        self.__stats["batched"] += 1
+        return await future
+
+    async def __run_batch(self, key):
+        #queries keep joining the batch until it gets its turn to read the graph
+        await asyncio.sleep(self.__batch_window)
+        async with self.__lock.reading():
+            batch = self.__batches.pop(key)
+            self.__stats["batches"] += 1
+            targets = [target for target, _ in batch]
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    self.__executor, self.__solve_batch, key[0], key[1], targets)
+            except Exception as ex:
+                #every query of the batch gets the error, none of them is left waiting
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(ex)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+
+    def __solve_batch(self, kind, source, targets):
+        if kind == "bfs" and len(targets) < self.__traversal_min:
+            return [self.__graph.bidirectional_bfs(source, target) for target in targets]
+        if kind == "lowest-cost":
+            #the lowest cost tree of source is kept by the graph until it is modified
+            return [self.__graph.lowest_cost_walk(source, target) for target in targets]
+        return solve_source(self.__graph, kind, source, targets)
+
+    async def handle(self, reader, writer):
+        """
+        Answers the queries of one connection, in order, until it is closed.
+        """
+        answers = asyncio.Queue()
+
+        async def send():
+            while True:
+                task = await answers.get()
+                if task is None:
+                    break
+                answer = await task
+                if answer is not None:
+                    writer.write((json.dumps(answer) + "\n").encode())
+                    await writer.drain()
+
+        sender = asyncio.get_running_loop().create_task(send())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                #answered concurrently, sent in the order they came
+                await answers.put(asyncio.get_running_loop().create_task(self.answer(line.decode())))
+        finally:
+            await answers.put(None)
+            try:
+                await sender
+            except ConnectionError:
+                pass
+            writer.close()
+
+    def close(self):
+        self.__executor.shutdown(wait=False)
+
+
+async def serve(server, host="127.0.0.1", port=8765, unix=None):
+    """
+    Serves the GraphServer on a TCP port, or on a Unix socket if unix is a path, until cancelled.
+    """
+    if unix is not None:
+        listener = await asyncio.start_unix_server(server.handle, unix)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+    print("serving on", ", ".join(str(sock.getsockname()) for sock in listener.sockets), flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve graph queries over a socket.")
+    parser.add_argument("graph", help="text or snapshot graph file")
+    parser.add_argument("--read-only", action="store_true", help="use the compact read-only graph")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="serve on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, help="threads running the queries")
+    parser.add_argument("--batch-window", type=float, default=0.0,
+                        help="seconds a batch waits for more queries from its source")
+    parser.add_argument("--traversal-min", type=int, default=16,
+                        help="bfs queries from one source answered by a whole traversal")
+    args = parser.parse_args()
+
+    try:
+        graph = load_graph(args.graph, args.read_only)
+    except GraphException as ex:
+        sys.exit(str(ex))
+    server = GraphServer(graph, args.workers, args.batch_window, args.traversal_min)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import math
+import random
+import unittest
+
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+
+try:
+    from DirectedGraph import allPairs
+except ImportError:
+    allPairs = None
+
+
+def bellman_ford(graph, source):
+    """
+    Lowest costs from source to every vertex by plain Bellman-Ford, None if a
+    negative cost cycle is reachable from source.
+    """
+    dist = {vertex: math.inf for vertex in graph.iterate_vertices()}
+    dist[source] = 0
+    edges = [(x, y, graph.return_cost(x, y)) for x, y in graph.iterate_edges()]
+    for _ in range(graph.get_no_vertices()):
+        changed = False
+        for vertex1, vertex2, cost in edges:
+            if dist[vertex1] + cost < dist[vertex2]:
+                dist[vertex2] = dist[vertex1] + cost
+                changed = True
+        if not changed:
+            return dist
+    return None
+
+
+def random_graph(rng, n, m, low):
+    graph = DirectedGraph(n)
+    for _ in range(m):
+        vertex1, vertex2 = rng.randrange(n), rng.randrange(n)
+        if not graph.exists_edge(vertex1, vertex2):
+            graph.add_edge(vertex1, vertex2, rng.randrange(low, 20))
+    return graph
+
+
+@unittest.skipIf(allPairs is None, "needs NumPy")
+class TestAllPairs(unittest.TestCase):
+    METHODS = ("floyd_warshall", "squaring")
+
+    def setUp(self):
+        self.block_cells = allPairs.BLOCK_CELLS
+
+    def tearDown(self):
+        allPairs.BLOCK_CELLS = self.block_cells
+
+    def assert_matches(self, graph, method):
+        expected = {source: bellman_ford(graph, source) for source in graph.iterate_vertices()}
+        if any(dist is None for dist in expected.values()):
+            self.assertRaises(GraphException, graph.all_pairs_lowest_cost, method)
+            return
+        dist = graph.all_pairs_lowest_cost(method)
+        for source in graph.iterate_vertices():
+            for target in graph.iterate_vertices():
+                self.assertEqual(dist[source, target], expected[source][target])
+                path = graph.get_path(source, target)
+                if dist[source, target] == math.inf:
+                    self.assertEqual(path, [])
+                else:
+                    self.assertEqual((path[0], path[-1]), (source, target))
+                    self.assertEqual(sum(graph.return_cost(x, y) for x, y in zip(path, path[1:])),
+                                     dist[source, target])
+
+    def test_against_bellman_ford(self):
+        rng = random.Random(3)
+        for trial in range(40):
+            n = rng.randrange(1, 12)
+            #some graphs have negative costs, and a few of them negative cost cycles
+            graph = random_graph(rng, n, rng.randrange(3 * n), -3 if trial % 3 == 0 else 0)
+            for method in self.METHODS:
+                self.assert_matches(graph, method)
+
+    def test_small_blocks(self):
+        rng = random.Random(3)
+        for block_cells in (1, 7, 50):
+            allPairs.BLOCK_CELLS = block_cells
+            for _ in range(5):
+                n = rng.randrange(2, 10)
+                self.assert_matches(random_graph(rng, n, 3 * n, 0), "squaring")
+
+    def test_unknown_method(self):
+        self.assertRaises(GraphException, DirectedGraph(2).all_pairs_lowest_cost, "dijkstra")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import unittest
+
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+
+try:
+    import numpy as np
+    from DirectedGraph import allPairs
+except ImportError:
+    allPairs = None
+
+
+def random_graph(rng, n, m, low):
+    graph = DirectedGraph(n)
+    for _ in range(m):
+        vertex1, vertex2 = rng.randrange(n), rng.randrange(n)
+        if not graph.exists_edge(vertex1, vertex2):
+            graph.add_edge(vertex1, vertex2, rng.randrange(low, 20))
+    return graph
+
+
+@unittest.skipIf(allPairs is None, "needs NumPy")
+class TestBlockedFloydWarshall(unittest.TestCase):
+    def assert_same_matrices(self, graph, **options):
+        try:
+            expected = allPairs.floyd_warshall(graph)
+        except GraphException:
+            self.assertRaises(GraphException, allPairs.blocked_floyd_warshall, graph, **options)
+            return
+        dist, next_hop = allPairs.blocked_floyd_warshall(graph, **options)
+        np.testing.assert_array_equal(dist, expected[0])
+        #walks of equal cost may be relaxed in another order, so only the costs of the walks must match
+        n = graph.get_no_vertices()
+        for source in range(n):
+            for target in range(n):
+                self.assertEqual(next_hop[source, target] < 0, expected[1][source, target] < 0)
+                if next_hop[source, target] >= 0:
+                    self.assert_walk(graph, next_hop, source, target, dist[source, target])
+
+    def assert_walk(self, graph, next_hop, source, target, cost):
+        walk = [source]
+        while walk[-1] != target and len(walk) <= graph.get_no_vertices():
+            walk.append(int(next_hop[walk[-1], target]))
+        self.assertEqual(walk[-1], target)
+        self.assertEqual(sum(graph.return_cost(x, y) for x, y in zip(walk, walk[1:])), cost)
+
+    def test_tiles_match_floyd_warshall(self):
+        rng = random.Random(22)
+        for trial in range(30):
+            n = rng.randrange(1, 20)
+            graph = random_graph(rng, n, rng.randrange(3 * n), -2 if trial % 3 == 0 else 0)
+            #tiles that divide n, that don't, and a single tile
+            for tile_size in (1, 3, 4, n, n + 5):
+                self.assert_same_matrices(graph, workers=1, tile_size=tile_size)
+
+    def test_workers_match_floyd_warshall(self):
+        rng = random.Random(22)
+        for trial in range(4):
+            n = rng.randrange(10, 40)
+            graph = random_graph(rng, n, 3 * n, -1 if trial == 0 else 0)
+            self.assert_same_matrices(graph, workers=2, tile_size=rng.randrange(2, 9))
+
+    def test_paths(self):
+        rng = random.Random(22)
+        graph = random_graph(rng, 15, 40, 0)
+        expected = graph.all_pairs_lowest_cost("floyd_warshall")
+        #get_path follows the matrix of the last method computed
+        dist = graph.all_pairs_lowest_cost("blocked", workers=1, tile_size=4)
+        np.testing.assert_array_equal(dist, expected)
+        for source in range(15):
+            for target in range(15):
+                path = graph.get_path(source, target)
+                if dist[source, target] < float("inf"):
+                    self.assertEqual((path[0], path[-1]), (source, target))
+                    self.assertEqual(sum(graph.return_cost(x, y) for x, y in zip(path, path[1:])),
+                                     dist[source, target])
+                else:
+                    self.assertEqual(path, [])
+
+    def test_invalid_tile_size(self):
+        self.assertRaises(GraphException, allPairs.blocked_floyd_warshall, DirectedGraph(3), 1, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
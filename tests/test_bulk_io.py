@@ -0,0 +1,90 @@
+import os
+import random
+import tempfile
+import unittest
+
+from DirectedGraph.compactGraph import CompactGraph
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+
+
+def random_graph(rng, n, m):
+    graph = DirectedGraph(n)
+    for _ in range(m):
+        vertex1, vertex2 = rng.randrange(n), rng.randrange(n)
+        if not graph.exists_edge(vertex1, vertex2):
+            graph.add_edge(vertex1, vertex2, rng.randrange(-50, 1000))
+    return graph
+
+
+def edge_set(graph):
+    return sorted((x, y, graph.return_cost(x, y)) for x, y in graph.iterate_edges())
+
+
+class TestBulkIO(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, "graph")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_same_graph(self, loaded, graph):
+        self.assertEqual(sorted(loaded.iterate_vertices()), sorted(graph.iterate_vertices()))
+        self.assertEqual(edge_set(loaded), edge_set(graph))
+        for vertex in graph.iterate_vertices():
+            self.assertEqual(sorted(loaded.iterate_inbound(vertex)), sorted(graph.iterate_inbound(vertex)))
+
+    def test_text_round_trip(self):
+        rng = random.Random(4)
+        for trial in range(20):
+            n = rng.randrange(1, 30)
+            graph = random_graph(rng, n, rng.randrange(4 * n))
+            graph.write_to_file(self.file_name)
+            #tiny chunks split numbers and lines at every possible place
+            for chunk_size in (1, 3, 7, 1 << 20):
+                self.assert_same_graph(DirectedGraph.read_from_file(self.file_name, chunk_size), graph)
+
+    def test_text_written_by_hand(self):
+        with open(self.file_name, "w") as file:
+            file.write("3 2\n0 1 5\n\n  1   2 -4  \n")
+        graph = DirectedGraph.read_from_file(self.file_name, 2)
+        self.assertEqual(edge_set(graph), [(0, 1, 5), (1, 2, -4)])
+
+    def test_invalid_text(self):
+        for text in ("", "3", "3 2\n0 1 5\n", "2 1\n0 5 1\n", "2 2\n0 1 1\n0 1 2\n"):
+            with open(self.file_name, "w") as file:
+                file.write(text)
+            self.assertRaises(GraphException, DirectedGraph.read_from_file, self.file_name, 4)
+        self.assertRaises(GraphException, DirectedGraph.read_from_file, self.file_name + ".missing")
+
+    def test_snapshot_round_trip(self):
+        rng = random.Random(4)
+        for trial in range(20):
+            n = rng.randrange(1, 30)
+            graph = random_graph(rng, n, rng.randrange(4 * n))
+            if trial % 2 == 0 and n > 1:
+                graph.remove_vertex(rng.randrange(n))
+                graph.add_vertex(n + 7)
+            graph.write_snapshot(self.file_name)
+            self.assertTrue(CompactGraph.is_snapshot(self.file_name))
+            self.assert_same_graph(DirectedGraph.read_from_file(self.file_name), graph)
+            compact = CompactGraph.load_snapshot(self.file_name)
+            self.assert_same_graph(compact, graph)
+            with open(self.file_name, "rb") as file:
+                self.assert_same_graph(CompactGraph.from_buffer(file.read()), graph)
+            graph.write_to_file(self.file_name)
+            self.assertFalse(CompactGraph.is_snapshot(self.file_name))
+
+    def test_invalid_snapshot(self):
+        graph = random_graph(random.Random(4), 5, 10)
+        graph.write_snapshot(self.file_name)
+        with open(self.file_name, "rb") as file:
+            data = file.read()
+        self.assertRaises(GraphException, CompactGraph.from_buffer, data[:-8])
+        self.assertRaises(GraphException, CompactGraph.from_buffer, data[:10])
+        self.assertRaises(GraphException, CompactGraph.from_buffer, b"X" + data[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import random
+import unittest
+
+from DirectedGraph.compactGraph import CompactGraph
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+
+
+def random_graph(rng, n, m, dag=False):
+    graph = DirectedGraph(n)
+    if dag:
+        #a path through all the vertices, so every vertex is reachable from 0
+        for vertex in range(n - 1):
+            graph.add_edge(vertex, vertex + 1, rng.randrange(-5, 20))
+    for _ in range(m):
+        vertex1, vertex2 = rng.randrange(n), rng.randrange(n)
+        if dag and vertex1 >= vertex2:
+            continue
+        if not graph.exists_edge(vertex1, vertex2):
+            graph.add_edge(vertex1, vertex2, rng.randrange(-5, 20))
+    return graph
+
+
+class TestCompactGraph(unittest.TestCase):
+    def assert_same_graph(self, compact, graph, ordered=True):
+        #neighbours keep the order of the source graph, a rebuilt graph may order them differently
+        arrange = list if ordered else sorted
+        vertices = graph.iterate_vertices()
+        self.assertEqual(compact.iterate_vertices(), vertices)
+        self.assertEqual(compact.get_no_vertices(), graph.get_no_vertices())
+        self.assertEqual(compact.get_no_edges(), graph.get_no_edges())
+        self.assertEqual(sorted(compact.iterate_edges()), sorted(graph.iterate_edges()))
+        for vertex1 in vertices:
+            self.assertEqual(arrange(compact.iterate_outbound(vertex1)), arrange(graph.iterate_outbound(vertex1)))
+            self.assertEqual(arrange(compact.iterate_inbound(vertex1)), arrange(graph.iterate_inbound(vertex1)))
+            self.assertEqual(compact.get_degree_out(vertex1), graph.get_degree_out(vertex1))
+            self.assertEqual(compact.get_degree_in(vertex1), graph.get_degree_in(vertex1))
+            for vertex2 in vertices:
+                self.assertEqual(compact.exists_edge(vertex1, vertex2), graph.exists_edge(vertex1, vertex2))
+                if graph.exists_edge(vertex1, vertex2):
+                    self.assertEqual(compact.return_cost(vertex1, vertex2), graph.return_cost(vertex1, vertex2))
+                else:
+                    self.assertRaises(GraphException, compact.return_cost, vertex1, vertex2)
+
+    def test_queries_match_the_graph(self):
+        rng = random.Random(1)
+        for trial in range(30):
+            n = rng.randrange(1, 12)
+            graph = random_graph(rng, n, rng.randrange(3 * n))
+            #vertices that are not 0..n-1
+            if trial % 3 == 0 and n > 1:
+                graph.remove_vertex(rng.randrange(n))
+                graph.add_vertex(n + 5)
+                graph.add_edge(n + 5, graph.iterate_vertices()[0], 3)
+            compact = CompactGraph(graph)
+            self.assert_same_graph(compact, graph)
+            self.assertEqual(str(compact).count("\n"), graph.get_no_edges())
+            copy = compact.to_directed_graph()
+            self.assert_same_graph(CompactGraph(copy), graph, ordered=False)
+
+    def test_traversals_match_the_graph(self):
+        rng = random.Random(1)
+        for trial in range(30):
+            n = rng.randrange(2, 15)
+            graph = random_graph(rng, n, rng.randrange(3 * n), dag=trial % 2 == 0)
+            compact = CompactGraph(graph)
+            for _ in range(3):
+                source, target = rng.randrange(n), rng.randrange(n)
+                self.assertEqual(compact.BFS(source, target), graph.BFS(source, target))
+            self.assertEqual(compact.topological_sorting(), graph.topological_sorting())
+            if trial % 2 == 0:
+                self.assertEqual(compact.highest_cost_path(0), graph.highest_cost_path(0))
+
+    def test_read_only(self):
+        graph = DirectedGraph(4)
+        graph.add_edge(0, 1, 1)
+        compact = CompactGraph(graph)
+        self.assertRaises(GraphException, compact.add_edge, 2, 3, 1)
+        self.assertRaises(GraphException, compact.remove_edge, 0, 1)
+        self.assertRaises(GraphException, compact.modify_cost, 0, 1, 5)
+        self.assertRaises(GraphException, compact.add_vertex, 9)
+        self.assertRaises(GraphException, compact.remove_vertex, 0)
+        self.assertIs(compact.copy_graph(), compact)
+        self.assertRaises(GraphException, compact.get_degree_out, 9)
+        self.assertRaises(GraphException, compact.iterate_inbound, 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import random
+import tempfile
+import unittest
+
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+
+
+class TestEdgeOrder(unittest.TestCase):
+    def test_edges_follow_insertion_order(self):
+        rng = random.Random(5)
+        graph = DirectedGraph(8)
+        #the order of a plain dict of edges, as the graph kept them before the neighbour dicts
+        expected = {}
+        for _ in range(400):
+            vertex1, vertex2 = rng.randrange(8), rng.randrange(8)
+            cost = rng.randrange(100)
+            if (vertex1, vertex2) in expected:
+                if rng.random() < 0.5:
+                    graph.remove_edge(vertex1, vertex2)
+                    del expected[vertex1, vertex2]
+                else:
+                    graph.modify_cost(vertex1, vertex2, cost)
+                    expected[vertex1, vertex2] = cost
+            else:
+                graph.add_edge(vertex1, vertex2, cost)
+                expected[vertex1, vertex2] = cost
+        self.assertEqual(graph.iterate_edges(), list(expected))
+        self.assertEqual(list(graph.iter_edges()), list(expected))
+        self.assertEqual(list(graph.iterate_edges_with_cost()),
+                         [(vertex1, vertex2, cost) for (vertex1, vertex2), cost in expected.items()])
+        self.assertEqual(str(graph), "".join("Vertex1: %d Vertex2: %d The cost: %d\n" % (x, y, c)
+                                             for (x, y), c in expected.items()))
+
+    def test_file_keeps_the_order(self):
+        graph = DirectedGraph(4)
+        for edge in [(3, 1, 4), (0, 2, 1), (3, 0, 2), (1, 3, 7), (0, 3, 5)]:
+            graph.add_edge(*edge)
+        graph.remove_vertex(2)
+        graph.add_vertex(2)
+        graph.add_edge(2, 0, 3)
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "graph.txt")
+            graph.write_to_file(file_name)
+            with open(file_name) as file:
+                self.assertEqual(file.read(), "4 5\n3 1 4\n3 0 2\n1 3 7\n0 3 5\n2 0 3\n")
+            self.assertEqual(DirectedGraph.read_from_file(file_name).iterate_edges(), graph.iterate_edges())
+
+    def test_copies_keep_their_own_order(self):
+        graph = DirectedGraph(3)
+        graph.add_edge(0, 1, 1)
+        graph.add_edge(1, 2, 1)
+        copy = graph.copy_graph()
+        copy.remove_edge(0, 1)
+        copy.add_edge(0, 1, 1)
+        graph.add_edge(2, 0, 1)
+        self.assertEqual(copy.iterate_edges(), [(1, 2), (0, 1)])
+        self.assertEqual(graph.iterate_edges(), [(0, 1), (1, 2), (2, 0)])
+
+    def test_add_edge_errors(self):
+        graph = DirectedGraph(2)
+        graph.add_edge(0, 1, 1)
+        self.assertRaises(GraphException, graph.add_edge, 0, 1, 2)
+        self.assertRaises(KeyError, graph.add_edge, 5, 1, 2)
+        self.assertRaises(KeyError, graph.add_edge, 0, 5, 2)
+        self.assertEqual(graph.iterate_edges(), [(0, 1)])
+        self.assertEqual(graph.get_no_edges(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import math
+import random
+import unittest
+
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.dynamic import DynamicShortestPaths, DynamicTopologicalOrder
+from DirectedGraph.exceptions import GraphException
+
+
+def bellman_ford(graph, source):
+    """
+    Lowest costs from source by plain Bellman-Ford, None if a negative cost
+    cycle is reachable from it.
+    """
+    dist = {source: 0}
+    edges = list(graph.iterate_edges_with_cost())
+    for _ in range(graph.get_no_vertices()):
+        changed = False
+        for vertex1, vertex2, cost in edges:
+            if vertex1 in dist and dist[vertex1] + cost < dist.get(vertex2, math.inf):
+                dist[vertex2] = dist[vertex1] + cost
+                changed = True
+        if not changed:
+            return dist
+    return None
+
+
+def random_modification(graph, rng, costs, keep):
+    vertices = list(graph.iterate_vertices())
+    choice = rng.random()
+    edges = list(graph.iterate_edges_with_cost())
+    if choice < 0.45 or not edges:
+        vertex1, vertex2 = rng.choice(vertices), rng.choice(vertices)
+        if not graph.exists_edge(vertex1, vertex2):
+            graph.add_edge(vertex1, vertex2, rng.choice(costs))
+    elif choice < 0.65:
+        vertex1, vertex2, _ = rng.choice(edges)
+        graph.remove_edge(vertex1, vertex2)
+    elif choice < 0.9:
+        vertex1, vertex2, _ = rng.choice(edges)
+        graph.modify_cost(vertex1, vertex2, rng.choice(costs))
+    elif choice < 0.95:
+        vertex = rng.choice(vertices)
+        if vertex != keep:
+            graph.remove_vertex(vertex)
+    else:
+        graph.add_vertex(max(vertices) + 1)
+
+
+class TestDynamicShortestPaths(unittest.TestCase):
+    def assert_matches(self, graph, paths, source):
+        expected = bellman_ford(graph, source)
+        if expected is None:
+            self.assertRaises(GraphException, paths.tree)
+            return
+        dist, prev = paths.tree()
+        self.assertEqual(dist, expected)
+        for vertex in dist:
+            cost, walk = paths.walk(vertex)
+            self.assertEqual(walk[0], source)
+            self.assertEqual(walk[-1], vertex)
+            self.assertEqual(sum(graph.return_cost(x, y) for x, y in zip(walk, walk[1:])), cost)
+
+    def test_random_modifications(self):
+        rng = random.Random(14)
+        for trial in range(40):
+            graph = DirectedGraph(8)
+            paths = DynamicShortestPaths(graph, 0)
+            costs = [-3, -1, 0, 2, 5, 9] if trial % 2 else [0, 1, 4, 7]
+            for _ in range(60):
+                random_modification(graph, rng, costs, 0)
+                self.assert_matches(graph, paths, 0)
+            paths.detach()
+
+    def test_reachable_negative_cycle_after_add_edge(self):
+        graph = DirectedGraph(4)
+        graph.add_edge(2, 3, 1)
+        graph.add_edge(3, 2, -5)
+        paths = DynamicShortestPaths(graph, 0)
+        graph.add_edge(0, 2, 1)
+        self.assertRaises(GraphException, paths.tree)
+        graph.remove_edge(3, 2)
+        self.assertEqual(paths.tree()[0], {0: 0, 2: 1, 3: 2})
+
+
+class TestDynamicTopologicalOrder(unittest.TestCase):
+    def test_random_modifications(self):
+        rng = random.Random(14)
+        for _ in range(40):
+            graph = DirectedGraph(10)
+            order = DynamicTopologicalOrder(graph)
+            for _ in range(60):
+                random_modification(graph, rng, [1], None)
+                sorted = order.order()
+                expected = graph.topological_sorting()
+                self.assertEqual(sorted is None, expected is None)
+                if sorted is None:
+                    continue
+                self.assertEqual(set(sorted), set(graph.iterate_vertices()))
+                position = {vertex: i for i, vertex in enumerate(sorted)}
+                for vertex1, vertex2, _ in graph.iterate_edges_with_cost():
+                    self.assertLess(position[vertex1], position[vertex2])
+                    self.assertTrue(order.precedes(vertex1, vertex2))
+            order.detach()
+
+
+if __name__ == "__main__":
+    unittest.main()
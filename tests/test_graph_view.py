@@ -0,0 +1,130 @@
+import random
+import unittest
+
+from DirectedGraph.compactGraph import CompactGraph
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+from DirectedGraph.graphView import GraphView
+
+
+def random_graph(rng, n, m):
+    graph = DirectedGraph(n)
+    for _ in range(m):
+        vertex1, vertex2 = rng.randrange(n), rng.randrange(n)
+        if not graph.exists_edge(vertex1, vertex2):
+            graph.add_edge(vertex1, vertex2, rng.randrange(0, 10))
+    return graph
+
+
+def filtered_graph(graph, vertices=None, vertex_filter=None, edge_filter=None, reverse=False):
+    """
+    Builds the graph a view should show by copying the kept vertices and edges.
+    """
+    kept = [vertex for vertex in (graph.iterate_vertices() if vertices is None else vertices)
+            if vertex_filter is None or vertex_filter(vertex)]
+    result = DirectedGraph(0)
+    for vertex in kept:
+        result.add_vertex(vertex)
+    for vertex1, vertex2 in graph.iterate_edges():
+        cost = graph.return_cost(vertex1, vertex2)
+        if vertex1 in kept and vertex2 in kept and (edge_filter is None or edge_filter(vertex1, vertex2, cost)):
+            if reverse:
+                vertex1, vertex2 = vertex2, vertex1
+            result.add_edge(vertex1, vertex2, cost)
+    return result
+
+
+def random_filters(rng, n):
+    filters = {}
+    if rng.random() < 0.5:
+        filters["vertices"] = rng.sample(range(n), rng.randrange(n + 1))
+    if rng.random() < 0.5:
+        filters["vertex_filter"] = (lambda odd: lambda vertex: vertex % 3 != odd)(rng.randrange(3))
+    if rng.random() < 0.5:
+        filters["edge_filter"] = (lambda limit: lambda vertex1, vertex2, cost: cost < limit)(rng.randrange(10))
+    filters["reverse"] = rng.random() < 0.5
+    return filters
+
+
+class TestGraphView(unittest.TestCase):
+    def assert_same_graph(self, view, expected):
+        vertices = expected.iterate_vertices()
+        self.assertEqual(sorted(view.iterate_vertices()), sorted(vertices))
+        self.assertEqual(view.get_no_vertices(), len(vertices))
+        self.assertEqual(view.get_no_edges(), expected.get_no_edges())
+        self.assertEqual(sorted(view.iterate_edges_with_cost()),
+                         sorted((x, y, expected.return_cost(x, y)) for x, y in expected.iterate_edges()))
+        for vertex1 in vertices:
+            self.assertEqual(sorted(view.iterate_outbound(vertex1)), sorted(expected.iterate_outbound(vertex1)))
+            self.assertEqual(sorted(view.iterate_inbound(vertex1)), sorted(expected.iterate_inbound(vertex1)))
+            self.assertEqual(sorted(view.inbound_cost_view(vertex1)),
+                             sorted((x, expected.return_cost(x, vertex1)) for x in expected.iterate_inbound(vertex1)))
+            self.assertEqual(view.get_degree_out(vertex1), expected.get_degree_out(vertex1))
+            self.assertEqual(view.get_degree_in(vertex1), expected.get_degree_in(vertex1))
+            for vertex2 in vertices:
+                self.assertEqual(view.exists_edge(vertex1, vertex2), expected.exists_edge(vertex1, vertex2))
+                if expected.exists_edge(vertex1, vertex2):
+                    self.assertEqual(view.return_cost(vertex1, vertex2), expected.return_cost(vertex1, vertex2))
+                else:
+                    self.assertRaises(GraphException, view.return_cost, vertex1, vertex2)
+                self.assertEqual(view.lowest_cost_walk(vertex1, vertex2)[0],
+                                 expected.lowest_cost_walk(vertex1, vertex2)[0])
+                self.assertEqual(view.BFS(vertex1, vertex2)[0], expected.BFS(vertex1, vertex2)[0])
+        self.assertEqual(sorted(map(sorted, view.strongly_connected_components())),
+                         sorted(map(sorted, expected.strongly_connected_components())))
+        self.assertEqual(view.topological_sorting() is None, expected.topological_sorting() is None)
+        self.assertEqual(sorted(view.to_directed_graph().iterate_edges()), sorted(expected.iterate_edges()))
+
+    def test_filters_match_brute_force(self):
+        rng = random.Random(24)
+        for trial in range(40):
+            n = rng.randrange(1, 10)
+            graph = random_graph(rng, n, rng.randrange(3 * n))
+            filters = random_filters(rng, n)
+            expected = filtered_graph(graph, **filters)
+            self.assert_same_graph(GraphView(graph, **filters), expected)
+            self.assert_same_graph(GraphView(CompactGraph(graph), **filters), expected)
+            #a view of a view applies both filters
+            inner = random_filters(rng, n)
+            outer = random_filters(rng, n)
+            outer.pop("vertices", None)
+            self.assert_same_graph(GraphView(GraphView(graph, **inner), **outer),
+                                   filtered_graph(filtered_graph(graph, **inner), **outer))
+
+    def test_induced_and_reversed(self):
+        rng = random.Random(24)
+        for _ in range(10):
+            graph = random_graph(rng, 8, 20)
+            vertices = rng.sample(range(8), 4)
+            self.assert_same_graph(GraphView.induced(graph, vertices), filtered_graph(graph, vertices))
+            self.assert_same_graph(GraphView.reversed(graph), filtered_graph(graph, reverse=True))
+
+    def test_follows_the_graph(self):
+        rng = random.Random(24)
+        graph = random_graph(rng, 8, 20)
+        filters = {"vertex_filter": lambda vertex: vertex != 3, "edge_filter": lambda x, y, cost: cost < 7}
+        view = GraphView(graph, **filters)
+        for _ in range(15):
+            self.assert_same_graph(view, filtered_graph(graph, **filters))
+            vertex1, vertex2 = rng.randrange(8), rng.randrange(8)
+            if graph.exists_edge(vertex1, vertex2):
+                graph.modify_cost(vertex1, vertex2, rng.randrange(0, 10))
+            else:
+                graph.add_edge(vertex1, vertex2, rng.randrange(0, 10))
+
+    def test_read_only_and_missing_vertices(self):
+        graph = random_graph(random.Random(24), 5, 10)
+        view = GraphView(graph, vertex_filter=lambda vertex: vertex != 4)
+        for change in (lambda: view.add_edge(0, 1, 1), lambda: view.remove_edge(0, 1),
+                       lambda: view.modify_cost(0, 1, 1), lambda: view.add_vertex(7),
+                       lambda: view.remove_vertex(0)):
+            self.assertRaises(GraphException, change)
+        self.assertIs(view.copy_graph(), view)
+        for query in (view.get_degree_out, view.get_degree_in, view.iterate_outbound, view.iterate_inbound):
+            self.assertRaises(GraphException, query, 4)
+        self.assertEqual(view.lowest_cost_walk(0, 0), (0, [0]))
+        self.assertNotIn(4, view.lowest_cost_tree(0)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import tracemalloc
+import unittest
+
+from DirectedGraph import instrumentation
+from DirectedGraph.directedGraph import DirectedGraph
+
+
+class TestInstrumentation(unittest.TestCase):
+    def tearDown(self):
+        instrumentation.disable()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def test_keeps_tracing_started_by_the_caller(self):
+        tracemalloc.start()
+        instrumentation.enable(trace_memory=True)
+        instrumentation.disable()
+        self.assertTrue(tracemalloc.is_tracing())
+
+    def test_stops_its_own_tracing(self):
+        instrumentation.enable(trace_memory=True)
+        self.assertTrue(tracemalloc.is_tracing())
+        #enabling again keeps the tracing owned by instrumentation
+        instrumentation.enable(trace_memory=True)
+        instrumentation.disable()
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_counts_only_while_enabled(self):
+        graph = DirectedGraph(3)
+        graph.add_edge(0, 1, 1)
+        graph.add_edge(1, 2, 1)
+        stats = instrumentation.enable()
+        graph.bidirectional_bfs(0, 2)
+        graph.bidirectional_dijkstra(0, 2)
+        self.assertIs(instrumentation.disable(), stats)
+        self.assertGreater(stats.counters["vertices_popped"], 0)
+        self.assertEqual(stats.phases["bidirectional_bfs"][0], 1)
+        counters = dict(stats.counters)
+        graph.bidirectional_bfs(0, 2)
+        self.assertEqual(stats.counters, counters)
+        self.assertIsNone(instrumentation.disable())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import random
+import unittest
+
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+from DirectedGraph.generators import dag_edges
+
+
+def simple_paths(graph, source, target):
+    """
+    Returns (cost, path) for every simple path from source to target, by depth-first search.
+    """
+    paths = []
+    path = [source]
+
+    def extend(cost):
+        vertex = path[-1]
+        if vertex == target:
+            paths.append((cost, list(path)))
+            return
+        for neighbour, edge_cost in graph.outbound_cost_view(vertex):
+            if neighbour not in path:
+                path.append(neighbour)
+                extend(cost + edge_cost)
+                path.pop()
+    extend(0)
+    return paths
+
+
+class TestKPaths(unittest.TestCase):
+    def assert_paths(self, graph, source, target, found, expected_costs):
+        self.assertEqual([cost for cost, _ in found], expected_costs)
+        self.assertEqual(len({tuple(path) for _, path in found}), len(found))
+        for cost, path in found:
+            self.assertEqual((path[0], path[-1]), (source, target))
+            self.assertEqual(len(set(path)), len(path))
+            self.assertEqual(sum(graph.return_cost(x, y) for x, y in zip(path, path[1:])), cost)
+
+    def test_lowest_cost_paths_match_brute_force(self):
+        rng = random.Random(25)
+        for trial in range(60):
+            n = rng.randrange(2, 9)
+            graph = DirectedGraph(n)
+            for _ in range(rng.randrange(n * n)):
+                vertex1, vertex2 = rng.randrange(n), rng.randrange(n)
+                if not graph.exists_edge(vertex1, vertex2):
+                    #a few distinct costs, so there are ties between paths
+                    graph.add_edge(vertex1, vertex2, rng.randrange(4 if trial % 2 else 20))
+            for _ in range(4):
+                source, target, k = rng.randrange(n), rng.randrange(n), rng.randrange(1, 12)
+                expected = sorted(cost for cost, _ in simple_paths(graph, source, target))[:k]
+                found = graph.k_lowest_cost_paths(source, target, k)
+                self.assert_paths(graph, source, target, found, expected)
+            #answers after a modification use the new graph, not the kept tree
+            vertex1, vertex2 = rng.randrange(n), rng.randrange(n)
+            if graph.exists_edge(vertex1, vertex2):
+                graph.remove_edge(vertex1, vertex2)
+            else:
+                graph.add_edge(vertex1, vertex2, 0)
+            expected = sorted(cost for cost, _ in simple_paths(graph, 0, n - 1))[:5]
+            self.assert_paths(graph, 0, n - 1, graph.k_lowest_cost_paths(0, n - 1, 5), expected)
+
+    def test_lowest_cost_paths_errors(self):
+        graph = DirectedGraph(3)
+        graph.add_edge(0, 1, -1)
+        self.assertRaises(GraphException, graph.k_lowest_cost_paths, 0, 1, 2)
+        graph.modify_cost(0, 1, 1)
+        self.assertRaises(GraphException, graph.k_lowest_cost_paths, 0, 7, 2)
+        self.assertEqual(graph.k_lowest_cost_paths(0, 2, 3), [])
+        self.assertEqual(graph.k_lowest_cost_paths(0, 1, 0), [])
+
+    def test_dag_paths_match_brute_force(self):
+        rng = random.Random(25)
+        for trial in range(60):
+            n = rng.randrange(2, 10)
+            graph = DirectedGraph(n)
+            graph.add_edges(dag_edges(n, rng.randrange(n * (n - 1) // 2 + 1), trial, 4 if trial % 2 else 50))
+            for _ in range(4):
+                source, target, k = rng.randrange(n), rng.randrange(n), rng.randrange(1, 12)
+                costs = sorted(cost for cost, _ in simple_paths(graph, source, target))
+                self.assert_paths(graph, source, target, graph.k_highest_cost_paths(source, target, k),
+                                  costs[::-1][:k])
+                self.assert_paths(graph, source, target, graph.k_highest_cost_paths(source, target, k, False),
+                                  costs[:k])
+
+    def test_dag_paths_errors(self):
+        graph = DirectedGraph(3)
+        graph.add_edge(0, 1, 1)
+        graph.add_edge(1, 0, 1)
+        self.assertRaises(GraphException, graph.k_highest_cost_paths, 0, 1, 2)
+        graph.remove_edge(1, 0)
+        self.assertRaises(GraphException, graph.k_highest_cost_paths, 0, 7, 2)
+        self.assertEqual(graph.k_highest_cost_paths(0, 2, 2), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
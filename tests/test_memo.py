@@ -0,0 +1,119 @@
+import math
+import random
+import unittest
+
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+from DirectedGraph.memo import LruMemo
+
+
+def rebuilt(graph):
+    """
+    Returns a new graph with the vertices and edges of graph and no kept results.
+    """
+    fresh = DirectedGraph(0)
+    for vertex in graph.iterate_vertices():
+        fresh.add_vertex(vertex)
+    fresh.add_edges(graph.iterate_edges_with_cost())
+    fresh.set_memo_size(0)
+    return fresh
+
+
+def outcome(function, *arguments):
+    #the result of a query or the exception class it raised
+    try:
+        return function(*arguments)
+    except GraphException:
+        return GraphException
+
+
+class TestLruMemo(unittest.TestCase):
+    def test_drops_least_recently_used(self):
+        memo = LruMemo(2)
+        calls = []
+        compute = lambda key: lambda: calls.append(key) or key * 10
+        self.assertEqual(memo.get(1, compute(1)), 10)
+        self.assertEqual(memo.get(2, compute(2)), 20)
+        self.assertEqual(memo.get(1, compute(1)), 10)
+        self.assertEqual(memo.get(3, compute(3)), 30)
+        self.assertEqual(memo.get(1, compute(1)), 10)
+        self.assertEqual(memo.get(2, compute(2)), 20)
+        self.assertEqual(calls, [1, 2, 3, 2])
+        self.assertEqual(len(memo), 2)
+
+    def test_exceptions_are_not_stored(self):
+        memo = LruMemo(2)
+
+        def fail():
+            raise GraphException("no")
+        self.assertRaises(GraphException, memo.get, 1, fail)
+        self.assertEqual(memo.get(1, lambda: 5), 5)
+
+    def test_resize_and_clear(self):
+        memo = LruMemo(3)
+        for key in range(3):
+            memo.get(key, lambda: key)
+        memo.resize(1)
+        self.assertEqual(len(memo), 1)
+        self.assertEqual(memo.get(2, lambda: None), 2)
+        memo.resize(0)
+        memo.get(5, lambda: 5)
+        self.assertEqual(len(memo), 0)
+        memo.resize(2)
+        memo.get(5, lambda: 5)
+        memo.clear()
+        self.assertEqual(len(memo), 0)
+
+
+class TestGraphMemo(unittest.TestCase):
+    def test_results_follow_modifications(self):
+        rng = random.Random(13)
+        for trial in range(20):
+            n = 9
+            graph = DirectedGraph(n)
+            graph.set_memo_size(4 if trial % 2 else DirectedGraph.MEMO_SIZE)
+            for _ in range(80):
+                vertex1, vertex2 = rng.randrange(n), rng.randrange(n)
+                if graph.exists_edge(vertex1, vertex2):
+                    if rng.random() < 0.5:
+                        graph.remove_edge(vertex1, vertex2)
+                    else:
+                        graph.modify_cost(vertex1, vertex2, rng.randrange(-2, 10))
+                elif vertex1 < vertex2 or rng.random() < 0.1:
+                    graph.add_edge(vertex1, vertex2, rng.randrange(-2, 10))
+                fresh = rebuilt(graph)
+                #every query twice, the second one is answered from the kept results
+                for _ in range(2):
+                    source, target = rng.randrange(n), rng.randrange(n)
+                    self.assertEqual(outcome(graph.lowest_cost_walk, source, target),
+                                     outcome(fresh.lowest_cost_walk, source, target))
+                    self.assertEqual(graph.topological_sorting(), fresh.topological_sorting())
+                    self.assertEqual(outcome(graph.highest_cost_path, source),
+                                     outcome(fresh.highest_cost_path, source))
+                    self.assertEqual(graph.strongly_connected_components(),
+                                     fresh.strongly_connected_components())
+
+    def test_version_changes_with_every_modification(self):
+        graph = DirectedGraph(3)
+        versions = [graph.get_version()]
+        for modify in (lambda: graph.add_edge(0, 1, 4), lambda: graph.modify_cost(0, 1, 2),
+                       lambda: graph.add_vertex(3), lambda: graph.remove_edge(0, 1),
+                       lambda: graph.remove_vertex(3)):
+            modify()
+            versions.append(graph.get_version())
+        self.assertEqual(len(set(versions)), len(versions))
+
+    def test_copy_keeps_its_own_results(self):
+        graph = DirectedGraph(3)
+        graph.add_edge(0, 1, 5)
+        self.assertEqual(graph.lowest_cost_walk(0, 1), (5, [0, 1]))
+        copy = graph.copy_graph()
+        copy.modify_cost(0, 1, 1)
+        copy.add_edge(1, 2, 1)
+        self.assertEqual(copy.lowest_cost_walk(0, 2), (2, [0, 1, 2]))
+        self.assertEqual(graph.lowest_cost_walk(0, 1), (5, [0, 1]))
+        self.assertEqual(graph.lowest_cost_walk(0, 2), (math.inf, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import os
+import random
+import tempfile
+import unittest
+
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+from DirectedGraph.mutationLog import LOG_MAGIC, RECORD, MutationLog
+
+
+def contents(graph):
+    return sorted(graph.iterate_vertices()), sorted(graph.iterate_edges_with_cost())
+
+
+def modify(graph, rng, count):
+    for _ in range(count):
+        vertices = list(graph.iterate_vertices())
+        edges = list(graph.iterate_edges_with_cost())
+        choice = rng.random()
+        if choice < 0.5 or not edges:
+            vertex1, vertex2 = rng.choice(vertices), rng.choice(vertices)
+            if not graph.exists_edge(vertex1, vertex2):
+                graph.add_edge(vertex1, vertex2, rng.randrange(-50, 50))
+        elif choice < 0.7:
+            vertex1, vertex2, _ = rng.choice(edges)
+            graph.remove_edge(vertex1, vertex2)
+        elif choice < 0.9:
+            vertex1, vertex2, _ = rng.choice(edges)
+            graph.modify_cost(vertex1, vertex2, rng.randrange(-50, 50))
+        elif choice < 0.95 and len(vertices) > 1:
+            graph.remove_vertex(rng.choice(vertices))
+        else:
+            graph.add_vertex(max(vertices) + 1)
+
+
+class TestMutationLog(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.base_name = os.path.join(self.directory.name, "graph")
+        self.rng = random.Random(23)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def files(self):
+        return sorted(os.listdir(self.directory.name))
+
+    def test_recover_replays_the_log(self):
+        graph = DirectedGraph(20)
+        modify(graph, self.rng, 50)
+        log = MutationLog(graph, self.base_name)
+        modify(graph, self.rng, 300)
+        self.assertGreater(log.records(), 0)
+        log.close()
+        recovered = MutationLog.recover(self.base_name)
+        self.assertEqual(contents(recovered.graph), contents(graph))
+        #modifications after a recovery go on in the same log
+        modify(recovered.graph, self.rng, 100)
+        recovered.close()
+        again = MutationLog.recover(self.base_name)
+        self.assertEqual(contents(again.graph), contents(recovered.graph))
+        again.close()
+
+    def test_recover_without_close(self):
+        graph = DirectedGraph(10)
+        log = MutationLog(graph, self.base_name)
+        modify(graph, self.rng, 100)
+        log.flush()
+        #a crash leaves the log open, every record was already written
+        recovered = MutationLog.recover(self.base_name)
+        self.assertEqual(contents(recovered.graph), contents(graph))
+        recovered.close()
+        log.close()
+
+    def test_torn_record_is_dropped(self):
+        graph = DirectedGraph(10)
+        log = MutationLog(graph, self.base_name)
+        modify(graph, self.rng, 40)
+        expected = contents(graph)
+        graph.add_vertex(max(graph.iterate_vertices()) + 1)
+        log.close()
+        log_file = self.base_name + ".0.log"
+        with open(log_file, "rb") as file:
+            data = file.read()
+        self.assertEqual((len(data) - len(LOG_MAGIC)) % RECORD.size, 0)
+        for cut in (1, RECORD.size // 2, RECORD.size - 1):
+            with open(log_file, "wb") as file:
+                file.write(data[:-cut])
+            recovered = MutationLog.recover(self.base_name)
+            self.assertEqual(contents(recovered.graph), expected)
+            recovered.close()
+            #the recovery cut the torn record off
+            self.assertEqual(os.path.getsize(log_file), len(data) - RECORD.size)
+
+    def test_corrupted_record_stops_the_replay(self):
+        graph = DirectedGraph(5)
+        log = MutationLog(graph, self.base_name)
+        graph.add_edge(0, 1, 1)
+        expected = contents(graph)
+        graph.add_edge(1, 2, 2)
+        graph.add_edge(2, 3, 3)
+        log.close()
+        with open(self.base_name + ".0.log", "r+b") as file:
+            file.seek(len(LOG_MAGIC) + RECORD.size + 3)
+            file.write(b"\xff")
+        recovered = MutationLog.recover(self.base_name)
+        self.assertEqual(contents(recovered.graph), expected)
+        recovered.close()
+
+    def test_compact(self):
+        for background in (False, True):
+            with self.subTest(background=background):
+                base_name = self.base_name + str(background)
+                graph = DirectedGraph(15)
+                log = MutationLog(graph, base_name)
+                for generation in range(1, 4):
+                    modify(graph, self.rng, 60)
+                    log.compact(background=background)
+                    modify(graph, self.rng, 60)
+                    log.wait()
+                    self.assertEqual(sorted(name for name in self.files() if name.startswith("graph" + str(background))),
+                                     ["graph%s.%d.log" % (background, generation),
+                                      "graph%s.%d.snapshot" % (background, generation)])
+                log.close()
+                recovered = MutationLog.recover(base_name)
+                self.assertEqual(contents(recovered.graph), contents(graph))
+                recovered.close()
+
+    def test_crash_during_compaction(self):
+        graph = DirectedGraph(10)
+        log = MutationLog(graph, self.base_name)
+        modify(graph, self.rng, 50)
+        log.flush()
+        kept = {}
+        for suffix in ("0.snapshot", "0.log"):
+            with open(self.base_name + "." + suffix, "rb") as file:
+                kept[suffix] = file.read()
+        log.compact()
+        modify(graph, self.rng, 50)
+        log.close()
+        #a crash before the new snapshot was renamed leaves generation 0, the new log and a temporary file
+        os.rename(self.base_name + ".1.snapshot", self.base_name + ".1.snapshot.tmp")
+        for suffix, data in kept.items():
+            with open(self.base_name + "." + suffix, "wb") as file:
+                file.write(data)
+        recovered = MutationLog.recover(self.base_name)
+        self.assertEqual(contents(recovered.graph), contents(graph))
+        recovered.close()
+        self.assertNotIn("graph.1.snapshot.tmp", self.files())
+
+    def test_existing_name(self):
+        MutationLog(DirectedGraph(2), self.base_name).close()
+        self.assertRaises(GraphException, MutationLog, DirectedGraph(2), self.base_name)
+        self.assertRaises(GraphException, MutationLog.recover, self.base_name + "missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import math
+import random
+import unittest
+
+from DirectedGraph.compactGraph import CompactGraph
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+
+
+def bellman_ford(graph, source):
+    """
+    Lowest costs from source to every vertex by plain Bellman-Ford, inf for unreachable ones.
+    """
+    dist = {vertex: math.inf for vertex in graph.iterate_vertices()}
+    dist[source] = 0
+    for _ in range(graph.get_no_vertices()):
+        for vertex1, vertex2 in graph.iterate_edges():
+            if dist[vertex1] + graph.return_cost(vertex1, vertex2) < dist[vertex2]:
+                dist[vertex2] = dist[vertex1] + graph.return_cost(vertex1, vertex2)
+    return dist
+
+
+def random_graph(rng, n, m):
+    graph = DirectedGraph(n)
+    for _ in range(m):
+        vertex1, vertex2 = rng.randrange(n), rng.randrange(n)
+        if not graph.exists_edge(vertex1, vertex2):
+            #zero costs make ties between walks
+            graph.add_edge(vertex1, vertex2, rng.randrange(0, 10))
+    return graph
+
+
+class TestShortestPaths(unittest.TestCase):
+    def assert_walk(self, graph, source, target, found, expected):
+        cost, path = found
+        self.assertEqual(cost, expected)
+        if expected == math.inf:
+            self.assertEqual(path, [])
+            return
+        self.assertEqual((path[0], path[-1]), (source, target))
+        self.assertEqual(sum(graph.return_cost(x, y) for x, y in zip(path, path[1:])), cost)
+
+    def assert_searches(self, graph, rng):
+        vertices = graph.iterate_vertices()
+        for source in vertices:
+            expected = bellman_ford(graph, source)
+            dist, prev = graph.dijkstra_tree(source)
+            self.assertEqual(dist, {vertex: cost for vertex, cost in expected.items() if cost < math.inf})
+            for vertex, previous in prev.items():
+                if previous is not None:
+                    self.assertEqual(dist[previous] + graph.return_cost(previous, vertex), dist[vertex])
+            for target in vertices:
+                self.assert_walk(graph, source, target, graph.dijkstra(source, target), expected[target])
+                self.assert_walk(graph, source, target, graph.dijkstra(source, target, lambda vertex: 0),
+                                 expected[target])
+                self.assert_walk(graph, source, target, graph.bidirectional_dijkstra(source, target),
+                                 expected[target])
+                self.assert_walk(graph, source, target,
+                                 graph.landmark_walk(source, target, rng.randrange(1, 5), rng.randrange(1, 4)),
+                                 expected[target])
+                self.assertEqual(graph.lowest_cost_walk(source, target)[0], expected[target])
+            #the reverse tree holds the costs towards source
+            dist, _ = graph.dijkstra_tree(source, reverse=True)
+            for vertex in vertices:
+                self.assertEqual(dist.get(vertex, math.inf), bellman_ford(graph, vertex)[source])
+
+    def test_searches_match_bellman_ford(self):
+        rng = random.Random(16)
+        for trial in range(25):
+            n = rng.randrange(1, 10)
+            graph = random_graph(rng, n, rng.randrange(3 * n))
+            if trial % 4 == 0 and n > 1:
+                graph.remove_vertex(rng.randrange(n))
+                graph.add_vertex(n + 3)
+                graph.add_edge(n + 3, graph.iterate_vertices()[0], 2)
+            self.assert_searches(graph, rng)
+            self.assert_searches(CompactGraph(graph), rng)
+
+    def test_landmarks_follow_changes(self):
+        rng = random.Random(16)
+        graph = random_graph(rng, 8, 20)
+        for _ in range(10):
+            graph.landmark_walk(0, 7)
+            vertex1, vertex2 = rng.choice(graph.iterate_edges())
+            graph.modify_cost(vertex1, vertex2, rng.randrange(0, 10))
+            expected = bellman_ford(graph, 0)
+            for target in graph.iterate_vertices():
+                self.assert_walk(graph, 0, target, graph.landmark_walk(0, target), expected[target])
+
+    def test_negative_costs_and_missing_vertices(self):
+        graph = random_graph(random.Random(16), 5, 10)
+        self.assertRaises(GraphException, graph.dijkstra, 0, 9)
+        self.assertRaises(GraphException, graph.bidirectional_dijkstra, 9, 0)
+        self.assertRaises(GraphException, graph.landmark_walk, 0, 9)
+        if graph.exists_edge(4, 4):
+            graph.remove_edge(4, 4)
+        graph.add_edge(4, 4, -1)
+        for search in (graph.dijkstra, graph.bidirectional_dijkstra, graph.landmark_walk):
+            self.assertRaises(GraphException, search, 0, 1)
+        self.assertRaises(GraphException, graph.dijkstra_tree, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
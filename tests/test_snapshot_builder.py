@@ -0,0 +1,87 @@
+import os
+import random
+import tempfile
+import unittest
+
+from DirectedGraph.compactGraph import CompactGraph
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+
+
+def random_graph(rng, n, m):
+    graph = DirectedGraph(n)
+    for _ in range(m):
+        vertex1, vertex2 = rng.randrange(n), rng.randrange(n)
+        if not graph.exists_edge(vertex1, vertex2):
+            graph.add_edge(vertex1, vertex2, rng.randrange(0, 100))
+    return graph
+
+
+class TestSnapshotBuilder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.text_file = os.path.join(self.directory.name, "graph.txt")
+        self.snapshot_file = os.path.join(self.directory.name, "graph.snapshot")
+        self.expected_file = os.path.join(self.directory.name, "expected.snapshot")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self, file_name):
+        with open(file_name, "rb") as file:
+            return file.read()
+
+    def test_matches_the_in_memory_snapshot(self):
+        rng = random.Random(18)
+        for trial in range(20):
+            n = rng.randrange(1, 25)
+            random_graph(rng, n, rng.randrange(4 * n)).write_to_file(self.text_file)
+            graph = DirectedGraph.read_from_file(self.text_file)
+            for inbound in (True, False):
+                #the builder keeps the file order inside a row, like the text loader
+                CompactGraph(graph, inbound).write_snapshot(self.expected_file)
+                for chunk_size in (1, 5, 1 << 20):
+                    CompactGraph.build_snapshot(self.text_file, self.snapshot_file, inbound, chunk_size)
+                    self.assertEqual(self.read(self.snapshot_file), self.read(self.expected_file))
+
+    def test_mapped_queries_match_the_graph(self):
+        rng = random.Random(18)
+        for trial in range(20):
+            n = rng.randrange(1, 15)
+            random_graph(rng, n, rng.randrange(3 * n)).write_to_file(self.text_file)
+            #neighbours are in the order of the file, as the text loader puts them
+            graph = DirectedGraph.read_from_file(self.text_file)
+            for inbound in (True, False):
+                CompactGraph.build_snapshot(self.text_file, self.snapshot_file, inbound)
+                compact = CompactGraph.load_snapshot(self.snapshot_file)
+                self.assertEqual(compact.has_inbound_index(), inbound)
+                self.assertEqual(sorted(compact.iterate_edges_with_cost()), sorted(graph.iterate_edges_with_cost()))
+                for vertex in graph.iterate_vertices():
+                    self.assertEqual(compact.iterate_outbound(vertex), graph.iterate_outbound(vertex))
+                    self.assertEqual(compact.get_degree_in(vertex), graph.get_degree_in(vertex))
+                    if inbound:
+                        self.assertEqual(compact.iterate_inbound(vertex), graph.iterate_inbound(vertex))
+                    else:
+                        self.assertRaises(GraphException, compact.iterate_inbound, vertex)
+                self.assertEqual(compact.topological_sorting(), graph.topological_sorting())
+                for _ in range(5):
+                    source, target = rng.randrange(n), rng.randrange(n)
+                    self.assertEqual(compact.BFS(source, target), graph.BFS(source, target))
+                    self.assertEqual(compact.bidirectional_dijkstra(source, target)[0],
+                                     graph.dijkstra(source, target)[0])
+                self.assertEqual(sorted(DirectedGraph.read_from_file(self.snapshot_file).iterate_edges_with_cost()),
+                                 sorted(graph.iterate_edges_with_cost()))
+
+    def test_invalid_text(self):
+        for text in ("", "3", "3 2\n0 1 5\n", "2 1\n0 5 1\n", "2 1\n-1 0 1\n", "2 2\n0 1 1\n0 1 2\n"):
+            with open(self.text_file, "w") as file:
+                file.write(text)
+            for inbound in (True, False):
+                self.assertRaises(GraphException, CompactGraph.build_snapshot, self.text_file, self.snapshot_file,
+                                  inbound, 3)
+        self.assertRaises(GraphException, CompactGraph.build_snapshot, self.text_file + ".missing",
+                          self.snapshot_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import math
+import random
+import unittest
+
+from DirectedGraph.directedGraph import DirectedGraph
+from DirectedGraph.exceptions import GraphException
+from DirectedGraph.vertexIndex import VertexIndex
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def bellman_ford(graph, source):
+    """
+    Lowest costs from source to every vertex by plain Bellman-Ford.
+    """
+    dist = {vertex: math.inf for vertex in graph.iterate_vertices()}
+    dist[source] = 0
+    edges = list(graph.iterate_edges_with_cost())
+    for _ in range(graph.get_no_vertices()):
+        for vertex1, vertex2, cost in edges:
+            if dist[vertex1] + cost < dist[vertex2]:
+                dist[vertex2] = dist[vertex1] + cost
+    return dist
+
+
+def churn(graph, rng, steps):
+    #removes and adds vertices so their indices are freed and given to new vertices
+    for _ in range(steps):
+        vertices = graph.iterate_vertices()
+        if len(vertices) > 2 and rng.random() < 0.5:
+            graph.remove_vertex(rng.choice(vertices))
+        else:
+            vertex = max(vertices) + rng.randrange(1, 5)
+            graph.add_vertex(vertex)
+            for _ in range(3):
+                neighbour = rng.choice(vertices)
+                if rng.random() < 0.5:
+                    vertex, neighbour = neighbour, vertex
+                if not graph.exists_edge(vertex, neighbour):
+                    graph.add_edge(vertex, neighbour, rng.randrange(1, 20))
+
+
+class TestVertexIndex(unittest.TestCase):
+    def test_identity_until_a_hole(self):
+        index = VertexIndex(4)
+        self.assertTrue(index.is_identity())
+        self.assertEqual(index.add(4), 4)
+        self.assertEqual(index.remove(4), 4)
+        self.assertTrue(index.is_identity())
+        self.assertEqual(index.remove(1), 1)
+        self.assertFalse(index.is_identity())
+        self.assertNotIn(1, index)
+        self.assertRaises(GraphException, index.index_of, 1)
+        self.assertRaises(GraphException, index.vertex_of, 1)
+
+    def test_free_list_reuse(self):
+        index = VertexIndex(5)
+        index.remove(1)
+        index.remove(3)
+        self.assertEqual((len(index), index.capacity(), index.free_count()), (3, 5, 2))
+        #the most recently freed index goes first
+        self.assertEqual(index.add(10), 3)
+        self.assertEqual(index.add(11), 1)
+        self.assertEqual(index.add(12), 5)
+        self.assertEqual(index.vertices(), [0, 11, 2, 10, 4, 12])
+        self.assertRaises(GraphException, index.add, 10)
+
+    def test_compact_keeps_the_order(self):
+        index = VertexIndex(5)
+        index.remove(0)
+        index.remove(3)
+        index.add(7)
+        copy = index.copy()
+        self.assertEqual(index.compact(), [None, 0, 1, 2, 3])
+        self.assertEqual(index.vertices(), [1, 2, 7, 4])
+        self.assertEqual([index.index_of(vertex) for vertex in (1, 2, 7, 4)], [0, 1, 2, 3])
+        self.assertIsNone(index.compact())
+        #the copy is independent
+        self.assertEqual(copy.vertices(), [None, 1, 2, 7, 4])
+
+    def test_random_against_dict(self):
+        rng = random.Random(21)
+        index = VertexIndex(6)
+        vertices = set(range(6))
+        for _ in range(500):
+            if vertices and rng.random() < 0.5:
+                vertex = rng.choice(sorted(vertices))
+                index.remove(vertex)
+                vertices.discard(vertex)
+            else:
+                vertex = rng.randrange(40)
+                if vertex not in vertices:
+                    index.add(vertex)
+                    vertices.add(vertex)
+            if rng.random() < 0.1:
+                index.compact()
+                self.assertEqual(index.free_count(), 0)
+            self.assertEqual(len(index), len(vertices))
+            for vertex in vertices:
+                self.assertEqual(index.vertex_of(index.index_of(vertex)), vertex)
+            self.assertEqual({vertex for vertex in index.vertices() if vertex is not None}, vertices)
+
+
+class TestMatricesAfterChurn(unittest.TestCase):
+    def test_weight_matrix(self):
+        rng = random.Random(21)
+        graph = DirectedGraph(6)
+        churn(graph, rng, 40)
+        matrix = graph.get_weight_matrix()
+        index = graph.vertex_index()
+        self.assertEqual(len(matrix), graph.get_no_vertices())
+        for vertex1 in graph.iterate_vertices():
+            for vertex2 in graph.iterate_vertices():
+                i, j = index.index_of(vertex1), index.index_of(vertex2)
+                if vertex1 == vertex2:
+                    expected = 0
+                elif graph.exists_edge(vertex1, vertex2):
+                    expected = graph.return_cost(vertex1, vertex2)
+                else:
+                    expected = math.inf
+                self.assertEqual(matrix[i][j], expected)
+
+    @unittest.skipIf(numpy is None, "needs NumPy")
+    def test_all_pairs_against_bellman_ford(self):
+        rng = random.Random(21)
+        for trial in range(10):
+            graph = DirectedGraph(8)
+            for _ in range(16):
+                vertex1, vertex2 = rng.randrange(8), rng.randrange(8)
+                if not graph.exists_edge(vertex1, vertex2):
+                    graph.add_edge(vertex1, vertex2, rng.randrange(1, 20))
+            for method in ("floyd_warshall", "squaring", "blocked"):
+                churn(graph, rng, 6)
+                options = {"workers": 1, "tile_size": 3} if method == "blocked" else {}
+                dist = graph.all_pairs_lowest_cost(method, **options)
+                index = graph.vertex_index()
+                for source in graph.iterate_vertices():
+                    expected = bellman_ford(graph, source)
+                    for target in graph.iterate_vertices():
+                        cost = dist[index.index_of(source), index.index_of(target)]
+                        self.assertEqual(cost, expected[target])
+                        path = graph.get_path(source, target)
+                        if cost == math.inf:
+                            self.assertEqual(path, [])
+                        else:
+                            self.assertEqual((path[0], path[-1]), (source, target))
+                            self.assertEqual(sum(graph.return_cost(x, y) for x, y in zip(path, path[1:])), cost)
+
+    @unittest.skipIf(numpy is None, "needs NumPy")
+    def test_get_path_after_remove_then_add(self):
+        graph = DirectedGraph(4)
+        graph.add_edge(0, 1, 1)
+        graph.add_edge(1, 2, 1)
+        graph.add_edge(2, 3, 1)
+        graph.all_pairs_lowest_cost()
+        self.assertEqual(graph.get_path(0, 3), [0, 1, 2, 3])
+        graph.remove_vertex(1)
+        graph.add_vertex(7)
+        graph.add_edge(0, 7, 1)
+        graph.add_edge(7, 3, 1)
+        #the old matrix would send 0 -> 7 -> 2 through the index 7 took over from 1
+        self.assertRaises(GraphException, graph.get_path, 0, 3)
+        graph.all_pairs_lowest_cost()
+        self.assertEqual(graph.get_path(0, 3), [0, 7, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()